@@ -0,0 +1,871 @@
+"""
+OrderFlow PDF benchmark - måler generatorerne på syntetiske data
+
+Brug:
+    python benchmark.py styles --docs 200
+    python benchmark.py pages --pages 500 --max-rss-mb 150
+    python benchmark.py lines --sizes 100 1000 10000 50000
+    python benchmark.py furniture --pages 200
+    python benchmark.py streaming --sizes 10 1000 10000
+    python benchmark.py fonts --docs 50
+    python benchmark.py profiles --docs 50
+    python benchmark.py archive --docs 100000
+    python benchmark.py determinism --runs 3
+    python benchmark.py startup --runs 5
+    python benchmark.py memory --lines 100000
+    python benchmark.py aggregate --orders 10000 100000
+    python benchmark.py bulk --locations 200
+
+    python benchmark.py service --requests 500 --concurrency 16
+    python benchmark.py service --port 8080 --no-spawn     # mod en service der allerede kører
+
+    python benchmark.py suite --output baseline.json
+    python benchmark.py compare baseline.json            # kører suiten igen og sammenligner
+    python benchmark.py compare baseline.json ny.json --threshold 0.15
+"""
+
+import argparse
+import asyncio
+import gc
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import multiprocessing
+import tempfile
+import re
+import resource
+import statistics
+import platform
+import sys
+import time
+import tracemalloc
+from dataclasses import replace
+from datetime import date, datetime
+from io import BytesIO
+from queue import Empty
+from typing import Callable, Dict
+
+import dagsrapport_aggregator as da
+import dagsrapport_generator as dr
+import faktura_generator as fg
+import pdf_archive
+import pdf_fonts
+import pdf_output
+import pdf_styles
+import reportlab
+from reportlab.lib.pagesizes import A4
+from reportlab.pdfbase.ttfonts import TTFont
+from reportlab.pdfgen import canvas
+
+# ============ SYNTETISKE DATA ============
+def sample_customer() -> fg.CustomerInfo:
+    return fg.CustomerInfo(
+        company_name="Restaurant Bella Vista ApS",
+        cvr="87654321",
+        address="Nørrebrogade 45",
+        postal_city="2200 København N",
+        attention="Martin Jensen"
+    )
+
+def sample_faktura(line_count: int = 4, invoice_number: str = "2025-0042") -> fg.FakturaData:
+    base = [
+        ("OrderFlow Professional - Månedligt abonnement", 1, "måned", 799.00),
+        ("SMS-pakke (1.000 stk.)", 2, "pakke", 249.00),
+        ("Ekstra brugerkonti", 5, "stk", 49.00),
+        ("API-kald overskridelse (december)", 15000, "kald", 0.02),
+    ]
+    lines = [fg.InvoiceLine(*base[i % len(base)]) for i in range(line_count)]
+    return fg.FakturaData(
+        invoice_number=invoice_number,
+        invoice_date=date(2025, 12, 31),
+        payment_terms=fg.PaymentTerms.NET_14,
+        order_reference="PO-2025-123",
+        lines=lines,
+    )
+
+def sample_dagsrapport_customer() -> dr.CustomerInfo:
+    return dr.CustomerInfo(
+        company_name="Restaurant Bella Vista ApS",
+        cvr="87654321",
+        address="Nørrebrogade 45",
+        postal_city="2200 København N"
+    )
+
+def sample_dagsrapport(document_number: str = "DOC-2025-524408") -> dr.DagsrapportData:
+    return dr.DagsrapportData(
+        report_date=date(2025, 12, 31),
+        opened_time=datetime(2025, 12, 31, 8, 14),
+        closed_time=datetime(2025, 12, 31, 21, 14),
+        opened_by="Medarbejder / Medarbejder",
+        document_number=document_number,
+        gross_revenue=438412.24,
+        discounts=1215.24,
+        total_revenue=437197.00,
+        vat_collected=87439.40,
+        sale_excl_vat=349757.60,
+        payment_breakdown=dr.PaymentBreakdown(
+            cash_sale=48140.24,
+            cash_revenue=48140.24,
+            card_sale=389056.76,
+            card_revenue=389056.76,
+            surcharge=624.24,
+            tips=121.24
+        )
+    )
+
+# Fakturalinjer pr. side med standardlayoutet (målt)
+LINES_PER_PAGE = 26
+
+def _ms(seconds: float) -> str:
+    return f"{seconds * 1000:8.3f} ms"
+
+def count_pages(pdf: bytes) -> int:
+    return len(re.findall(rb"/Type /Page\b(?!s)", pdf))
+
+def _isolated_child(queue, func, args):
+    start = time.perf_counter()
+    result = func(*args)
+    elapsed = time.perf_counter() - start
+    # ru_maxrss er i KB på Linux
+    queue.put((result, elapsed, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024))
+
+def run_isolated(func, *args):
+    """Kører func i en frisk proces og returnerer (resultat, sekunder, peak RSS i MB)"""
+    ctx = multiprocessing.get_context("spawn")
+    queue = ctx.Queue()
+    proc = ctx.Process(target=_isolated_child, args=(queue, func, args))
+    proc.start()
+    try:
+        while True:
+            try:
+                return queue.get(timeout=1)
+            except Empty:
+                if not proc.is_alive():
+                    raise RuntimeError(f"Målingen døde uden resultat (exitcode {proc.exitcode})") from None
+    finally:
+        proc.join()
+
+# ============ BENCHMARKS ============
+def bench_styles(args):
+    """Per-dokument tid med delte stilobjekter vs. stilene bygget forfra for hvert dokument"""
+    faktura, customer = sample_faktura(), sample_customer()
+    rapport, rapport_customer = sample_dagsrapport(), sample_dagsrapport_customer()
+    faktura_gen = fg.FakturaGenerator()
+    rapport_gen = dr.DagsrapportGenerator()
+
+    def build_all_styles():
+        for builder in pdf_styles._STYLE_BUILDERS.values():
+            builder()
+
+    start = time.perf_counter()
+    for _ in range(args.docs):
+        build_all_styles()
+    build_cost = (time.perf_counter() - start) / args.docs
+
+    # Skiftevis cachet/genopbygget, så støj fra GC og CPU-frekvens rammer begge ens
+    faktura_gen.generate(faktura, customer)
+    rapport_gen.generate(rapport, rapport_customer)
+    samples = {"cachet": [], "genopbygget": []}
+    for _ in range(args.docs):
+        for label in samples:
+            start = time.perf_counter()
+            if label == "genopbygget":
+                pdf_styles.clear_style_cache()
+            faktura_gen.generate(faktura, customer)
+            if label == "genopbygget":
+                pdf_styles.clear_style_cache()
+            rapport_gen.generate(rapport, rapport_customer)
+            samples[label].append((time.perf_counter() - start) / 2)
+    results = {label: statistics.median(values) for label, values in samples.items()}
+
+    print(f"Stil-opbygning (alle stile): {_ms(build_cost)} pr. dokument")
+    for label, per_doc in results.items():
+        print(f"{label:>12}: {_ms(per_doc)} pr. dokument (median)")
+    saved = results["genopbygget"] - results["cachet"]
+    print(f"{'besparelse':>12}: {_ms(saved)} pr. dokument ({saved / results['genopbygget']:.1%})")
+
+
+def _render_long_faktura(line_count: int, deferred_page_count: bool):
+    generator = fg.FakturaGenerator(deferred_page_count=deferred_page_count)
+    pdf = generator.generate(sample_faktura(line_count), sample_customer())
+    return len(pdf), count_pages(pdf)
+
+def bench_pages(args):
+    """Peak RSS og tid for en lang faktura med gemte sidetilstande vs. udskudt sidetotal"""
+    line_count = args.pages * LINES_PER_PAGE
+    deferred_rss = None
+    for label, deferred in (("gemte sider", False), ("udskudt total", True)):
+        (size, pages), elapsed, rss = run_isolated(_render_long_faktura, line_count, deferred)
+        print(f"{label:>14}: {pages} sider, {elapsed:6.2f} s, {size / 1024:8.1f} KB, peak RSS {rss:6.1f} MB")
+        if deferred:
+            deferred_rss = rss
+    if args.max_rss_mb and deferred_rss > args.max_rss_mb:
+        print(f"FEJL: peak RSS {deferred_rss:.1f} MB overstiger loftet på {args.max_rss_mb} MB")
+        sys.exit(1)
+
+def bench_lines(args):
+    """Render-tid for én stor linjetabel vs. chunkede tabeller ved stigende antal linjer"""
+    customer = sample_customer()
+    variants = (
+        ("én tabel", fg.FakturaGenerator(large_invoice_threshold=sys.maxsize)),
+        ("chunket", fg.FakturaGenerator(large_invoice_threshold=0)),
+    )
+    print(f"{'linjer':>8} " + " ".join(f"{label:>12}" for label, _ in variants))
+    for size in args.sizes:
+        faktura = sample_faktura(size)
+        cells = []
+        for label, generator in variants:
+            if label == "én tabel" and size > args.max_single:
+                cells.append(f"{'-':>12}")
+                continue
+            start = time.perf_counter()
+            generator.generate(faktura, customer)
+            cells.append(f"{time.perf_counter() - start:10.2f} s")
+        print(f"{size:>8} " + " ".join(cells))
+
+def bench_furniture(args):
+    """Tid og bytes pr. side for betalingsinfo + sidefod: tegnet pr. side vs. kompileret form XObject"""
+    for label, compiled in (("pr. side", False), ("kompileret", True)):
+        buffer = BytesIO()
+        canv = fg.FakturaCanvas(buffer, pagesize=A4, invoice_number="2025-0042", compiled_furniture=compiled)
+        draw_times = []
+        for _ in range(args.pages):
+            start = time.perf_counter()
+            canv.draw_payment_info()
+            canv.draw_footer(args.pages)
+            draw_times.append(time.perf_counter() - start)
+            canvas.Canvas.showPage(canv)
+        draw_time = statistics.median(draw_times)
+        if canv._uses_furniture_forms:
+            canv._define_furniture_forms()
+        canvas.Canvas.save(canv)
+        print(f"{label:>10}: {draw_time * 1e6:8.1f} µs pr. side (median over {args.pages} sider), "
+              f"{len(buffer.getvalue()) / args.pages:7.1f} bytes pr. side")
+
+        faktura = sample_faktura(args.pages * LINES_PER_PAGE)
+        generator = fg.FakturaGenerator(compiled_furniture=compiled)
+        start = time.perf_counter()
+        pdf = generator.generate(faktura, sample_customer())
+        elapsed = time.perf_counter() - start
+        small = generator.generate(sample_faktura(), sample_customer())
+        print(f"{'':>10}  faktura: {count_pages(pdf)} sider på {elapsed:.2f} s, {len(pdf) / 1024:.1f} KB; "
+              f"1-sides faktura {len(small)} bytes")
+
+class _FirstByteProbe(BytesIO):
+    """Husker tidspunktet for første write() - første byte en klient ville modtage"""
+    first_write = None
+
+    def write(self, data):
+        if self.first_write is None and data:
+            self.first_write = time.perf_counter()
+        return BytesIO.write(self, data)
+
+def bench_streaming(args):
+    """Tid til første byte: hele PDF'en i save() vs. hver side skrevet når den er lagt ud"""
+    for line_count in args.sizes:
+        faktura = sample_faktura(line_count)
+        for label, streaming in (("buffered", False), ("streaming", True)):
+            probe = _FirstByteProbe()
+            start = time.perf_counter()
+            fg.FakturaGenerator(deferred_page_count=True, streaming=streaming).generate_to(probe, faktura,
+                                                                                           sample_customer())
+            elapsed = time.perf_counter() - start
+            print(f"{line_count:>7} linjer {label:>9}: første byte {(probe.first_write - start) * 1000:8.1f} ms, "
+                  f"færdig {elapsed * 1000:8.1f} ms, {count_pages(probe.getvalue())} sider")
+
+# Bitstream Vera følger med ReportLab - så kan benchmarken køre uden andre fonte
+VERA_DIR = os.path.join(os.path.dirname(reportlab.__file__), "fonts")
+
+def bench_fonts(args):
+    """Indbygget Helvetica vs. indlejret TTF (subset): parsing, render-tid og størrelse"""
+    regular, bold = os.path.join(VERA_DIR, "Vera.ttf"), os.path.join(VERA_DIR, "VeraBd.ttf")
+    start = time.perf_counter()
+    TTFont("VeraParse", regular)
+    TTFont("VeraParseBold", bold)
+    parse_time = time.perf_counter() - start
+    fonts = pdf_fonts.register_ttf_family("Vera", regular, bold)
+    start = time.perf_counter()
+    pdf_fonts.register_ttf_family("Vera", regular, bold)
+    cached_time = time.perf_counter() - start
+    print(f"parsing af 2 TTF-filer ({(os.path.getsize(regular) + os.path.getsize(bold)) / 1024:.0f} KB): "
+          f"{parse_time * 1000:.2f} ms - fra cachen: {cached_time * 1e6:.1f} µs")
+
+    customer = sample_customer()
+    cases = [
+        ("faktura 1 side", lambda f: fg.FakturaGenerator(fonts=f).generate(sample_faktura(), customer)),
+        ("faktura 40 sider", lambda f: fg.FakturaGenerator(fonts=f).generate(sample_faktura(40 * LINES_PER_PAGE),
+                                                                            customer)),
+        ("dagsrapport", lambda f: dr.DagsrapportGenerator(fonts=f).generate(sample_dagsrapport(),
+                                                                           sample_dagsrapport_customer())),
+    ]
+    for label, render in cases:
+        for font_label, family in (("Helvetica", pdf_fonts.BUILTIN_FONTS), ("Vera TTF", fonts)):
+            docs = args.docs if "40" not in label else max(3, args.docs // 10)
+            times = []
+            for _ in range(docs):
+                start = time.perf_counter()
+                pdf = render(family)
+                times.append(time.perf_counter() - start)
+            print(f"{label:>16} {font_label:>9}: {statistics.median(times) * 1000:8.2f} ms, {len(pdf) / 1024:7.1f} KB")
+
+def _invariant_hashes(line_count: int, deferred_page_count: bool):
+    faktura = fg.FakturaGenerator(invariant=True, deferred_page_count=deferred_page_count)
+    rapport = dr.DagsrapportGenerator(invariant=True, deferred_page_count=deferred_page_count)
+    return (
+        hashlib.sha256(faktura.generate(sample_faktura(line_count), sample_customer())).hexdigest(),
+        hashlib.sha256(rapport.generate(sample_dagsrapport(), sample_dagsrapport_customer())).hexdigest(),
+    )
+
+def bench_determinism(args):
+    """Tjekker at invariant=True giver samme SHA-256 på tværs af kørsler i hver sin proces"""
+    failed = False
+    for deferred in (False, True):
+        hashes = set()
+        for _ in range(args.runs):
+            result, _, _ = run_isolated(_invariant_hashes, args.lines, deferred)
+            hashes.add(result)
+            time.sleep(args.pause)
+        stable = len(hashes) == 1
+        failed |= not stable
+        faktura_hash, rapport_hash = sorted(hashes)[0]
+        mode = "udskudt total" if deferred else "gemte sider"
+        print(f"{mode:>14}: {'stabil' if stable else 'USTABIL'} - faktura {faktura_hash[:16]}, dagsrapport {rapport_hash[:16]}")
+    if failed:
+        sys.exit(1)
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# Kører i en frisk interpreter: import, første og anden rendering af ét dokument
+_COLD_START_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+imported = time.perf_counter()
+import benchmark
+render = benchmark.{render}
+rendering = time.perf_counter()
+render()
+first = time.perf_counter()
+render()
+second = time.perf_counter()
+print(json.dumps({{"import": imported - start, "first": first - rendering, "second": second - first}}))
+"""
+
+def _render_sample_faktura():
+    fg.generate_faktura(sample_faktura(), sample_customer())
+
+def _render_sample_dagsrapport():
+    dr.generate_dagsrapport(sample_dagsrapport(), sample_dagsrapport_customer())
+
+STARTUP_JOBS = {
+    "faktura_generator": {
+        "type": "faktura",
+        "faktura": {"invoice_number": "2025-0042", "invoice_date": "2025-12-31",
+                    "lines": [{"description": "Abonnement", "quantity": 1, "unit": "måned", "unit_price": 799.0}]},
+        "customer": {"company_name": "Restaurant Bella Vista ApS", "cvr": "87654321",
+                     "address": "Nørrebrogade 45", "postal_city": "2200 København N"},
+    },
+    "dagsrapport_generator": {
+        "type": "dagsrapport",
+        "rapport": {"report_date": "2025-12-31", "opened_time": "2025-12-31T08:14", "closed_time": "2025-12-31T21:14",
+                    "opened_by": "Medarbejder", "document_number": "DOC-2025-524408", "gross_revenue": 438412.24,
+                    "discounts": 1215.24, "total_revenue": 437197.0, "vat_collected": 87439.4,
+                    "sale_excl_vat": 349757.6, "payment_breakdown": {"cash_sale": 48140.24}},
+        "customer": {"company_name": "Restaurant Bella Vista ApS", "cvr": "87654321",
+                     "address": "Nørrebrogade 45", "postal_city": "2200 København N"},
+    },
+}
+
+def _worker_first_job(job: dict) -> float:
+    """Starter worker.py, venter til den er varm og måler rundturen for det første job"""
+    proc = subprocess.Popen([sys.executable, os.path.join(HERE, "worker.py")], cwd=HERE, text=True,
+                            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    try:
+        proc.stderr.readline()  # "worker klar"
+        start = time.perf_counter()
+        proc.stdin.write(json.dumps(job) + "\n")
+        proc.stdin.flush()
+        result = json.loads(proc.stdout.readline())
+        elapsed = time.perf_counter() - start
+        if not result["ok"]:
+            raise RuntimeError(result["error"])
+        return elapsed
+    finally:
+        proc.stdin.close()
+        proc.wait()
+
+def bench_startup(args):
+    """Kold start (import + første rendering) vs. første job i en opvarmet worker"""
+    renders = {"faktura_generator": "_render_sample_faktura", "dagsrapport_generator": "_render_sample_dagsrapport"}
+    for module, render in renders.items():
+        cold = []
+        for _ in range(args.runs):
+            out = subprocess.run([sys.executable, "-c", _COLD_START_SCRIPT.format(module=module, render=render)],
+                                 cwd=HERE, capture_output=True, text=True, check=True)
+            cold.append(json.loads(out.stdout))
+        warm = [_worker_first_job(STARTUP_JOBS[module]) for _ in range(args.runs)]
+        imported = statistics.median(run["import"] for run in cold)
+        first = statistics.median(run["first"] for run in cold)
+        second = statistics.median(run["second"] for run in cold)
+        print(f"{module}:")
+        print(f"  import:              {_ms(imported)}")
+        print(f"  første rendering:    {_ms(first)}")
+        print(f"  anden rendering:     {_ms(second)}")
+        print(f"  kold i alt:          {_ms(imported + first)}")
+        print(f"  varm worker, 1. job: {_ms(statistics.median(warm))} (rundtur inkl. JSON)")
+
+def _line_memory(line_count: int, columnar: bool, render: bool):
+    """Bytes allokeret til linjerne, tid for totaler og evt. rendering - kører i en frisk proces"""
+    units = ("stk", "kald", "pakke", "måned")
+    tracemalloc.start()
+    # Tekster bygges pr. linje som ved JSON-parsing, så ens beskrivelser er forskellige objekter
+    lines = (fg.InvoiceLine(f"Levering ordre #{i % 500}", 1 + i % 3, "".join(units[i % 4]), 49.0 + i % 7)
+             for i in range(line_count))
+    lines = fg.InvoiceLineColumns(lines) if columnar else list(lines)
+    allocated, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    faktura = sample_faktura(0)
+    faktura.lines = lines
+    start = time.perf_counter()
+    faktura.totals
+    totals_time = time.perf_counter() - start
+    render_time = None
+    if render:
+        start = time.perf_counter()
+        fg.generate_faktura(faktura, sample_customer())
+        render_time = time.perf_counter() - start
+    return allocated, totals_time, render_time
+
+def bench_memory(args):
+    """Hukommelse for fakturalinjer som liste af dataklasser vs. InvoiceLineColumns"""
+    for label, columnar in (("dataklasser", False), ("kolonner", True)):
+        (allocated, totals_time, render_time), _, rss = run_isolated(_line_memory, args.lines, columnar, args.render)
+        line = (f"{label:>12}: {allocated / 1024 / 1024:7.2f} MB ({allocated / args.lines:6.1f} bytes/linje), "
+                f"totaler {_ms(totals_time)}")
+        if render_time is not None:
+            line += f", rendering {render_time:6.2f} s"
+        print(line + f", peak RSS {rss:6.1f} MB")
+
+def sample_orders(count: int):
+    """Syntetiske ordrer som dicts (som fra JSON) spredt over en åbningsdag"""
+    opened = datetime(2025, 12, 31, 8, 0)
+    for i in range(count):
+        card = i % 5 != 0
+        yield {
+            "order_id": f"ORD-{i}",
+            "closed_at": datetime.fromtimestamp(opened.timestamp() + i * 46800 / max(count, 1)).isoformat(),
+            "gross_amount": 89.0 + (i % 40) * 12.5,
+            "discount": 10.0 if i % 11 == 0 else 0.0,
+            "payment_method": "CARD" if card else "CASH",
+            "surcharge": 1.25 if card else 0.0,
+            "tips": 20.0 if i % 7 == 0 else 0.0,
+        }
+
+def _aggregate_orders(count: int):
+    def aggregate():
+        return da.aggregate_dagsrapport(sample_orders(count), opened_by="Medarbejder", document_number="DOC-1")
+
+    start = time.perf_counter()
+    rapport = aggregate()
+    elapsed = time.perf_counter() - start
+    # Separat kørsel til hukommelsen - tracemalloc gør alt flere gange langsommere
+    tracemalloc.start()
+    aggregate()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return rapport.total_revenue, elapsed, peak
+
+def bench_aggregate(args):
+    """Streaming-aggregering af ordrer til DagsrapportData: tid og peak-allokering"""
+    for count in args.orders:
+        (total, elapsed, peak), _, _ = run_isolated(_aggregate_orders, count)
+        print(f"{count:>8} ordrer: {elapsed:6.3f} s ({elapsed / count * 1e6:5.1f} µs/ordre), "
+              f"peak {peak / 1024:7.1f} KB, omsætning {dr.fmt_currency(total)}")
+
+def sample_locations(count: int):
+    for i in range(count):
+        customer = sample_dagsrapport_customer()
+        customer.company_name = f"Restaurant {i:04d} ApS"
+        customer.cvr = f"{10000000 + i}"
+        yield sample_dagsrapport(f"DOC-2025-{i:06d}"), customer
+
+def bench_bulk(args):
+    """Dagslukning: ét kald pr. lokation i træk vs. generate_dagsrapport_bulk til mappe og ZIP"""
+    tmp = tempfile.mkdtemp(prefix="orderflow-bulk-")
+    try:
+        start = time.perf_counter()
+        for rapport, customer in sample_locations(args.locations):
+            dr.generate_dagsrapport_to(os.path.join(tmp, dr.dagsrapport_filename(rapport, customer)), rapport, customer)
+        sequential = time.perf_counter() - start
+        print(f"{'i træk':>8}: {sequential:6.2f} s ({args.locations / sequential:6.1f} rapporter/s)")
+
+        for label, target in (("mappe", {"output_dir": os.path.join(tmp, "bulk")}),
+                              ("zip", {"zip_path": os.path.join(tmp, "bulk.zip")})):
+            start = time.perf_counter()
+            manifest = dr.generate_dagsrapport_bulk(sample_locations(args.locations), max_workers=args.workers, **target)
+            elapsed = time.perf_counter() - start
+            size = os.path.getsize(target["zip_path"]) if "zip_path" in target else manifest["bytes"]
+            print(f"{label:>8}: {elapsed:6.2f} s ({args.locations / elapsed:6.1f} rapporter/s), "
+                  f"{size / 1024:8.1f} KB, {manifest['failed']} fejl")
+    finally:
+        shutil.rmtree(tmp)
+
+def bench_profiles(args):
+    """Output-profiler: render-tid og størrelse for standard, arkiv og PDF/A"""
+    vera = pdf_fonts.register_ttf_family("Vera", os.path.join(VERA_DIR, "Vera.ttf"),
+                                         os.path.join(VERA_DIR, "VeraBd.ttf"))
+    profiles = [
+        ("standard", pdf_output.STANDARD_PROFILE, pdf_fonts.BUILTIN_FONTS),
+        ("arkiv", pdf_output.ARCHIVE_PROFILE, pdf_fonts.BUILTIN_FONTS),
+        ("arkiv niveau 6", replace(pdf_output.ARCHIVE_PROFILE, compress_level=6), pdf_fonts.BUILTIN_FONTS),
+        ("pdfa (Vera)", pdf_output.PDFA_PROFILE, vera),
+    ]
+    customer = sample_customer()
+    cases = [
+        ("faktura 1 side", 1, lambda p, f: fg.FakturaGenerator(output_profile=p, fonts=f).generate(
+            sample_faktura(), customer)),
+        ("faktura 10 sider", 10, lambda p, f: fg.FakturaGenerator(output_profile=p, fonts=f).generate(
+            sample_faktura(10 * LINES_PER_PAGE), customer)),
+        ("faktura 40 sider", 40, lambda p, f: fg.FakturaGenerator(output_profile=p, fonts=f).generate(
+            sample_faktura(40 * LINES_PER_PAGE), customer)),
+        ("dagsrapport", 1, lambda p, f: dr.DagsrapportGenerator(output_profile=p, fonts=f).generate(
+            sample_dagsrapport(), sample_dagsrapport_customer())),
+    ]
+    for label, pages, render in cases:
+        docs = max(3, args.docs // pages)
+        for profile_label, profile, fonts in profiles:
+            render(profile, fonts)  # Opvarmning
+            times = []
+            for _ in range(docs):
+                start = time.perf_counter()
+                pdf = render(profile, fonts)
+                times.append(time.perf_counter() - start)
+            print(f"{label:>16} {profile_label:>14}: {statistics.median(times) * 1000:8.2f} ms, "
+                  f"{len(pdf) / 1024:7.1f} KB")
+
+def bench_archive(args):
+    """PDF-arkiv: tilføjelse, indlæsning af indekset og opslag vs. ny rendering"""
+    faktura, customer = sample_faktura(), sample_customer()
+    generator = fg.FakturaGenerator()
+    pdf = generator.generate(faktura, customer)
+    directory = tempfile.mkdtemp(prefix="orderflow-arkiv-")
+    try:
+        with pdf_archive.PDFArchive(directory, sync=False) as archive:
+            start = time.perf_counter()
+            for i in range(args.docs):
+                archive.append(f"2025-{i:07d}", f"{10000000 + i % 5000}", date.fromordinal(739000 + i % 730), pdf)
+            elapsed = time.perf_counter() - start
+            print(f"tilføjet {args.docs} PDF'er ({len(pdf) / 1024:.1f} KB) uden fsync: "
+                  f"{elapsed / args.docs * 1e6:.1f} µs pr. stk")
+            archive.sync = True
+            start = time.perf_counter()
+            for i in range(100):
+                archive.append(f"2026-{i:07d}", "10000000", date.fromordinal(739730), pdf)
+            print(f"tilføjet 100 PDF'er med fsync: {(time.perf_counter() - start) / 100 * 1e6:.1f} µs pr. stk")
+
+        start = time.perf_counter()
+        archive = pdf_archive.PDFArchive(directory)
+        print(f"indlæsning af indeks med {len(archive)} poster: {_ms(time.perf_counter() - start)}")
+        numbers = [f"2025-{i:07d}" for i in range(0, args.docs, max(1, args.docs // 1000))]
+        start = time.perf_counter()
+        for number in numbers:
+            view = archive.get(number)
+        lookup = (time.perf_counter() - start) / len(numbers)
+        print(f"opslag på nummer + mmap-view: {lookup * 1e6:.1f} µs ({len(view)} bytes)")
+        start = time.perf_counter()
+        entries = archive.between(date.fromordinal(739100), date.fromordinal(739106))
+        print(f"datointerval (7 dage, {len(entries)} poster): {_ms(time.perf_counter() - start)}")
+        start = time.perf_counter()
+        entries = archive.for_customer("10000042")
+        print(f"kundeopslag ({len(entries)} poster): {_ms(time.perf_counter() - start)}")
+        times = []
+        for _ in range(20):
+            start = time.perf_counter()
+            generator.generate(faktura, customer)
+            times.append(time.perf_counter() - start)
+        print(f"ny rendering til sammenligning: {statistics.median(times) * 1000:.2f} ms")
+        archive.close()
+    finally:
+        shutil.rmtree(directory)
+
+# ============ LOADGENERATOR TIL service.py ============
+async def _http_request(reader, writer, method: str, path: str, body: bytes = b""):
+    writer.write(f"{method} {path} HTTP/1.1\r\nHost: localhost\r\nContent-Type: application/json\r\n"
+                 f"Content-Length: {len(body)}\r\n\r\n".encode("latin-1") + body)
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        if name.lower() == "content-length":
+            length = int(value)
+    return status, await reader.readexactly(length)
+
+async def _load_client(host: str, port: int, jobs, latencies: list, statuses: Dict[int, int]):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        for path, body in jobs:
+            start = time.perf_counter()
+            status, _ = await _http_request(reader, writer, "POST", path, body)
+            latencies.append(time.perf_counter() - start)
+            statuses[status] = statuses.get(status, 0) + 1
+    finally:
+        writer.close()
+
+async def _run_load(host: str, port: int, requests: int, concurrency: int):
+    faktura_job = json.dumps({k: v for k, v in STARTUP_JOBS["faktura_generator"].items() if k != "type"}).encode()
+    rapport_job = json.dumps({k: v for k, v in STARTUP_JOBS["dagsrapport_generator"].items() if k != "type"}).encode()
+    # Hver 4. forespørgsel er en dagsrapport
+    jobs = iter([("/dagsrapport", rapport_job) if i % 4 == 3 else ("/faktura", faktura_job) for i in range(requests)])
+    latencies, statuses = [], {}
+    start = time.perf_counter()
+    await asyncio.gather(*(_load_client(host, port, jobs, latencies, statuses) for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    reader, writer = await asyncio.open_connection(host, port)
+    _, metrics = await _http_request(reader, writer, "GET", "/metrics")
+    writer.close()
+    return elapsed, latencies, statuses, json.loads(metrics)
+
+def bench_service(args):
+    """Loadgenerator: samtidige klienter mod service.py - throughput, latens og afviste forespørgsler"""
+    proc = None
+    if not args.no_spawn:
+        command = [sys.executable, os.path.join(HERE, "service.py"), "--port", str(args.port), "--queue", str(args.queue)]
+        if args.workers:
+            command += ["--workers", str(args.workers)]
+        proc = subprocess.Popen(command, cwd=HERE, stderr=subprocess.PIPE, text=True)
+        ready = proc.stderr.readline().strip()
+        if not ready.startswith("service klar"):
+            # Fx porten er optaget - vis fejlen i stedet for at vente på en service der ikke kører
+            proc.kill()
+            raise SystemExit(ready + proc.stderr.read())
+        print(ready)
+    try:
+        elapsed, latencies, statuses, metrics = asyncio.run(_run_load("127.0.0.1", args.port, args.requests, args.concurrency))
+    finally:
+        if proc:
+            proc.terminate()
+            proc.wait()
+    cuts = statistics.quantiles(latencies, n=100)
+    print(f"{args.requests} forespørgsler, {args.concurrency} samtidige: {elapsed:.2f} s, "
+          f"{statuses.get(200, 0) / elapsed:.1f} PDF'er/s")
+    print(f"  latens p50 {cuts[49] * 1000:.1f} ms, p95 {cuts[94] * 1000:.1f} ms, p99 {cuts[98] * 1000:.1f} ms")
+    print(f"  statuskoder: {dict(sorted(statuses.items()))}")
+    print(f"  service: render p50 {metrics['render_ms']['p50']} ms, afvist {metrics['rejected']}, fejlet {metrics['failed']}")
+
+
+# ============ SUITE MED REGRESSIONSTJEK ============
+SUITE_LINE_COUNTS = (10, 100, 1000, 5000)
+SUITE_BATCH_SIZE = 200
+SUITE_RSS_PAGES = 200
+
+def _median_seconds(func: Callable[[], object], runs: int) -> float:
+    func()  # Opvarmning: skrifttyper, stilcache, metrik
+    samples = []
+    for _ in range(runs):
+        gc.collect()
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+def _metric(value: float, unit: str, better: str = "lower") -> dict:
+    return {"value": round(value, 3), "unit": unit, "better": better}
+
+def run_suite(runs: int = 15, quick: bool = False) -> dict:
+    """Faste syntetiske målinger - samme navne og input fra kørsel til kørsel"""
+    customer = sample_customer()
+    generator = fg.FakturaGenerator()
+    metrics = {}
+
+    faktura = sample_faktura()
+    metrics["faktura.single_ms"] = _metric(_median_seconds(lambda: generator.generate(faktura, customer), runs) * 1000, "ms")
+
+    line_counts = SUITE_LINE_COUNTS[:3] if quick else SUITE_LINE_COUNTS
+    for line_count in line_counts:
+        faktura = sample_faktura(line_count)
+        # Færre gentagelser for de store fakturaer, så suiten holder sig på sekunder
+        seconds = _median_seconds(lambda: generator.generate(faktura, customer), max(3, min(runs, runs * 100 // line_count)))
+        metrics[f"faktura.lines_{line_count}_ms"] = _metric(seconds * 1000, "ms")
+
+    rapport, rapport_customer = sample_dagsrapport(), sample_dagsrapport_customer()
+    rapport_generator = dr.DagsrapportGenerator()
+    metrics["dagsrapport.single_ms"] = _metric(
+        _median_seconds(lambda: rapport_generator.generate(rapport, rapport_customer), runs) * 1000, "ms")
+
+    batch_size = SUITE_BATCH_SIZE // 4 if quick else SUITE_BATCH_SIZE
+    items = [(sample_faktura(8, f"2025-{i:05d}"), customer) for i in range(batch_size)]
+    start = time.perf_counter()
+    failed = sum(isinstance(pdf, Exception) for _, pdf in fg.generate_faktura_batch(items))
+    if failed:
+        raise RuntimeError(f"{failed} fakturaer fejlede i batch-målingen")
+    metrics["batch.faktura_per_s"] = _metric(batch_size / (time.perf_counter() - start), "doc/s", "higher")
+
+    pages = SUITE_RSS_PAGES // 4 if quick else SUITE_RSS_PAGES
+    _, _, rss = run_isolated(_render_long_faktura, pages * LINES_PER_PAGE, True)
+    metrics[f"rss.faktura_{pages}_pages_mb"] = _metric(rss, "MB")
+
+    return {
+        "meta": {
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "reportlab": reportlab.Version,
+            "machine": platform.machine(),
+            "system": platform.system(),
+            "cpu_count": os.cpu_count(),
+            "runs": runs,
+            "quick": quick,
+        },
+        "metrics": metrics,
+    }
+
+def compare_results(baseline: dict, current: dict, threshold: float):
+    """(navn, baseline, nu, relativ ændring, regression?) for hver måling i begge resultater"""
+    rows = []
+    for name, base in baseline["metrics"].items():
+        now = current["metrics"].get(name)
+        if now is None or not base["value"]:
+            continue
+        change = (now["value"] - base["value"]) / base["value"]
+        worse = change if base.get("better", "lower") == "lower" else -change
+        rows.append((name, base, now, change, worse > threshold))
+    return rows
+
+def _write_json(result: dict, path):
+    text = json.dumps(result, indent=2, ensure_ascii=False)
+    if path:
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+def bench_suite(args):
+    """Fast sæt målinger (latens, skalering, batch, peak RSS) som JSON"""
+    _write_json(run_suite(args.runs, args.quick), args.output)
+
+def bench_compare(args):
+    """Sammenligner med en gemt baseline - exit 1 hvis en måling er blevet mere end --threshold værre"""
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+    if args.current:
+        with open(args.current, encoding="utf-8") as f:
+            current = json.load(f)
+    else:
+        current = run_suite(baseline["meta"].get("runs", 15), baseline["meta"].get("quick", False))
+        if args.output:
+            _write_json(current, args.output)
+    if baseline["meta"].get("cpu_count") != current["meta"].get("cpu_count"):
+        print("Bemærk: baseline er målt med et andet antal CPU'er - batch-tallet er ikke sammenligneligt")
+
+    regressions = 0
+    for name, base, now, change, regressed in compare_results(baseline, current, args.threshold):
+        regressions += regressed
+        flag = "REGRESSION" if regressed else ""
+        print(f"{name:<28} {base['value']:>10.3f} -> {now['value']:>10.3f} {now['unit']:<6} {change:+7.1%} {flag}")
+    if regressions:
+        print(f"FEJL: {regressions} måling(er) mere end {args.threshold:.0%} værre end baseline")
+        sys.exit(1)
+
+
+BENCHMARKS: Dict[str, Callable] = {
+    "styles": bench_styles,
+    "pages": bench_pages,
+    "lines": bench_lines,
+    "furniture": bench_furniture,
+    "streaming": bench_streaming,
+    "fonts": bench_fonts,
+    "profiles": bench_profiles,
+    "archive": bench_archive,
+    "determinism": bench_determinism,
+    "startup": bench_startup,
+    "memory": bench_memory,
+    "aggregate": bench_aggregate,
+    "bulk": bench_bulk,
+    "service": bench_service,
+    "suite": bench_suite,
+    "compare": bench_compare,
+}
+
+# ============ HOVEDFUNKTION ============
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks for OrderFlow PDF-generatorerne")
+    sub = parser.add_subparsers(dest="benchmark", required=True)
+
+    styles = sub.add_parser("styles", help=bench_styles.__doc__)
+    styles.add_argument("--docs", type=int, default=200)
+
+    pages = sub.add_parser("pages", help=bench_pages.__doc__)
+    pages.add_argument("--pages", type=int, default=500)
+    pages.add_argument("--max-rss-mb", type=float, default=None,
+                       help="fejl (exit 1) hvis udskudt-total-tilstanden overstiger dette loft")
+
+    lines = sub.add_parser("lines", help=bench_lines.__doc__)
+    lines.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000, 50000])
+    lines.add_argument("--max-single", type=int, default=20000,
+                       help="spring én-tabel-varianten over over dette antal linjer (den er superlineær)")
+
+    furniture = sub.add_parser("furniture", help=bench_furniture.__doc__)
+    furniture.add_argument("--pages", type=int, default=200)
+
+    streaming = sub.add_parser("streaming", help=bench_streaming.__doc__)
+    streaming.add_argument("--sizes", type=int, nargs="+", default=[10, 1000, 10000])
+
+    fonts = sub.add_parser("fonts", help=bench_fonts.__doc__)
+    fonts.add_argument("--docs", type=int, default=50)
+
+    profiles = sub.add_parser("profiles", help=bench_profiles.__doc__)
+    profiles.add_argument("--docs", type=int, default=50)
+
+    archive = sub.add_parser("archive", help=bench_archive.__doc__)
+    archive.add_argument("--docs", type=int, default=100000)
+
+    determinism = sub.add_parser("determinism", help=bench_determinism.__doc__)
+    determinism.add_argument("--runs", type=int, default=3)
+    determinism.add_argument("--lines", type=int, default=300)
+    determinism.add_argument("--pause", type=float, default=1.0,
+                             help="sekunder mellem kørsler, så et tidsstempel ville nå at ændre sig")
+
+    startup = sub.add_parser("startup", help=bench_startup.__doc__)
+    startup.add_argument("--runs", type=int, default=5)
+
+    memory = sub.add_parser("memory", help=bench_memory.__doc__)
+    memory.add_argument("--lines", type=int, default=100000)
+    memory.add_argument("--render", action="store_true", help="render også fakturaen (tager sekunder)")
+
+    aggregate = sub.add_parser("aggregate", help=bench_aggregate.__doc__)
+    aggregate.add_argument("--orders", type=int, nargs="+", default=[10000, 100000])
+
+    bulk = sub.add_parser("bulk", help=bench_bulk.__doc__)
+    bulk.add_argument("--locations", type=int, default=200)
+    bulk.add_argument("--workers", type=int, default=None)
+
+    service = sub.add_parser("service", help=bench_service.__doc__)
+    service.add_argument("--requests", type=int, default=500)
+    service.add_argument("--concurrency", type=int, default=16)
+    service.add_argument("--port", type=int, default=8765)
+    service.add_argument("--workers", type=int, default=None)
+    service.add_argument("--queue", type=int, default=64)
+    service.add_argument("--no-spawn", action="store_true", help="start ikke service.py - brug en der allerede kører")
+
+    suite = sub.add_parser("suite", help=bench_suite.__doc__)
+    suite.add_argument("--runs", type=int, default=15)
+    suite.add_argument("--quick", action="store_true", help="færre linjer, sider og fakturaer (til CI)")
+    suite.add_argument("--output", help="skriv JSON hertil i stedet for stdout")
+
+    compare = sub.add_parser("compare", help=bench_compare.__doc__)
+    compare.add_argument("baseline")
+    compare.add_argument("current", nargs="?", help="gemt resultat - udelades køres suiten nu")
+    compare.add_argument("--threshold", type=float, default=0.10, help="tilladt forværring, relativt (0.10 = 10%%)")
+    compare.add_argument("--output", help="gem den nye kørsel her")
+
+    args = parser.parse_args(argv)
+    BENCHMARKS[args.benchmark](args)
+
+
+if __name__ == "__main__":
+    main()
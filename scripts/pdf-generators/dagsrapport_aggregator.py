@@ -0,0 +1,177 @@
+"""
+OrderFlow dagsrapport-aggregering - DagsrapportData direkte fra dagens ordrer
+
+Ordrerne læses i ét gennemløb og summeres i hele øre, så hukommelsen er
+konstant uanset antal ordrer. Moms beregnes én gang pr. momssats på den
+samlede omsætning (beløbene er inkl. moms), ikke pr. ordre.
+
+    rapport = aggregate_dagsrapport(orders, opened_by="Medarbejder", document_number="DOC-1")
+"""
+
+import json
+from dataclasses import dataclass
+from datetime import date, datetime
+from decimal import Decimal, ROUND_HALF_UP
+from enum import Enum
+from typing import Dict, Iterable, Iterator, Optional, Union
+
+from dagsrapport_generator import DagsrapportData, PaymentBreakdown
+from pdf_schema import (SchemaError, field_path, get_field, parse_datetime, parse_enum, parse_number, parse_str,
+                        require_object, require_same_tz)
+
+# ============ ENUMS ============
+class PaymentMethod(Enum):
+    CASH = "Kontant"
+    CARD = "Kort"
+
+# ============ DATA KLASSER ============
+_ORDER_FIELDS = frozenset({"order_id", "closed_at", "gross_amount", "discount", "payment_method", "surcharge",
+                           "tips", "vat_rate"})
+
+@dataclass
+class OrderRecord:
+    order_id: str
+    closed_at: datetime
+    gross_amount: float  # Inkl. moms, før rabat
+    payment_method: PaymentMethod
+    discount: float = 0.0
+    surcharge: float = 0.0  # Kortgebyr - ikke en del af omsætningen
+    tips: float = 0.0
+    vat_rate: float = 25.0
+
+    @classmethod
+    def from_dict(cls, data: dict, path: str = "order") -> "OrderRecord":
+        data = require_object(data, path, _ORDER_FIELDS)
+        gross_amount = parse_number(get_field(data, "gross_amount", path), field_path(path, "gross_amount"), minimum=0)
+        discount = parse_number(data.get("discount", 0.0), field_path(path, "discount"), minimum=0)
+        if discount > gross_amount:
+            raise SchemaError(field_path(path, "discount"), "er større end gross_amount")
+        return cls(
+            order_id=parse_str(get_field(data, "order_id", path), field_path(path, "order_id")),
+            closed_at=parse_datetime(get_field(data, "closed_at", path), field_path(path, "closed_at")),
+            gross_amount=gross_amount,
+            payment_method=parse_enum(PaymentMethod, get_field(data, "payment_method", path),
+                                      field_path(path, "payment_method")),
+            discount=discount,
+            surcharge=parse_number(data.get("surcharge", 0.0), field_path(path, "surcharge"), minimum=0),
+            tips=parse_number(data.get("tips", 0.0), field_path(path, "tips"), minimum=0),
+            vat_rate=parse_number(data.get("vat_rate", 25.0), field_path(path, "vat_rate"), minimum=0),
+        )
+
+# ============ BELØB ============
+_ORE_CACHE: Dict[float, int] = {}
+
+def to_ore(amount) -> int:
+    """Beløb i kroner som hele øre - via str(), så 0.285 ikke bliver 28.4999..."""
+    ore = _ORE_CACHE.get(amount)
+    if ore is None:
+        ore = int((Decimal(str(amount)) * 100).quantize(Decimal(1), rounding=ROUND_HALF_UP))
+        # Priser gentager sig - men cachen må ikke vokse med antal ordrer
+        if len(_ORE_CACHE) < 4096:
+            _ORE_CACHE[amount] = ore
+    return ore
+
+def vat_of_gross(gross_ore: int, vat_rate: float) -> int:
+    """Momsandelen af et beløb inkl. moms, afrundet til hele øre"""
+    rate = Decimal(str(vat_rate))
+    return int((gross_ore * rate / (100 + rate)).quantize(Decimal(1), rounding=ROUND_HALF_UP))
+
+# ============ AGGREGERING ============
+class DagsrapportAggregator:
+    """Løbende summer for én dag - add() pr. ordre, result() til sidst"""
+
+    def __init__(self):
+        self.order_count = 0
+        self.first_order: Optional[datetime] = None
+        self.last_order: Optional[datetime] = None
+        self.gross = 0
+        self.discounts = 0
+        self.cash = 0
+        self.card = 0
+        self.surcharge = 0
+        self.tips = 0
+        # Omsætning efter rabat pr. momssats - én post pr. sats, ikke pr. ordre
+        self.revenue_by_rate: Dict[float, int] = {}
+
+    def add(self, order: OrderRecord, path: str = "order"):
+        # Hurtig vej: samme tzinfo-objekt (typisk None) kan altid sammenlignes
+        if self.first_order is not None and order.closed_at.tzinfo is not self.first_order.tzinfo:
+            require_same_tz(order.closed_at, self.first_order, field_path(path, "closed_at"))
+        gross = to_ore(order.gross_amount)
+        discount = to_ore(order.discount)
+        revenue = gross - discount
+        self.gross += gross
+        self.discounts += discount
+        if order.payment_method is PaymentMethod.CASH:
+            self.cash += revenue
+        else:
+            self.card += revenue
+        if order.surcharge:
+            self.surcharge += to_ore(order.surcharge)
+        if order.tips:
+            self.tips += to_ore(order.tips)
+        self.revenue_by_rate[order.vat_rate] = self.revenue_by_rate.get(order.vat_rate, 0) + revenue
+
+        self.order_count += 1
+        if self.first_order is None or order.closed_at < self.first_order:
+            self.first_order = order.closed_at
+        if self.last_order is None or order.closed_at > self.last_order:
+            self.last_order = order.closed_at
+
+    def extend(self, orders: Iterable[Union[OrderRecord, dict]]):
+        for i, order in enumerate(orders):
+            if isinstance(order, dict):
+                order = OrderRecord.from_dict(order, f"orders[{i}]")
+            self.add(order, f"orders[{i}]")
+
+    def result(self, opened_by: str, document_number: str, report_date: Optional[date] = None,
+               opened_time: Optional[datetime] = None, closed_time: Optional[datetime] = None) -> DagsrapportData:
+        """Åbne-/lukketid er som standard første og sidste ordre"""
+        opened_time = opened_time or self.first_order
+        closed_time = closed_time or self.last_order
+        if opened_time is None or closed_time is None:
+            raise ValueError("Ingen ordrer - angiv opened_time og closed_time")
+        require_same_tz(closed_time, opened_time, "closed_time")
+        revenue = self.cash + self.card
+        vat = sum(vat_of_gross(amount, rate) for rate, amount in self.revenue_by_rate.items())
+        return DagsrapportData(
+            report_date=report_date or opened_time.date(),
+            opened_time=opened_time,
+            closed_time=closed_time,
+            opened_by=opened_by,
+            document_number=document_number,
+            gross_revenue=self.gross / 100,
+            discounts=self.discounts / 100,
+            total_revenue=revenue / 100,
+            vat_collected=vat / 100,
+            sale_excl_vat=(revenue - vat) / 100,
+            payment_breakdown=PaymentBreakdown(
+                cash_sale=self.cash / 100,
+                cash_revenue=self.cash / 100,
+                card_sale=self.card / 100,
+                card_revenue=self.card / 100,
+                surcharge=self.surcharge / 100,
+                tips=self.tips / 100,
+            ),
+        )
+
+# ============ HOVEDFUNKTIONER ============
+def aggregate_dagsrapport(
+    orders: Iterable[Union[OrderRecord, dict]],
+    opened_by: str,
+    document_number: str,
+    report_date: Optional[date] = None,
+    opened_time: Optional[datetime] = None,
+    closed_time: Optional[datetime] = None,
+) -> DagsrapportData:
+    aggregator = DagsrapportAggregator()
+    aggregator.extend(orders)
+    return aggregator.result(opened_by, document_number, report_date, opened_time, closed_time)
+
+
+def iter_order_records(jsonl_path: str) -> Iterator[OrderRecord]:
+    """Læser én ordre pr. linje fra en JSONL-fil uden at holde filen i hukommelsen"""
+    with open(jsonl_path, encoding="utf-8") as f:
+        for line_no, line in enumerate(f, 1):
+            if line.strip():
+                yield OrderRecord.from_dict(json.loads(line), f"linje {line_no}")
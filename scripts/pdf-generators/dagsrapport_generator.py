@@ -4,27 +4,38 @@ OrderFlow Dagsrapport Generator
 
 from reportlab.lib.pagesizes import A4
 from reportlab.lib.units import mm
-from reportlab.lib.styles import ParagraphStyle
-from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_RIGHT
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
-from reportlab.lib.colors import HexColor
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table
 from reportlab.lib import colors
 from reportlab.pdfgen import canvas
+import json
+import os
+import re
+import sys
+import time
+import zipfile
 from io import BytesIO
-from datetime import datetime, date, time
-from typing import Dict, List, Optional
-from dataclasses import dataclass, field
-from enum import Enum
-
-# ============ FARVER ============
-PRIMARY_COLOR = HexColor("#1a1a2e")
-ACCENT_COLOR = HexColor("#0f3460")
-MEDIUM_GRAY = HexColor("#e0e0e0")
-LIGHT_GRAY = HexColor("#f8f9fa")
-TEXT_COLOR = HexColor("#333333")
-HEADER_BLUE = HexColor("#1a365d")
+from datetime import datetime, date
+from typing import BinaryIO, Iterable, Optional, Tuple, Union
+from dataclasses import dataclass
+
+from pdf_batch import BatchItemError, capture_item_error, run_pool
+from pdf_stats import RenderStats, StatsCallback, Stopwatch, build_with_stats, output_position, output_size
+from pdf_schema import (SchemaError, field_path, get_field, parse_date, parse_datetime, parse_number,
+                        parse_str, require_object)
+from pdf_fonts import BUILTIN_FONTS, FontFamily
+from pdf_output import STANDARD_PROFILE, OutputProfile, apply_output_profile
+from pdf_paging import define_page_total, draw_page_number
+from pdf_styles import PRIMARY_COLOR, ACCENT_COLOR, MEDIUM_GRAY, LIGHT_GRAY, TEXT_COLOR, HEADER_BLUE, get_style
 
 # ============ DATA KLASSER ============
+# Tilladte felter i JSON-input - ukendte felter afvises
+_PLATFORM_FIELDS = frozenset({"company_name", "address", "postal_city", "cvr"})
+_CUSTOMER_FIELDS = frozenset({"company_name", "cvr", "address", "postal_city"})
+_PAYMENT_FIELDS = frozenset({"cash_sale", "cash_revenue", "card_sale", "card_revenue", "surcharge", "tips"})
+_RAPPORT_FIELDS = frozenset({"report_date", "opened_time", "closed_time", "opened_by", "document_number",
+                             "gross_revenue", "discounts", "total_revenue", "vat_collected", "sale_excl_vat",
+                             "payment_breakdown"})
+
 @dataclass
 class PlatformInfo:
     company_name: str = "Ordreflow SaaS"
@@ -32,6 +43,11 @@ class PlatformInfo:
     postal_city: str = "2100 København Ø"
     cvr: str = "12345678"
 
+    @classmethod
+    def from_dict(cls, data: dict, path: str = "platform") -> "PlatformInfo":
+        data = require_object(data, path, _PLATFORM_FIELDS)
+        return cls(**{key: parse_str(value, field_path(path, key)) for key, value in data.items()})
+
 @dataclass
 class CustomerInfo:
     company_name: str
@@ -39,6 +55,16 @@ class CustomerInfo:
     address: str
     postal_city: str
 
+    @classmethod
+    def from_dict(cls, data: dict, path: str = "customer") -> "CustomerInfo":
+        data = require_object(data, path, _CUSTOMER_FIELDS)
+        return cls(
+            company_name=parse_str(get_field(data, "company_name", path), field_path(path, "company_name")),
+            cvr=parse_str(get_field(data, "cvr", path), field_path(path, "cvr")),
+            address=parse_str(get_field(data, "address", path), field_path(path, "address")),
+            postal_city=parse_str(get_field(data, "postal_city", path), field_path(path, "postal_city")),
+        )
+
 @dataclass
 class PaymentBreakdown:
     cash_sale: float = 0.0
@@ -48,6 +74,11 @@ class PaymentBreakdown:
     surcharge: float = 0.0
     tips: float = 0.0
 
+    @classmethod
+    def from_dict(cls, data: dict, path: str = "payment_breakdown") -> "PaymentBreakdown":
+        data = require_object(data, path, _PAYMENT_FIELDS)
+        return cls(**{key: parse_number(value, field_path(path, key), minimum=0) for key, value in data.items()})
+
     @property
     def cash_total(self) -> float:
         return self.cash_revenue
@@ -70,6 +101,33 @@ class DagsrapportData:
     sale_excl_vat: float
     payment_breakdown: PaymentBreakdown
 
+    @classmethod
+    def from_dict(cls, data: dict, path: str = "rapport") -> "DagsrapportData":
+        data = require_object(data, path, _RAPPORT_FIELDS)
+        opened_time = parse_datetime(get_field(data, "opened_time", path), field_path(path, "opened_time"))
+        closed_time = parse_datetime(get_field(data, "closed_time", path), field_path(path, "closed_time"),
+                                     like=opened_time)
+        if closed_time < opened_time:
+            raise SchemaError(field_path(path, "closed_time"), "ligger før opened_time")
+        return cls(
+            report_date=parse_date(get_field(data, "report_date", path), field_path(path, "report_date")),
+            opened_time=opened_time,
+            closed_time=closed_time,
+            opened_by=parse_str(get_field(data, "opened_by", path), field_path(path, "opened_by")),
+            document_number=parse_str(get_field(data, "document_number", path), field_path(path, "document_number")),
+            gross_revenue=parse_number(get_field(data, "gross_revenue", path), field_path(path, "gross_revenue"), minimum=0),
+            discounts=parse_number(get_field(data, "discounts", path), field_path(path, "discounts"), minimum=0),
+            total_revenue=parse_number(get_field(data, "total_revenue", path), field_path(path, "total_revenue")),
+            vat_collected=parse_number(get_field(data, "vat_collected", path), field_path(path, "vat_collected")),
+            sale_excl_vat=parse_number(get_field(data, "sale_excl_vat", path), field_path(path, "sale_excl_vat")),
+            payment_breakdown=PaymentBreakdown.from_dict(data.get("payment_breakdown", {}),
+                                                         field_path(path, "payment_breakdown")),
+        )
+
+    @classmethod
+    def from_json(cls, text: Union[str, bytes]) -> "DagsrapportData":
+        return cls.from_dict(json.loads(text))
+
     @property
     def net_amount(self) -> float:
         return self.sale_excl_vat
@@ -83,6 +141,9 @@ class DagsrapportData:
         return self.total_revenue
 
 # ============ HJÆLPEFUNKTIONER ============
+# Sti eller skrivbart binært fil-objekt
+OutputTarget = Union[str, os.PathLike, BinaryIO]
+
 def fmt_currency(amount: float) -> str:
     return f"{amount:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".") + " DKK"
 
@@ -94,16 +155,32 @@ def fmt_datetime(dt: datetime) -> str:
 
 # ============ CANVAS MED SIDEFOD ============
 class DagsrapportCanvas(canvas.Canvas):
-    def __init__(self, *args, platform_info: PlatformInfo = None, **kwargs):
+    def __init__(self, *args, platform_info: PlatformInfo = None, deferred_page_count: bool = False,
+                 fonts: FontFamily = BUILTIN_FONTS, output_profile: OutputProfile = STANDARD_PROFILE, **kwargs):
+        if fonts.embedded:
+            kwargs["initialFontName"] = fonts.regular
         canvas.Canvas.__init__(self, *args, **kwargs)
         self._saved_page_states = []
         self.platform_info = platform_info or PlatformInfo()
+        self.deferred_page_count = deferred_page_count
+        self.fonts = fonts
+        apply_output_profile(self, output_profile)
 
     def showPage(self):
+        if self.deferred_page_count:
+            self.draw_footer(None)
+            canvas.Canvas.showPage(self)
+            return
         self._saved_page_states.append(dict(self.__dict__))
         self._startPage()
 
     def save(self):
+        if self.deferred_page_count:
+            if self._code:
+                self.showPage()
+            define_page_total(self, self._pageNumber - 1, font_name=self.fonts.regular)
+            canvas.Canvas.save(self)
+            return
         num_pages = len(self._saved_page_states)
         for state in self._saved_page_states:
             self.__dict__.update(state)
@@ -116,35 +193,43 @@ class DagsrapportCanvas(canvas.Canvas):
         p = self.platform_info
 
         # Firmainfo linje
-        self.setFont("Helvetica", 8)
+        self.setFont(self.fonts.regular, 8)
         self.setFillColor(colors.gray)
         footer_text = f"{p.company_name} • {p.address}, {p.postal_city} • CVR: {p.cvr}"
         self.drawCentredString(page_width / 2, 10*mm, footer_text)
 
         # Side X af Y
-        self.setFont("Helvetica", 8)
-        page_text = f"Side {self._pageNumber} af {page_count}"
-        self.drawCentredString(page_width / 2, 5*mm, page_text)
+        draw_page_number(self, page_width / 2, 5*mm, page_count, font_name=self.fonts.regular)
 
 # ============ PDF GENERATOR ============
 class DagsrapportGenerator:
 
-    def __init__(self, platform_info: PlatformInfo = None):
+    def __init__(self, platform_info: PlatformInfo = None, deferred_page_count: bool = False,
+                 invariant: Optional[bool] = None, fonts: FontFamily = BUILTIN_FONTS,
+                 output_profile: OutputProfile = STANDARD_PROFILE, stats_callback: Optional[StatsCallback] = None):
+        if output_profile.pdfa and not fonts.embedded:
+            raise ValueError("PDF/A kræver indlejrede skrifttyper - brug en TTF-familie fra pdf_fonts")
         self.platform = platform_info or PlatformInfo()
         self.page_width = A4[0] - 40*mm
+        self.deferred_page_count = deferred_page_count
+        # Fast tidsstempel og dokument-ID: samme input giver byte-identisk PDF.
+        # None følger ReportLabs rl_config.invariant
+        self.invariant = invariant
+        # Helvetica eller en TTF-familie fra pdf_fonts.register_ttf_family()
+        self.fonts = fonts
+        # Komprimering, delte ressourcer og PDF/A - se pdf_output
+        self.output_profile = output_profile
+        # Kaldes med en RenderStats efter hvert dokument - None slår målingen helt fra
+        self.stats_callback = stats_callback
 
     def generate(self, rapport: DagsrapportData, customer: CustomerInfo) -> bytes:
         buffer = BytesIO()
+        self.generate_to(buffer, rapport, customer)
+        return buffer.getvalue()
 
-        doc = SimpleDocTemplate(
-            buffer,
-            pagesize=A4,
-            leftMargin=20*mm,
-            rightMargin=20*mm,
-            topMargin=20*mm,
-            bottomMargin=20*mm
-        )
-
+    def generate_to(self, target: OutputTarget, rapport: DagsrapportData, customer: CustomerInfo) -> None:
+        """Skriver PDF'en direkte til en sti eller et skrivbart binært fil-objekt (fil, pipe, HTTP-svar)"""
+        watch = Stopwatch() if self.stats_callback else None
         story = []
         p = self.platform
 
@@ -152,7 +237,7 @@ class DagsrapportGenerator:
         left_header = Paragraph(
             f"""<font size="28"><b>DAGSRAPPORT</b></font><br/>
 <font size="11">{p.company_name}</font>""",
-            ParagraphStyle('LH', fontSize=11, leading=16, textColor=TEXT_COLOR)
+            get_style("dagsrapport.left_header", self.fonts)
         )
 
         right_header = Paragraph(
@@ -161,29 +246,25 @@ class DagsrapportGenerator:
 <font size="9">{customer.address}<br/>
 {customer.postal_city}<br/>
 CVR: {customer.cvr}</font>""",
-            ParagraphStyle('RH', fontSize=9, leading=11, alignment=TA_RIGHT, textColor=TEXT_COLOR)
+            get_style("dagsrapport.right_header", self.fonts)
         )
 
         header_table = Table([[left_header, right_header]], colWidths=[self.page_width*0.5, self.page_width*0.5])
-        header_table.setStyle(TableStyle([
-            ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-        ]))
+        header_table.setStyle(get_style("header_row", self.fonts))
         story.append(header_table)
         story.append(Spacer(1, 4*mm))
 
         # Linje
         line = Table([['']], colWidths=[self.page_width])
-        line.setStyle(TableStyle([('LINEBELOW', (0, 0), (-1, -1), 2, PRIMARY_COLOR)]))
+        line.setStyle(get_style("dagsrapport.rule", self.fonts))
         story.append(line)
         story.append(Spacer(1, 6*mm))
 
         # ========== DETALJER SEKTION ==========
-        story.append(Paragraph("<font size='14'><b>Detaljer</b></font>",
-            ParagraphStyle('SectionHeader', fontSize=14, leading=16, textColor=TEXT_COLOR)))
+        story.append(Paragraph("<font size='14'><b>Detaljer</b></font>", get_style("dagsrapport.section_header", self.fonts)))
         story.append(Spacer(1, 3*mm))
 
-        story.append(Paragraph("<font size='10' color='#1a365d'><b>Oversigt</b></font>",
-            ParagraphStyle('SubHeader', fontSize=10, leading=12, textColor=HEADER_BLUE)))
+        story.append(Paragraph("<font size='10' color='#1a365d'><b>Oversigt</b></font>", get_style("dagsrapport.sub_header", self.fonts)))
         story.append(Spacer(1, 2*mm))
 
         detail_data = [
@@ -194,29 +275,55 @@ CVR: {customer.cvr}</font>""",
         ]
 
         detail_table = Table(detail_data, colWidths=[self.page_width*0.3, self.page_width*0.7])
-        detail_table.setStyle(TableStyle([
-            ('FONTNAME', (0, 0), (0, -1), 'Helvetica'),
-            ('FONTNAME', (1, 0), (1, -1), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, -1), 9),
-            ('TEXTCOLOR', (0, 0), (-1, -1), TEXT_COLOR),
-            ('ALIGN', (0, 0), (0, -1), 'LEFT'),
-            ('ALIGN', (1, 0), (1, -1), 'RIGHT'),
-            ('TOPPADDING', (0, 0), (-1, -1), 2*mm),
-            ('BOTTOMPADDING', (0, 0), (-1, -2), 2*mm),
-            ('BOTTOMPADDING', (0, -1), (-1, -1), 3*mm),
-            ('LINEBELOW', (0, 0), (-1, -2), 0.5, MEDIUM_GRAY),
-            ('LINEBELOW', (0, -1), (-1, -1), 2, PRIMARY_COLOR),
-        ]))
+        detail_table.setStyle(get_style("dagsrapport.key_value_table", self.fonts))
         story.append(detail_table)
         story.append(Spacer(1, 8*mm))
 
+        story.extend(self.summary_story(rapport))
+        stats = RenderStats("dagsrapport", rapport.document_number, story_ms=watch.ms()) if watch else None
+        self.build(target, story, stats)
+
+    def build(self, target: OutputTarget, story: list, stats: Optional[RenderStats] = None) -> None:
+        """Layout og canvas for dagsrapporter - bruges også af periode-rapporten"""
+        if isinstance(target, (str, os.PathLike)):
+            target = os.fspath(target)
+
+        doc = SimpleDocTemplate(
+            target,
+            pagesize=A4,
+            leftMargin=20*mm,
+            rightMargin=20*mm,
+            topMargin=20*mm,
+            bottomMargin=20*mm,
+            **({"invariant": self.invariant} if self.invariant is not None else {})
+        )
+
+        # Generer PDF med custom canvas
+        platform_info = self.platform
+        deferred_page_count = self.deferred_page_count
+        fonts = self.fonts
+        output_profile = self.output_profile
+        def canvas_maker(*args, **kwargs):
+            return DagsrapportCanvas(*args, platform_info=platform_info, deferred_page_count=deferred_page_count,
+                                     fonts=fonts, output_profile=output_profile, **kwargs)
+
+        if stats is None:
+            doc.build(story, canvasmaker=canvas_maker)
+            return
+        start = output_position(target)
+        build_with_stats(doc, story, canvas_maker, stats)
+        stats.bytes = output_size(target, start)
+        self.stats_callback(stats)
+
+    def summary_story(self, rapport: DagsrapportData) -> list:
+        """Salgsoversigt, betalingsfordeling, moms og total - delt med periode-rapporten"""
+        story = []
+
         # ========== SALGSOVERSIGT ==========
-        story.append(Paragraph("<font size='14'><b>Salgsoversigt</b></font>",
-            ParagraphStyle('SectionHeader', fontSize=14, leading=16, textColor=TEXT_COLOR)))
+        story.append(Paragraph("<font size='14'><b>Salgsoversigt</b></font>", get_style("dagsrapport.section_header", self.fonts)))
         story.append(Spacer(1, 3*mm))
 
-        story.append(Paragraph("<font size='10' color='#1a365d'><b>Oversigt</b></font>",
-            ParagraphStyle('SubHeader', fontSize=10, leading=12, textColor=HEADER_BLUE)))
+        story.append(Paragraph("<font size='10' color='#1a365d'><b>Oversigt</b></font>", get_style("dagsrapport.sub_header", self.fonts)))
         story.append(Spacer(1, 2*mm))
 
         sales_data = [
@@ -228,32 +335,18 @@ CVR: {customer.cvr}</font>""",
         ]
 
         sales_table = Table(sales_data, colWidths=[self.page_width*0.3, self.page_width*0.7])
-        sales_table.setStyle(TableStyle([
-            ('FONTNAME', (0, 0), (0, -1), 'Helvetica'),
-            ('FONTNAME', (1, 0), (1, -1), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, -1), 9),
-            ('TEXTCOLOR', (0, 0), (-1, -1), TEXT_COLOR),
-            ('ALIGN', (0, 0), (0, -1), 'LEFT'),
-            ('ALIGN', (1, 0), (1, -1), 'RIGHT'),
-            ('TOPPADDING', (0, 0), (-1, -1), 2*mm),
-            ('BOTTOMPADDING', (0, 0), (-1, -2), 2*mm),
-            ('BOTTOMPADDING', (0, -1), (-1, -1), 3*mm),
-            ('LINEBELOW', (0, 0), (-1, -2), 0.5, MEDIUM_GRAY),
-            ('LINEBELOW', (0, -1), (-1, -1), 2, PRIMARY_COLOR),
-        ]))
+        sales_table.setStyle(get_style("dagsrapport.key_value_table", self.fonts))
         story.append(sales_table)
 
         # Start ny side for betalingsfordeling
         story.append(Spacer(1, 10*mm))
 
         # ========== BETALINGSFORDELING ==========
-        story.append(Paragraph("<font size='14'><b>Betalingsfordeling</b></font>",
-            ParagraphStyle('SectionHeader', fontSize=14, leading=16, textColor=TEXT_COLOR)))
+        story.append(Paragraph("<font size='14'><b>Betalingsfordeling</b></font>", get_style("dagsrapport.section_header", self.fonts)))
         story.append(Spacer(1, 3*mm))
 
         # Kontant
-        story.append(Paragraph("<font size='10' color='#1a365d'><b>Kontant</b></font>",
-            ParagraphStyle('SubHeader', fontSize=10, leading=12, textColor=HEADER_BLUE)))
+        story.append(Paragraph("<font size='10' color='#1a365d'><b>Kontant</b></font>", get_style("dagsrapport.sub_header", self.fonts)))
         story.append(Spacer(1, 2*mm))
 
         cash_data = [
@@ -263,25 +356,12 @@ CVR: {customer.cvr}</font>""",
         ]
 
         cash_table = Table(cash_data, colWidths=[self.page_width*0.3, self.page_width*0.7])
-        cash_table.setStyle(TableStyle([
-            ('FONTNAME', (0, 0), (0, -1), 'Helvetica'),
-            ('FONTNAME', (1, 0), (1, -1), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, -1), 9),
-            ('TEXTCOLOR', (0, 0), (-1, -1), TEXT_COLOR),
-            ('ALIGN', (0, 0), (0, -1), 'LEFT'),
-            ('ALIGN', (1, 0), (1, -1), 'RIGHT'),
-            ('TOPPADDING', (0, 0), (-1, -1), 2*mm),
-            ('BOTTOMPADDING', (0, 0), (-1, -2), 2*mm),
-            ('BOTTOMPADDING', (0, -1), (-1, -1), 3*mm),
-            ('LINEBELOW', (0, 0), (-1, -2), 0.5, MEDIUM_GRAY),
-            ('LINEBELOW', (0, -1), (-1, -1), 2, PRIMARY_COLOR),
-        ]))
+        cash_table.setStyle(get_style("dagsrapport.key_value_table", self.fonts))
         story.append(cash_table)
         story.append(Spacer(1, 6*mm))
 
         # Kort
-        story.append(Paragraph("<font size='10' color='#1a365d'><b>Kort</b></font>",
-            ParagraphStyle('SubHeader', fontSize=10, leading=12, textColor=HEADER_BLUE)))
+        story.append(Paragraph("<font size='10' color='#1a365d'><b>Kort</b></font>", get_style("dagsrapport.sub_header", self.fonts)))
         story.append(Spacer(1, 2*mm))
 
         card_data = [
@@ -293,29 +373,15 @@ CVR: {customer.cvr}</font>""",
         ]
 
         card_table = Table(card_data, colWidths=[self.page_width*0.3, self.page_width*0.7])
-        card_table.setStyle(TableStyle([
-            ('FONTNAME', (0, 0), (0, -1), 'Helvetica'),
-            ('FONTNAME', (1, 0), (1, -1), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, -1), 9),
-            ('TEXTCOLOR', (0, 0), (-1, -1), TEXT_COLOR),
-            ('ALIGN', (0, 0), (0, -1), 'LEFT'),
-            ('ALIGN', (1, 0), (1, -1), 'RIGHT'),
-            ('TOPPADDING', (0, 0), (-1, -1), 2*mm),
-            ('BOTTOMPADDING', (0, 0), (-1, -2), 2*mm),
-            ('BOTTOMPADDING', (0, -1), (-1, -1), 3*mm),
-            ('LINEBELOW', (0, 0), (-1, -2), 0.5, MEDIUM_GRAY),
-            ('LINEBELOW', (0, -1), (-1, -1), 2, PRIMARY_COLOR),
-        ]))
+        card_table.setStyle(get_style("dagsrapport.key_value_table", self.fonts))
         story.append(card_table)
         story.append(Spacer(1, 8*mm))
 
         # ========== MOMSSPECIFIKATION ==========
-        story.append(Paragraph("<font size='14'><b>Momsspecifikation</b></font>",
-            ParagraphStyle('SectionHeader', fontSize=14, leading=16, textColor=TEXT_COLOR)))
+        story.append(Paragraph("<font size='14'><b>Momsspecifikation</b></font>", get_style("dagsrapport.section_header", self.fonts)))
         story.append(Spacer(1, 3*mm))
 
-        story.append(Paragraph("<font size='10' color='#1a365d'><b>Rate: 25%</b></font>",
-            ParagraphStyle('SubHeader', fontSize=10, leading=12, textColor=HEADER_BLUE)))
+        story.append(Paragraph("<font size='10' color='#1a365d'><b>Rate: 25%</b></font>", get_style("dagsrapport.sub_header", self.fonts)))
         story.append(Spacer(1, 2*mm))
 
         vat_data = [
@@ -325,25 +391,12 @@ CVR: {customer.cvr}</font>""",
         ]
 
         vat_table = Table(vat_data, colWidths=[self.page_width*0.3, self.page_width*0.7])
-        vat_table.setStyle(TableStyle([
-            ('FONTNAME', (0, 0), (0, -1), 'Helvetica'),
-            ('FONTNAME', (1, 0), (1, -1), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, -1), 9),
-            ('TEXTCOLOR', (0, 0), (-1, -1), TEXT_COLOR),
-            ('ALIGN', (0, 0), (0, -1), 'LEFT'),
-            ('ALIGN', (1, 0), (1, -1), 'RIGHT'),
-            ('TOPPADDING', (0, 0), (-1, -1), 2*mm),
-            ('BOTTOMPADDING', (0, 0), (-1, -2), 2*mm),
-            ('BOTTOMPADDING', (0, -1), (-1, -1), 3*mm),
-            ('LINEBELOW', (0, 0), (-1, -2), 0.5, MEDIUM_GRAY),
-            ('LINEBELOW', (0, -1), (-1, -1), 2, PRIMARY_COLOR),
-        ]))
+        vat_table.setStyle(get_style("dagsrapport.key_value_table", self.fonts))
         story.append(vat_table)
         story.append(Spacer(1, 8*mm))
 
         # ========== TOTAL ==========
-        story.append(Paragraph("<font size='14'><b>Total</b></font>",
-            ParagraphStyle('SectionHeader', fontSize=14, leading=16, textColor=TEXT_COLOR)))
+        story.append(Paragraph("<font size='14'><b>Total</b></font>", get_style("dagsrapport.section_header", self.fonts)))
         story.append(Spacer(1, 2*mm))
 
         total_data = [
@@ -353,28 +406,9 @@ CVR: {customer.cvr}</font>""",
         ]
 
         total_table = Table(total_data, colWidths=[self.page_width*0.3, self.page_width*0.7])
-        total_table.setStyle(TableStyle([
-            ('FONTNAME', (0, 0), (0, -1), 'Helvetica'),
-            ('FONTNAME', (1, 0), (1, -1), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, -1), 9),
-            ('TEXTCOLOR', (0, 0), (-1, -1), TEXT_COLOR),
-            ('ALIGN', (0, 0), (0, -1), 'LEFT'),
-            ('ALIGN', (1, 0), (1, -1), 'RIGHT'),
-            ('TOPPADDING', (0, 0), (-1, -1), 2*mm),
-            ('BOTTOMPADDING', (0, 0), (-1, -2), 2*mm),
-            ('BOTTOMPADDING', (0, -1), (-1, -1), 3*mm),
-            ('LINEBELOW', (0, 0), (-1, -2), 0.5, MEDIUM_GRAY),
-            ('LINEBELOW', (0, -1), (-1, -1), 2, PRIMARY_COLOR),
-        ]))
+        total_table.setStyle(get_style("dagsrapport.key_value_table", self.fonts))
         story.append(total_table)
-
-        # Generer PDF med custom canvas
-        platform_info = self.platform
-        def canvas_maker(*args, **kwargs):
-            return DagsrapportCanvas(*args, platform_info=platform_info, **kwargs)
-
-        doc.build(story, canvasmaker=canvas_maker)
-        return buffer.getvalue()
+        return story
 
 
 # ============ HOVEDFUNKTION ============
@@ -387,6 +421,117 @@ def generate_dagsrapport(
     return generator.generate(rapport_data, customer_info)
 
 
+def generate_dagsrapport_to(
+    target: OutputTarget,
+    rapport_data: DagsrapportData,
+    customer_info: CustomerInfo,
+    platform_info: PlatformInfo = None
+) -> None:
+    generator = DagsrapportGenerator(platform_info)
+    generator.generate_to(target, rapport_data, customer_info)
+
+
+# ============ BULK (DAGSLUKNING) ============
+MANIFEST_NAME = "manifest.json"
+
+_bulk_generator: Optional[DagsrapportGenerator] = None
+_bulk_output_dir: Optional[str] = None
+
+def dagsrapport_filename(rapport: DagsrapportData, customer: CustomerInfo) -> str:
+    name = f"{customer.cvr}_{rapport.report_date:%Y%m%d}_{rapport.document_number}"
+    return re.sub(r"[^\w.-]", "_", name) + ".pdf"
+
+def _init_bulk_worker(platform_info: Optional[PlatformInfo], output_dir: Optional[str]):
+    global _bulk_generator, _bulk_output_dir
+    _bulk_generator = DagsrapportGenerator(platform_info)
+    _bulk_output_dir = output_dir
+
+def _render_bulk_item(item: Tuple[DagsrapportData, CustomerInfo]) -> Tuple[str, Union[dict, BatchItemError]]:
+    # Med output_dir skriver workeren selv filen, ellers sendes PDF'en tilbage til ZIP-skriveren
+    filename = "?"
+    try:
+        rapport, customer = item
+        filename = dagsrapport_filename(rapport, customer)
+        entry = {"file": filename, "cvr": customer.cvr, "company_name": customer.company_name,
+                 "document_number": rapport.document_number}
+        start = time.perf_counter()
+        if _bulk_output_dir:
+            path = os.path.join(_bulk_output_dir, filename)
+            _bulk_generator.generate_to(path, rapport, customer)
+            entry["bytes"] = os.path.getsize(path)
+        else:
+            entry["pdf"] = _bulk_generator.generate(rapport, customer)
+            entry["bytes"] = len(entry["pdf"])
+        entry["ms"] = round((time.perf_counter() - start) * 1000, 3)
+        return filename, entry
+    except Exception as exc:
+        return filename, capture_item_error(filename, exc)
+
+def generate_dagsrapport_bulk(
+    items: Iterable[Tuple[DagsrapportData, CustomerInfo]],
+    output_dir: Optional[str] = None,
+    zip_path: Optional[str] = None,
+    platform_info: PlatformInfo = None,
+    max_workers: Optional[int] = None,
+    max_pending: Optional[int] = None,
+    compresslevel: int = 6,
+) -> dict:
+    """
+    Renderer alle lokationers dagsrapporter parallelt ved dagslukning.
+
+    Angiv output_dir (én PDF pr. lokation + manifest.json) eller zip_path
+    (én ZIP med PDF'erne og manifest.json). ZIP'en skrives og komprimeres
+    løbende, og højst max_pending rapporter er undervejs ad gangen, så
+    hukommelsen ikke vokser med antallet af lokationer. Returnerer manifestet;
+    rapporter der fejler står i det med "ok": false.
+    """
+    if (output_dir is None) == (zip_path is None):
+        raise ValueError("Angiv enten output_dir eller zip_path")
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+
+    start = time.perf_counter()
+    entries = []
+    archive = zipfile.ZipFile(zip_path, "w", zipfile.ZIP_DEFLATED, compresslevel=compresslevel) if zip_path else None
+    try:
+        results = run_pool(
+            _render_bulk_item,
+            items,
+            max_workers=max_workers,
+            max_pending=max_pending,
+            initializer=_init_bulk_worker,
+            initargs=(platform_info, output_dir),
+            item_key=lambda item: dagsrapport_filename(*item),
+        )
+        for filename, entry in results:
+            if isinstance(entry, BatchItemError):
+                entries.append({"file": filename, "ok": False, "error": entry.message})
+                continue
+            pdf = entry.pop("pdf", None)
+            if archive is not None:
+                archive.writestr(filename, pdf)
+            entries.append({**entry, "ok": True})
+
+        manifest = {
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "count": len(entries),
+            "failed": sum(not entry["ok"] for entry in entries),
+            "bytes": sum(entry.get("bytes", 0) for entry in entries),
+            "seconds": round(time.perf_counter() - start, 3),
+            "files": entries,
+        }
+        text = json.dumps(manifest, ensure_ascii=False, indent=2)
+        if archive is not None:
+            archive.writestr(MANIFEST_NAME, text)
+        else:
+            with open(os.path.join(output_dir, MANIFEST_NAME), "w", encoding="utf-8") as f:
+                f.write(text)
+    finally:
+        if archive is not None:
+            archive.close()
+    return manifest
+
+
 # ============ TEST ============
 if __name__ == "__main__":
     platform = PlatformInfo()
@@ -423,9 +568,10 @@ if __name__ == "__main__":
 
     pdf_bytes = generate_dagsrapport(rapport, customer, platform)
 
-    output_path = "/Users/martinsarvio/Downloads/OrderFlow-v137/generated_dagsrapport.pdf"
+    # Sti som første argument, ellers i den aktuelle mappe
+    output_path = sys.argv[1] if len(sys.argv) > 1 else "dagsrapport.pdf"
     with open(output_path, "wb") as f:
         f.write(pdf_bytes)
 
-    print(f"Dagsrapport genereret: {output_path}")
+    print(f"Dagsrapport genereret: {os.path.abspath(output_path)}")
     print(f"Total omsætning: {fmt_currency(rapport.total_revenue)}")
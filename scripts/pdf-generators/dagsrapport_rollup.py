@@ -0,0 +1,307 @@
+"""
+OrderFlow dagsrapport-rollups - uge-, måneds- og kæderapporter af daglige delsummer
+
+Hver dags DagsrapportData gemmes som en DailyTotals i hele øre. Delsummer
+lægges sammen med + (associativt og eksakt), så en periode- eller
+kæderapport kun kombinerer de gemte dage og aldrig rører de rå ordrer igen.
+
+    store = RollupStore()
+    store.add(customer, rapport)            # én gang pr. lokation pr. dag
+    report = store.period_report(date(2025, 12, 1), date(2025, 12, 31), title="Bella Vista Gruppen")
+    pdf = PeriodRapportGenerator().generate_period(report)
+"""
+
+import json
+import os
+from dataclasses import asdict, dataclass, fields
+from datetime import date, datetime, timedelta
+from functools import reduce
+from io import BytesIO
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from reportlab.lib.units import mm
+from reportlab.platypus import Paragraph, Spacer, Table
+
+from dagsrapport_aggregator import to_ore
+from dagsrapport_generator import (CustomerInfo, DagsrapportData, DagsrapportGenerator, OutputTarget,
+                                   PaymentBreakdown, fmt_currency, fmt_date, fmt_datetime)
+from pdf_stats import RenderStats, Stopwatch
+from pdf_styles import get_style
+
+# ============ DELSUMMER ============
+@dataclass(frozen=True)
+class DailyTotals:
+    """Beløb i hele øre. Tom værdi (DailyTotals()) er det neutrale element for +"""
+    gross_revenue: int = 0
+    discounts: int = 0
+    total_revenue: int = 0
+    vat_collected: int = 0
+    sale_excl_vat: int = 0
+    cash_sale: int = 0
+    cash_revenue: int = 0
+    card_sale: int = 0
+    card_revenue: int = 0
+    surcharge: int = 0
+    tips: int = 0
+    days: int = 0
+    opened_time: Optional[datetime] = None
+    closed_time: Optional[datetime] = None
+
+    @classmethod
+    def from_rapport(cls, rapport: DagsrapportData) -> "DailyTotals":
+        p = rapport.payment_breakdown
+        return cls(
+            gross_revenue=to_ore(rapport.gross_revenue),
+            discounts=to_ore(rapport.discounts),
+            total_revenue=to_ore(rapport.total_revenue),
+            vat_collected=to_ore(rapport.vat_collected),
+            sale_excl_vat=to_ore(rapport.sale_excl_vat),
+            cash_sale=to_ore(p.cash_sale),
+            cash_revenue=to_ore(p.cash_revenue),
+            card_sale=to_ore(p.card_sale),
+            card_revenue=to_ore(p.card_revenue),
+            surcharge=to_ore(p.surcharge),
+            tips=to_ore(p.tips),
+            days=1,
+            opened_time=rapport.opened_time,
+            closed_time=rapport.closed_time,
+        )
+
+    def __add__(self, other: "DailyTotals") -> "DailyTotals":
+        if not isinstance(other, DailyTotals):
+            return NotImplemented
+        sums = {name: getattr(self, name) + getattr(other, name) for name in _SUM_FIELDS}
+        return DailyTotals(
+            **sums,
+            opened_time=_earliest(self.opened_time, other.opened_time),
+            closed_time=_latest(self.closed_time, other.closed_time),
+        )
+
+    def to_rapport(self, report_date: date, opened_by: str, document_number: str) -> DagsrapportData:
+        return DagsrapportData(
+            report_date=report_date,
+            opened_time=self.opened_time,
+            closed_time=self.closed_time,
+            opened_by=opened_by,
+            document_number=document_number,
+            gross_revenue=self.gross_revenue / 100,
+            discounts=self.discounts / 100,
+            total_revenue=self.total_revenue / 100,
+            vat_collected=self.vat_collected / 100,
+            sale_excl_vat=self.sale_excl_vat / 100,
+            payment_breakdown=PaymentBreakdown(
+                cash_sale=self.cash_sale / 100,
+                cash_revenue=self.cash_revenue / 100,
+                card_sale=self.card_sale / 100,
+                card_revenue=self.card_revenue / 100,
+                surcharge=self.surcharge / 100,
+                tips=self.tips / 100,
+            ),
+        )
+
+_SUM_FIELDS = tuple(f.name for f in fields(DailyTotals) if f.name not in ("opened_time", "closed_time"))
+
+def _earliest(a: Optional[datetime], b: Optional[datetime]) -> Optional[datetime]:
+    return b if a is None else a if b is None else min(a, b)
+
+def _latest(a: Optional[datetime], b: Optional[datetime]) -> Optional[datetime]:
+    return b if a is None else a if b is None else max(a, b)
+
+def merge_totals(parts: Iterable[DailyTotals]) -> DailyTotals:
+    return reduce(DailyTotals.__add__, parts, DailyTotals())
+
+# ============ PERIODE-RAPPORT ============
+@dataclass
+class PeriodReport:
+    title: str  # Kædens eller lokationens navn
+    start: date
+    end: date
+    document_number: str
+    totals: DailyTotals
+    locations: List[Tuple[CustomerInfo, DailyTotals]]  # Sorteret efter navn og adresse
+
+    def rapport(self) -> DagsrapportData:
+        return self.totals.to_rapport(self.end, "", self.document_number)
+
+# ============ STORE ============
+def location_id(customer: CustomerInfo) -> str:
+    """Standard-id for en lokation: CVR og adresse - en kæde kan have flere lokationer under ét CVR"""
+    return f"{customer.cvr}/{customer.address}, {customer.postal_city}"
+
+class RollupStore:
+    """
+    Daglige delsummer pr. lokation. Lokationen er location_id(customer),
+    medmindre add() får et eksplicit id. add() for samme lokation og dag
+    erstatter den gamle delsum, så en dag kan genberegnes uden at tælle dobbelt.
+    """
+
+    def __init__(self):
+        self.customers: Dict[str, CustomerInfo] = {}
+        self._days: Dict[str, Dict[date, DailyTotals]] = {}
+
+    def __len__(self) -> int:
+        return sum(len(days) for days in self._days.values())
+
+    def add(self, customer: CustomerInfo, rapport: DagsrapportData, location: Optional[str] = None):
+        self.add_totals(customer, rapport.report_date, DailyTotals.from_rapport(rapport), location)
+
+    def add_totals(self, customer: CustomerInfo, day: date, totals: DailyTotals, location: Optional[str] = None):
+        location = location or location_id(customer)
+        self.customers[location] = customer
+        self._days.setdefault(location, {})[day] = totals
+
+    def day(self, location: str, day: date) -> Optional[DailyTotals]:
+        return self._days.get(location, {}).get(day)
+
+    def _location_days(self, location: str) -> Dict[date, DailyTotals]:
+        try:
+            return self._days[location]
+        except KeyError:
+            raise ValueError(f"Ukendt lokation {location!r}") from None
+
+    def location_totals(self, location: str, start: date, end: date) -> DailyTotals:
+        days = self._location_days(location)
+        # Højst ét opslag pr. kalenderdag - uafhængigt af hvor mange dage der er gemt i alt
+        if (end - start).days + 1 < len(days):
+            parts = (days.get(start + timedelta(n)) for n in range((end - start).days + 1))
+            return merge_totals(part for part in parts if part is not None)
+        return merge_totals(totals for day, totals in days.items() if start <= day <= end)
+
+    def period_totals(self, start: date, end: date, locations: Optional[Iterable[str]] = None) -> DailyTotals:
+        locations = self._days.keys() if locations is None else locations
+        return merge_totals(self.location_totals(location, start, end) for location in locations)
+
+    def period_report(self, start: date, end: date, title: str, locations: Optional[Iterable[str]] = None,
+                      document_number: str = "") -> PeriodReport:
+        locations = list(self._days.keys() if locations is None else locations)
+        per_location = [(self.location_totals(location, start, end), self.customers[location]) for location in locations]
+        per_location = [(customer, totals) for totals, customer in per_location if totals.days]
+        per_location.sort(key=lambda item: (item[0].company_name, item[0].address))
+        return PeriodReport(
+            title=title,
+            start=start,
+            end=end,
+            document_number=document_number or f"{start:%Y%m%d}-{end:%Y%m%d}",
+            totals=merge_totals(totals for _, totals in per_location),
+            locations=per_location,
+        )
+
+    # ============ PERSISTENS ============
+    def save(self, path: str):
+        """Én JSON-linje pr. lokation og dag - skrives atomisk"""
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for location, days in self._days.items():
+                customer = asdict(self.customers[location])
+                for day, totals in sorted(days.items()):
+                    row = asdict(totals)
+                    row["opened_time"] = totals.opened_time.isoformat() if totals.opened_time else None
+                    row["closed_time"] = totals.closed_time.isoformat() if totals.closed_time else None
+                    f.write(json.dumps({"location": location, "customer": customer, "date": day.isoformat(),
+                                        "totals": row}, ensure_ascii=False) + "\n")
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> "RollupStore":
+        store = cls()
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                row = json.loads(line)
+                totals = row["totals"]
+                for key in ("opened_time", "closed_time"):
+                    if totals[key] is not None:
+                        totals[key] = datetime.fromisoformat(totals[key])
+                # Filer fra før lokations-id'et får standard-id'et
+                store.add_totals(CustomerInfo(**row["customer"]), date.fromisoformat(row["date"]),
+                                 DailyTotals(**totals), row.get("location"))
+        return store
+
+# ============ PDF GENERATOR ============
+class PeriodRapportGenerator(DagsrapportGenerator):
+    """
+    Periode-/kæderapport med samme opsætning og afsnit som dagsrapporten.
+    generate()/generate_to() fra DagsrapportGenerator laver stadig dagsrapporter,
+    så generatoren kan bruges alle steder hvor en DagsrapportGenerator forventes.
+    """
+
+    def generate_period(self, report: PeriodReport) -> bytes:
+        buffer = BytesIO()
+        self.generate_period_to(buffer, report)
+        return buffer.getvalue()
+
+    def generate_period_to(self, target: OutputTarget, report: PeriodReport) -> None:
+        watch = Stopwatch() if self.stats_callback else None
+        story = []
+        p = self.platform
+        rapport = report.rapport()
+
+        # ========== HEADER ==========
+        left_header = Paragraph(
+            f"""<font size="28"><b>PERIODERAPPORT</b></font><br/>
+<font size="11">{p.company_name}</font>""",
+            get_style("dagsrapport.left_header", self.fonts)
+        )
+
+        right_header = Paragraph(
+            f"""<font size="11"><b>{fmt_date(report.start)} - {fmt_date(report.end)}</b></font><br/>
+<font size="10"><b>{report.title}</b></font><br/>
+<font size="9">{len(report.locations)} lokationer</font>""",
+            get_style("dagsrapport.right_header", self.fonts)
+        )
+
+        header_table = Table([[left_header, right_header]], colWidths=[self.page_width*0.5, self.page_width*0.5])
+        header_table.setStyle(get_style("header_row", self.fonts))
+        story.append(header_table)
+        story.append(Spacer(1, 4*mm))
+
+        line = Table([['']], colWidths=[self.page_width])
+        line.setStyle(get_style("dagsrapport.rule", self.fonts))
+        story.append(line)
+        story.append(Spacer(1, 6*mm))
+
+        # ========== DETALJER SEKTION ==========
+        story.append(Paragraph("<font size='14'><b>Detaljer</b></font>", get_style("dagsrapport.section_header", self.fonts)))
+        story.append(Spacer(1, 3*mm))
+
+        detail_data = [
+            ['Periode', f"{fmt_date(report.start)} - {fmt_date(report.end)}"],
+            ['Første åbning', fmt_datetime(rapport.opened_time) if rapport.opened_time else "-"],
+            ['Sidste lukning', fmt_datetime(rapport.closed_time) if rapport.closed_time else "-"],
+            ['Dagsrapporter', str(report.totals.days)],
+            ['Dokumentnummer', report.document_number],
+        ]
+
+        detail_table = Table(detail_data, colWidths=[self.page_width*0.3, self.page_width*0.7])
+        detail_table.setStyle(get_style("dagsrapport.key_value_table", self.fonts))
+        story.append(detail_table)
+        story.append(Spacer(1, 8*mm))
+
+        # ========== LOKATIONER ==========
+        if len(report.locations) > 1:
+            story.append(Paragraph("<font size='14'><b>Lokationer</b></font>", get_style("dagsrapport.section_header", self.fonts)))
+            story.append(Spacer(1, 3*mm))
+
+            location_data = [['Lokation', 'CVR', 'Dage', 'Omsætning', 'Moms']]
+            for customer, totals in report.locations:
+                location_data.append([
+                    customer.company_name,
+                    customer.cvr,
+                    str(totals.days),
+                    fmt_currency(totals.total_revenue / 100),
+                    fmt_currency(totals.vat_collected / 100),
+                ])
+
+            location_table = Table(
+                location_data, repeatRows=1,
+                colWidths=[self.page_width*0.34, self.page_width*0.14, self.page_width*0.08,
+                           self.page_width*0.24, self.page_width*0.20],
+            )
+            location_table.setStyle(get_style("dagsrapport.location_table", self.fonts))
+            story.append(location_table)
+            story.append(Spacer(1, 8*mm))
+
+        story.extend(self.summary_story(rapport))
+        stats = RenderStats("periode", report.document_number, story_ms=watch.ms()) if watch else None
+        self.build(target, story, stats)
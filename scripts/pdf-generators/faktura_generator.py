@@ -4,24 +4,36 @@ OrderFlow Faktura Generator - Betalingsinfo i bunden
 
 from reportlab.lib.pagesizes import A4
 from reportlab.lib.units import mm
-from reportlab.lib.styles import ParagraphStyle
-from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_RIGHT
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
-from reportlab.lib.colors import HexColor
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, PageBreak, Flowable
 from reportlab.lib import colors
 from reportlab.pdfgen import canvas
+from reportlab.pdfbase.pdfmetrics import stringWidth
+import json
+import os
+import re
+import sys
+from array import array
 from io import BytesIO
 from datetime import datetime, date, timedelta
-from typing import Dict, List, Optional
-from dataclasses import dataclass, field
+from typing import BinaryIO, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+from dataclasses import astuple, dataclass, field
+from decimal import Decimal, ROUND_HALF_UP
 from enum import Enum
 
-# ============ FARVER ============
-PRIMARY_COLOR = HexColor("#1a1a2e")
-ACCENT_COLOR = HexColor("#0f3460")
-MEDIUM_GRAY = HexColor("#e0e0e0")
-LIGHT_GRAY = HexColor("#f8f9fa")
-TEXT_COLOR = HexColor("#333333")
+from pdf_fonts import BUILTIN_FONTS, FontFamily
+from pdf_output import STANDARD_PROFILE, OutputProfile, apply_output_profile
+from pdf_paging import PAGE_TOTAL_FORM, define_page_total, draw_page_number
+from pdf_batch import BatchItemError, capture_item_error, run_pool
+from pdf_streaming import discard_output, streaming_document
+from pdf_stats import RenderStats, StatsCallback, Stopwatch, build_with_stats, output_position, output_size
+from pdf_schema import (SchemaError, field_path, get_field, parse_date, parse_enum, parse_number,
+                        parse_optional_str, parse_str, require_object)
+from pdf_styles import PRIMARY_COLOR, ACCENT_COLOR, MEDIUM_GRAY, LIGHT_GRAY, TEXT_COLOR, get_style
+
+# ============ GRÆNSER ============
+# Over denne grænse bygges fakturalinjerne som flere tabeller af LINE_CHUNK_ROWS rækker
+LARGE_INVOICE_THRESHOLD = 200
+LINE_CHUNK_ROWS = 100
 
 # ============ ENUMS ============
 class PaymentTerms(Enum):
@@ -47,7 +59,91 @@ class FakturaType(Enum):
     CREDIT_NOTE = "KREDITNOTA"
     PROFORMA = "PROFORMA"
 
+# ============ BELØB ============
+ORE = Decimal("0.01")
+_VAT_FRACTIONS: Dict[VatRate, Decimal] = {rate: Decimal(str(rate.rate)) / 100 for rate in VatRate}
+
+def to_decimal(value) -> Decimal:
+    # str() giver den korte repræsentation, så 0.02 bliver Decimal("0.02") og ikke 0.0200000000000000004...
+    return value if isinstance(value, Decimal) else Decimal(str(value))
+
+def round_ore(amount: Decimal) -> Decimal:
+    return amount.quantize(ORE, rounding=ROUND_HALF_UP)
+
+def line_amounts(quantity, unit_price, vat_rate: VatRate) -> Tuple[Decimal, Decimal]:
+    """(beløb ekskl. moms, moms) for én linje, hver afrundet til hele øre"""
+    net = round_ore(to_decimal(quantity) * to_decimal(unit_price))
+    return net, round_ore(net * _VAT_FRACTIONS[vat_rate])
+
+@dataclass(frozen=True)
+class VatGroupTotals:
+    vat_rate: VatRate
+    net: Decimal
+    vat: Decimal
+
+    @property
+    def gross(self) -> Decimal:
+        return self.net + self.vat
+
+@dataclass(frozen=True)
+class InvoiceTotals:
+    line_totals: List[Decimal]  # Beløb ekskl. moms pr. linje, i samme rækkefølge som linjerne
+    by_rate: Dict[VatRate, VatGroupTotals]  # I den rækkefølge momssatserne første gang optræder
+    subtotal_excl_vat: Decimal
+    total_vat: Decimal
+
+    @property
+    def total_incl_vat(self) -> Decimal:
+        return self.subtotal_excl_vat + self.total_vat
+
+    def vat_groups(self) -> List[VatGroupTotals]:
+        """Momsgrupperne i VatRate-rækkefølge (standardsats først)"""
+        return [self.by_rate[rate] for rate in VatRate if rate in self.by_rate]
+
+def line_values(lines) -> Iterator[tuple]:
+    """(description, quantity, unit, unit_price, vat_rate) pr. linje - uden at bygge InvoiceLine-objekter for kolonner"""
+    if isinstance(lines, InvoiceLineColumns):
+        return lines.values()
+    return ((ln.description, ln.quantity, ln.unit, ln.unit_price, ln.vat_rate) for ln in lines)
+
+def compute_totals(lines: Iterable["InvoiceLine"]) -> InvoiceTotals:
+    """Beregner linjebeløb og summer pr. momssats i ét gennemløb, eksakt i øre"""
+    line_totals = []
+    net_by_rate: Dict[VatRate, Decimal] = {}
+    vat_by_rate: Dict[VatRate, Decimal] = {}
+    # Store fakturaer gentager typisk de samme linjer - de deler så også Decimal-objekterne
+    amounts: Dict[tuple, Tuple[Decimal, Decimal]] = {}
+    zero = Decimal(0)
+    for _, quantity, _, unit_price, rate in line_values(lines):
+        key = (quantity, unit_price, rate)
+        pair = amounts.get(key)
+        if pair is None:
+            pair = amounts[key] = line_amounts(quantity, unit_price, rate)
+        net, vat = pair
+        line_totals.append(net)
+        net_by_rate[rate] = net_by_rate.get(rate, zero) + net
+        vat_by_rate[rate] = vat_by_rate.get(rate, zero) + vat
+    by_rate = {rate: VatGroupTotals(rate, net_by_rate[rate], vat_by_rate[rate]) for rate in net_by_rate}
+    return InvoiceTotals(
+        line_totals=line_totals,
+        by_rate=by_rate,
+        subtotal_excl_vat=sum(net_by_rate.values(), zero),
+        total_vat=sum(vat_by_rate.values(), zero),
+    )
+
+def _lines_version(lines) -> Tuple[int, int]:
+    """Antal linjer og, for InvoiceLineColumns, dens ændringstæller - O(1)"""
+    return len(lines), lines.version if isinstance(lines, InvoiceLineColumns) else 0
+
 # ============ DATA KLASSER ============
+# Tilladte felter i JSON-input - ukendte felter afvises
+_PLATFORM_FIELDS = frozenset({"company_name", "address", "postal_city", "cvr", "phone", "email", "website",
+                              "bank_name", "bank_reg", "bank_account"})
+_CUSTOMER_FIELDS = frozenset({"company_name", "cvr", "address", "postal_city", "attention", "email"})
+_LINE_FIELDS = frozenset({"description", "quantity", "unit", "unit_price", "vat_rate"})
+_FAKTURA_FIELDS = frozenset({"invoice_number", "invoice_date", "lines", "payment_terms", "invoice_type",
+                             "order_reference"})
+
 @dataclass
 class PlatformInfo:
     company_name: str = "OrderFlow ApS"
@@ -60,6 +156,11 @@ class PlatformInfo:
     bank_name: str = "Danske Bank"
     bank_reg: str = "1234"
     bank_account: str = "12345678"
+    
+    @classmethod
+    def from_dict(cls, data: dict, path: str = "platform") -> "PlatformInfo":
+        data = require_object(data, path, _PLATFORM_FIELDS)
+        return cls(**{key: parse_str(value, field_path(path, key)) for key, value in data.items()})
 
 @dataclass
 class CustomerInfo:
@@ -69,6 +170,18 @@ class CustomerInfo:
     postal_city: str
     attention: Optional[str] = None
     email: Optional[str] = None
+    
+    @classmethod
+    def from_dict(cls, data: dict, path: str = "customer") -> "CustomerInfo":
+        data = require_object(data, path, _CUSTOMER_FIELDS)
+        return cls(
+            company_name=parse_str(get_field(data, "company_name", path), field_path(path, "company_name")),
+            cvr=parse_str(get_field(data, "cvr", path), field_path(path, "cvr")),
+            address=parse_str(get_field(data, "address", path), field_path(path, "address")),
+            postal_city=parse_str(get_field(data, "postal_city", path), field_path(path, "postal_city")),
+            attention=parse_optional_str(data.get("attention"), field_path(path, "attention")),
+            email=parse_optional_str(data.get("email"), field_path(path, "email")),
+        )
 
 @dataclass
 class InvoiceLine:
@@ -78,17 +191,87 @@ class InvoiceLine:
     unit_price: float
     vat_rate: VatRate = VatRate.STANDARD
     
+    @classmethod
+    def from_dict(cls, data: dict, path: str = "line") -> "InvoiceLine":
+        data = require_object(data, path, _LINE_FIELDS)
+        return cls(
+            description=parse_str(get_field(data, "description", path), field_path(path, "description")),
+            # Negative enhedspriser er tilladt (rabatlinjer), negative antal er ikke
+            quantity=parse_number(get_field(data, "quantity", path), field_path(path, "quantity"), minimum=0),
+            unit=parse_str(get_field(data, "unit", path), field_path(path, "unit")),
+            unit_price=parse_number(get_field(data, "unit_price", path), field_path(path, "unit_price")),
+            vat_rate=parse_enum(VatRate, data.get("vat_rate", "STANDARD"), field_path(path, "vat_rate")),
+        )
+    
     @property
     def line_total_excl_vat(self) -> float:
-        return round(self.quantity * self.unit_price, 2)
+        return float(line_amounts(self.quantity, self.unit_price, self.vat_rate)[0])
     
     @property
     def vat_amount(self) -> float:
-        return round(self.line_total_excl_vat * (self.vat_rate.rate / 100), 2)
+        return float(line_amounts(self.quantity, self.unit_price, self.vat_rate)[1])
     
     @property
     def line_total_incl_vat(self) -> float:
-        return round(self.line_total_excl_vat + self.vat_amount, 2)
+        return float(sum(line_amounts(self.quantity, self.unit_price, self.vat_rate)))
+
+_VAT_RATES = tuple(VatRate)
+_VAT_CODES = {rate: code for code, rate in enumerate(_VAT_RATES)}
+
+class InvoiceLineColumns:
+    """
+    Kompakt kolonneform af fakturalinjer til fakturaer med mange linjer.
+
+    Antal og enhedspris ligger i array('d'), momssatsen som en byte, og
+    beskrivelse/enhed interneres så gentagne tekster deles. Kan bruges som
+    FakturaData.lines i stedet for en liste af InvoiceLine. Linjerne ændres
+    kun via append/extend - indeksering giver kopier som InvoiceLine.
+    """
+    __slots__ = ("descriptions", "quantities", "units", "unit_prices", "vat_codes", "version")
+    
+    def __init__(self, lines: Iterable[InvoiceLine] = ()):
+        self.descriptions: List[str] = []
+        self.quantities = array("d")
+        self.units: List[str] = []
+        self.unit_prices = array("d")
+        self.vat_codes = array("B")
+        self.version = 0
+        self.extend(lines)
+    
+    def append_values(self, description: str, quantity: float, unit: str, unit_price: float,
+                      vat_rate: VatRate = VatRate.STANDARD):
+        self.descriptions.append(sys.intern(description))
+        self.quantities.append(quantity)
+        self.units.append(sys.intern(unit))
+        self.unit_prices.append(unit_price)
+        self.vat_codes.append(_VAT_CODES[vat_rate])
+        self.version += 1
+    
+    def append(self, line: InvoiceLine):
+        self.append_values(line.description, line.quantity, line.unit, line.unit_price, line.vat_rate)
+    
+    def extend(self, lines: Iterable[InvoiceLine]):
+        for line in lines:
+            self.append(line)
+    
+    def values(self) -> Iterator[tuple]:
+        return zip(self.descriptions, self.quantities, self.units, self.unit_prices,
+                   map(_VAT_RATES.__getitem__, self.vat_codes))
+    
+    def __len__(self) -> int:
+        return len(self.quantities)
+    
+    def __getitem__(self, index: int) -> InvoiceLine:
+        line = InvoiceLine.__new__(InvoiceLine)
+        # Direkte i __dict__ - hurtigere end __init__ når alle linjer læses
+        line.__dict__.update(
+            description=self.descriptions[index], quantity=self.quantities[index], unit=self.units[index],
+            unit_price=self.unit_prices[index], vat_rate=_VAT_RATES[self.vat_codes[index]],
+        )
+        return line
+    
+    def __iter__(self) -> Iterator[InvoiceLine]:
+        return (self[i] for i in range(len(self)))
 
 @dataclass
 class FakturaData:
@@ -99,133 +282,543 @@ class FakturaData:
     invoice_type: FakturaType = FakturaType.INVOICE
     order_reference: Optional[str] = None
     
+    @classmethod
+    def from_dict(cls, data: dict, path: str = "faktura") -> "FakturaData":
+        data = require_object(data, path, _FAKTURA_FIELDS)
+        lines_path = field_path(path, "lines")
+        lines = get_field(data, "lines", path)
+        if not isinstance(lines, list):
+            raise SchemaError(lines_path, f"forventede en liste, fik {type(lines).__name__}")
+        return cls(
+            invoice_number=parse_str(get_field(data, "invoice_number", path), field_path(path, "invoice_number")),
+            invoice_date=parse_date(get_field(data, "invoice_date", path), field_path(path, "invoice_date")),
+            lines=[InvoiceLine.from_dict(ln, f"{lines_path}[{i}]") for i, ln in enumerate(lines)],
+            payment_terms=parse_enum(PaymentTerms, data.get("payment_terms", "NET_14"), field_path(path, "payment_terms")),
+            invoice_type=parse_enum(FakturaType, data.get("invoice_type", "INVOICE"), field_path(path, "invoice_type")),
+            order_reference=parse_optional_str(data.get("order_reference"), field_path(path, "order_reference")),
+        )
+    
+    @classmethod
+    def from_json(cls, text: Union[str, bytes]) -> "FakturaData":
+        return cls.from_dict(json.loads(text))
+    
+    @property
+    def totals(self) -> InvoiceTotals:
+        """
+        Linjebeløb og momssummer - beregnes én gang og genbruges. Beregnes igen
+        når lines erstattes eller linjer tilføjes/fjernes; ændres en linje eller
+        en plads i listen direkte, skal invalidate_totals() kaldes.
+        """
+        lines = self.lines
+        cached = self.__dict__.get("_totals")
+        if cached is not None and cached[1] is lines and cached[2] == _lines_version(lines):
+            return cached[0]
+        totals = compute_totals(lines)
+        self._totals = (totals, lines, _lines_version(lines))
+        return totals
+    
+    def invalidate_totals(self):
+        """Efter ændringer i eksisterende linjer - næste opslag beregner totalerne forfra"""
+        self.__dict__.pop("_totals", None)
+    
     @property
     def due_date(self) -> date:
         return self.invoice_date + timedelta(days=self.payment_terms.days)
     
     @property
     def subtotal_excl_vat(self) -> float:
-        return sum(line.line_total_excl_vat for line in self.lines)
+        return float(self.totals.subtotal_excl_vat)
     
     @property
     def total_vat(self) -> float:
-        return sum(line.vat_amount for line in self.lines)
+        return float(self.totals.total_vat)
     
     @property
     def total_incl_vat(self) -> float:
-        return round(self.subtotal_excl_vat + self.total_vat, 2)
+        return float(self.totals.total_incl_vat)
 
 # ============ HJÆLPEFUNKTIONER ============
+# Sti eller skrivbart binært fil-objekt
+OutputTarget = Union[str, os.PathLike, BinaryIO]
+
 def fmt_currency(amount: float) -> str:
     return f"{amount:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".") + " DKK"
 
 def fmt_date(d: date) -> str:
     return d.strftime("%d.%m.%Y")
 
+def vat_rows(totals: InvoiceTotals) -> List[list]:
+    """Én totalrække pr. momssats - momsfrie linjer vises med deres grundlag"""
+    groups = totals.vat_groups() or [VatGroupTotals(VatRate.STANDARD, Decimal(0), Decimal(0))]
+    rows = []
+    for group in groups:
+        if group.vat_rate.rate:
+            rows.append([f'Moms {group.vat_rate.label}:', fmt_currency(group.vat)])
+        else:
+            rows.append([f'Momsfrit ({group.vat_rate.label}):', fmt_currency(group.net)])
+    return rows
+
+LINE_HEADER_ROW = ['Beskrivelse', 'Antal', 'Enhed', 'Enhedspris', 'Beløb']
+
+def line_row(description: str, quantity: float, unit: str, unit_price: float, line_total: Decimal) -> list:
+    return [
+        description,
+        f"{quantity:.0f}" if quantity == int(quantity) else f"{quantity:.2f}".replace(".", ","),
+        unit,
+        f"{unit_price:,.2f}".replace(",", "X").replace(".", ",").replace("X", "."),
+        f"{line_total:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
+    ]
+
 # ============ CANVAS MED SIDEFOD OG BETALINGSINFO ============
+# Betalingsboksen - matcher "Faktureres til" boksen
+PAYMENT_BOX_X = 20*mm
+PAYMENT_BOX_Y = 20*mm
+PAYMENT_BOX_HEIGHT = 22*mm
+PAYMENT_TEXT_X = PAYMENT_BOX_X + 3*mm
+PAYMENT_HEADING_Y = PAYMENT_BOX_Y + PAYMENT_BOX_HEIGHT - 5*mm
+PAYMENT_BANK_Y = PAYMENT_BOX_Y + PAYMENT_BOX_HEIGHT - 10*mm
+PAYMENT_REFERENCE_Y = PAYMENT_BOX_Y + PAYMENT_BOX_HEIGHT - 15*mm
+
+REFERENCE_PREFIX = "Anfør fakturanr. "
+REFERENCE_SUFFIX = " ved betaling"
+
+# Form XObjects med de faste dele af betalingsboks og sidefod (compiled_furniture)
+PAYMENT_BOX_FORM = "paymentBox"
+FOOTER_FORM = "pageFooter"
+
+@dataclass(frozen=True)
+class PlatformTexts:
+    bank_line: str
+    footer_text: str
+    footer_x: float
+
+_platform_texts_cache: Dict[tuple, PlatformTexts] = {}
+
+def platform_texts(p: PlatformInfo, font_name: str = "Helvetica") -> PlatformTexts:
+    """Sidefods- og banktekster for en platform - deles af alle dokumenter i processen"""
+    key = astuple(p) + (font_name,)
+    texts = _platform_texts_cache.get(key)
+    if texts is None:
+        footer_text = f"{p.company_name} | {p.address}, {p.postal_city} | CVR: DK {p.cvr} | {p.phone} | {p.email} | {p.website}"
+        texts = _platform_texts_cache[key] = PlatformTexts(
+            bank_line=f"{p.bank_name} | Reg: {p.bank_reg} | Konto: {p.bank_account}",
+            footer_text=footer_text,
+            footer_x=A4[0] / 2 - stringWidth(footer_text, font_name, 7) / 2,
+        )
+    return texts
+
 class FakturaCanvas(canvas.Canvas):
-    def __init__(self, *args, platform_info: PlatformInfo = None, invoice_number: str = "", **kwargs):
+    def __init__(self, *args, platform_info: PlatformInfo = None, invoice_number: str = "",
+                 deferred_page_count: bool = False, compiled_furniture: bool = False, streaming: bool = False,
+                 fonts: FontFamily = BUILTIN_FONTS, output_profile: OutputProfile = STANDARD_PROFILE, **kwargs):
+        if fonts.embedded:
+            # Ellers står Helvetica som (ikke-indlejret) skrift i hver sides ressourcer
+            kwargs["initialFontName"] = fonts.regular
         canvas.Canvas.__init__(self, *args, **kwargs)
         self._saved_page_states = []
         self.platform_info = platform_info or PlatformInfo()
-        self.invoice_number = invoice_number
+        # Skriv hver side til output når den er færdig. Kræver udskudt sidetotal,
+        # ellers kan ingen side skrives før den sidste er lagt ud
+        if streaming:
+            self._doc = streaming_document(self._doc, self._filename)
+        apply_output_profile(self, output_profile)
+        # Tegn sidefod med det samme og indsæt sidetotalen som forward-reference,
+        # i stedet for at gemme hver sides tilstand til save()
+        self.deferred_page_count = deferred_page_count or streaming
+        # Faste dele af betalingsboks og sidefod som form XObjects, der kun ligger én gang i filen
+        self.compiled_furniture = compiled_furniture or output_profile.compiled_furniture
+        # Profilens forms betaler sig først når de genbruges - første side tegnes direkte
+        self._inline_furniture_pages = 0 if compiled_furniture else 1
+        self._uses_furniture_forms = False
         # Beregn bredde - samme som page_width * 0.55
         self.box_width = (A4[0] - 40*mm) * 0.55
+        # Faste tekster og bredder beregnes én gang pr. dokument i stedet for pr. side
+        self.fonts = fonts
+        self._texts = platform_texts(self.platform_info, fonts.regular)
+        self._invoice_number_x = PAYMENT_TEXT_X + stringWidth(REFERENCE_PREFIX, fonts.regular, 9)
+        # Færdig PDF-kode for de faste tekster. Dict'en deles af de gemte sidetilstande,
+        # så den overlever __dict__.update() i save()
+        self._static_code: Dict[str, str] = {}
+        # Samlede PDF'er: hvilken faktura siden hører til, dens første side og sideantal
+        self._invoice_index = 0
+        self._invoice_first_page = 1
+        self._invoice_page_counts: List[int] = [0]
+        self._pending_bookmark: Optional[Tuple[str, str]] = None
+        self._set_invoice_number(invoice_number)
+
+    def _set_invoice_number(self, invoice_number: str):
+        self.invoice_number = invoice_number
+        self._reference_suffix_x = self._invoice_number_x + stringWidth(invoice_number, self.fonts.bold, 9)
+
+    def start_invoice(self, invoice_number: str, title: Optional[str] = None):
+        """Kaldes af InvoiceStart på første side af hver faktura i en samlet PDF"""
+        if self._pageNumber != self._invoice_first_page:
+            self._invoice_index += 1
+            self._invoice_first_page = self._pageNumber
+            self._invoice_page_counts.append(0)
+        self._set_invoice_number(invoice_number)
+        if title:
+            self._pending_bookmark = (f"faktura{self._invoice_index}", title)
+
+    @property
+    def _page_total_form(self) -> str:
+        # Første faktura bruger standardnavnet, så en enkelt faktura er uændret
+        return f"{PAGE_TOTAL_FORM}{self._invoice_index}" if self._invoice_index else PAGE_TOTAL_FORM
+
+    def _add_pending_bookmark(self):
+        if self._pending_bookmark:
+            key, title = self._pending_bookmark
+            self.bookmarkPage(key)
+            self.addOutlineEntry(title, key, level=0)
+            self.showOutline()
 
     def showPage(self):
+        self._invoice_page_counts[self._invoice_index] += 1
+        if self.deferred_page_count:
+            self._add_pending_bookmark()
+            self._pending_bookmark = None
+            self.draw_payment_info()
+            self.draw_footer(None)
+            canvas.Canvas.showPage(self)
+            return
         self._saved_page_states.append(dict(self.__dict__))
+        self._pending_bookmark = None
         self._startPage()
 
     def save(self):
-        num_pages = len(self._saved_page_states)
+        if self.deferred_page_count:
+            if self._code:
+                self.showPage()
+            for index, count in enumerate(self._invoice_page_counts):
+                self._invoice_index = index
+                define_page_total(self, count, font_name=self.fonts.regular, form_name=self._page_total_form)
+            if self._uses_furniture_forms:
+                self._define_furniture_forms()
+            canvas.Canvas.save(self)
+            return
+        page_counts = self._invoice_page_counts
         for state in self._saved_page_states:
             self.__dict__.update(state)
+            self._add_pending_bookmark()
             self.draw_payment_info()
-            self.draw_footer(num_pages)
+            self.draw_footer(page_counts[self._invoice_index])
             canvas.Canvas.showPage(self)
+        if self._uses_furniture_forms:
+            self._define_furniture_forms()
         canvas.Canvas.save(self)
 
+    @property
+    def _furniture_as_forms(self) -> bool:
+        return self.compiled_furniture and self._pageNumber > self._inline_furniture_pages
+
     def draw_payment_info(self):
         """Tegner betalingsoplysninger i venstre side, lige over sidefod"""
-        page_width, page_height = A4
-        p = self.platform_info
-        
-        # Position og størrelse - matcher "Faktureres til" boksen
-        box_x = 20*mm
-        box_y = 20*mm
-        box_width = self.box_width
-        box_height = 22*mm  # Matcher højden på Faktureres til
-        padding = 3*mm
-        
+        if self._furniture_as_forms:
+            # Baggrund, overskrift og bankoplysninger ligger i en form XObject - kun referencen tegnes pr. side
+            self._uses_furniture_forms = True
+            self.doForm(PAYMENT_BOX_FORM)
+            key = "reference:" + self.invoice_number
+            code = self._static_code.get(key)
+            if code is None:
+                text = self.beginText()
+                text.setFillColor(TEXT_COLOR)
+                text.setFont(self.fonts.regular, 9)
+                self._reference_text(text)
+                code = self._static_code[key] = text.getCode()
+            self._code.append(code)
+            return
+
         # Baggrund
         self.setFillColor(LIGHT_GRAY)
-        self.roundRect(box_x, box_y, box_width, box_height, 0, fill=True, stroke=False)
-        
-        # Tekst
-        self.setFillColor(TEXT_COLOR)
-        
-        # Overskrift
-        self.setFont("Helvetica-Bold", 9)
-        self.drawString(box_x + padding, box_y + box_height - 5*mm, "Betalingsoplysninger")
+        self.rect(PAYMENT_BOX_X, PAYMENT_BOX_Y, self.box_width, PAYMENT_BOX_HEIGHT, fill=True, stroke=False)
         
-        # Bankinfo
-        self.setFont("Helvetica", 9)
-        self.drawString(box_x + padding, box_y + box_height - 10*mm, f"{p.bank_name} | Reg: {p.bank_reg} | Konto: {p.bank_account}")
-        
-        # Fakturanummer reference
-        self.setFont("Helvetica", 9)
-        text_y = box_y + box_height - 15*mm
-        self.drawString(box_x + padding, text_y, "Anfør fakturanr. ")
+        # Teksten er ens på alle fakturaens sider - PDF-koden bygges kun første gang
+        key = "payment_info:" + self.invoice_number
+        code = self._static_code.get(key)
+        if code is None:
+            code = self._static_code[key] = self._payment_info_text().getCode()
+        self._code.append(code)
+
+    def _payment_info_text(self):
+        # Al tekst i ét tekstobjekt, i læserækkefølge så tekstudtræk giver hele referencen
+        text = self.beginText()
+        text.setFillColor(TEXT_COLOR)
+        self._payment_heading_text(text)
+        self._reference_text(text)
+        return text
+
+    def _payment_heading_text(self, text):
+        text.setFont(self.fonts.bold, 9)
+        text.setTextOrigin(PAYMENT_TEXT_X, PAYMENT_HEADING_Y)
+        text.textOut("Betalingsoplysninger")
+        text.setFont(self.fonts.regular, 9)
+        text.setTextOrigin(PAYMENT_TEXT_X, PAYMENT_BANK_Y)
+        text.textOut(self._texts.bank_line)
+
+    def _reference_text(self, text):
+        # Forventer at skriften allerede er den almindelige skrift i 9 pt
+        text.setTextOrigin(PAYMENT_TEXT_X, PAYMENT_REFERENCE_Y)
+        text.textOut(REFERENCE_PREFIX)
+        text.setFont(self.fonts.bold, 9)
+        text.setTextOrigin(self._invoice_number_x, PAYMENT_REFERENCE_Y)
+        text.textOut(self.invoice_number)
+        text.setFont(self.fonts.regular, 9)
+        text.setTextOrigin(self._reference_suffix_x, PAYMENT_REFERENCE_Y)
+        text.textOut(REFERENCE_SUFFIX)
+
+    def draw_footer(self, page_count):
+        page_width = A4[0]
         
-        # Beregn position for bold tekst
-        text_width = self.stringWidth("Anfør fakturanr. ", "Helvetica", 9)
-        self.setFont("Helvetica-Bold", 9)
-        self.drawString(box_x + padding + text_width, text_y, self.invoice_number)
+        if self._furniture_as_forms:
+            self._uses_furniture_forms = True
+            self.doForm(FOOTER_FORM)
+            # Formen gendanner grafiktilstanden - sidetallet skal stadig være gråt
+            self.setFillColor(colors.gray)
+        else:
+            self._draw_footer_static()
         
-        # Fortsæt med normal tekst
-        bold_width = self.stringWidth(self.invoice_number, "Helvetica-Bold", 9)
-        self.setFont("Helvetica", 9)
-        self.drawString(box_x + padding + text_width + bold_width, text_y, " ved betaling")
+        # Side X af Y - tællet pr. faktura i en samlet PDF
+        draw_page_number(self, page_width / 2, 4*mm, page_count,
+                         font_name=self.fonts.regular,
+                         page_number=self._pageNumber - self._invoice_first_page + 1,
+                         form_name=self._page_total_form)
 
-    def draw_footer(self, page_count):
-        page_width, page_height = A4
-        p = self.platform_info
+    def _draw_footer_static(self):
+        page_width = A4[0]
         
         # Tynd linje over sidefod
         self.setStrokeColor(MEDIUM_GRAY)
         self.setLineWidth(0.5)
         self.line(20*mm, 15*mm, page_width - 20*mm, 15*mm)
         
-        # Firmainfo linje
-        self.setFont("Helvetica", 7)
+        # Firmainfo linje - bredden er beregnet på forhånd og PDF-koden bygges kun første gang
         self.setFillColor(colors.gray)
-        footer_text = f"{p.company_name} | {p.address}, {p.postal_city} | CVR: DK {p.cvr} | {p.phone} | {p.email} | {p.website}"
-        self.drawCentredString(page_width / 2, 9*mm, footer_text)
+        code = self._static_code.get("footer")
+        if code is None:
+            text = self.beginText(self._texts.footer_x, 9*mm)
+            text.setFont(self.fonts.regular, 7)
+            text.textOut(self._texts.footer_text)
+            code = self._static_code["footer"] = text.getCode()
+        self._code.append(code)
+
+    def _define_furniture_forms(self):
+        """Formene som siderne har refereret til - defineres én gang, når dokumentet gemmes"""
+        self.beginForm(PAYMENT_BOX_FORM)
+        self.setFillColor(LIGHT_GRAY)
+        self.rect(PAYMENT_BOX_X, PAYMENT_BOX_Y, self.box_width, PAYMENT_BOX_HEIGHT, fill=True, stroke=False)
+        text = self.beginText()
+        text.setFillColor(TEXT_COLOR)
+        self._payment_heading_text(text)
+        self.drawText(text)
+        self.endForm()
         
-        # Side X af Y
-        self.setFont("Helvetica", 8)
-        page_text = f"Side {self._pageNumber} af {page_count}"
-        self.drawCentredString(page_width / 2, 4*mm, page_text)
+        self.beginForm(FOOTER_FORM)
+        self._draw_footer_static()
+        self.endForm()
+
+class InvoiceStart(Flowable):
+    """Usynlig markør først i hver faktura i en samlet PDF - skifter fakturaen på canvas'et"""
+
+    def __init__(self, invoice_number: str, title: Optional[str] = None):
+        Flowable.__init__(self)
+        self.invoice_number = invoice_number
+        self.title = title
+
+    def wrap(self, availWidth, availHeight):
+        return 0, 0
+
+    def draw(self):
+        self.canv.start_invoice(self.invoice_number, self.title)
+
+class DeferredTable(Flowable):
+    """
+    Står i stedet for en chunk af linjetabellen, rækkerne start..stop, og
+    bygger den først når layoutet når til den.
+
+    Table() koster mest af opbygningen af en stor faktura; bygges alle chunks
+    på forhånd, venter første side (og ved streaming første byte) på dem alle.
+    build(start, stop, header) bygger chunken med eller uden header-række.
+    Første chunk har altid header; de andre kun når de starter øverst på en
+    side, så de ellers fortsætter tabellen over sig uden afbrydelse.
+    """
+
+    def __init__(self, build: Callable[[int, int, bool], Table], start: int, stop: int, first: bool):
+        Flowable.__init__(self)
+        self._build = build
+        self.start = start
+        self.stop = stop
+        self.first = first
+        self._header = first
+        self._tables: Dict[bool, Table] = {}
+
+    def table(self, header: bool) -> Table:
+        table = self._tables.get(header)
+        if table is None:
+            table = self._tables[header] = self._build(self.start, self.stop, header)
+        return table
+
+    def _wants_header(self) -> bool:
+        frame = getattr(self, "_frame", None)
+        return self.first or bool(frame is not None and frame._atTop)
+
+    def wrap(self, availWidth, availHeight):
+        self._header = self._wants_header()
+        return self.table(self._header).wrap(availWidth, availHeight)
+
+    def split(self, availWidth, availHeight):
+        header = self._wants_header()
+        parts = self.table(header).split(availWidth, availHeight)
+        if header or not parts:
+            # Med header gentager tabellen den selv (repeatRows) på næste side
+            return parts
+        # Resten starter øverst på næste side og skal have header
+        stop = self.start + len(parts[0]._cellvalues)
+        return [parts[0], DeferredTable(self._build, stop, self.stop, first=False)]
+
+    def drawOn(self, canvas, x, y, _sW=0):
+        self.table(self._header).drawOn(canvas, x, y, _sW)
+
+    def getSpaceBefore(self):
+        return self.table(self._header).getSpaceBefore()
+
+    def getSpaceAfter(self):
+        return self.table(self._header).getSpaceAfter()
 
 # ============ PDF GENERATOR ============
 class FakturaGenerator:
     
-    def __init__(self, platform_info: PlatformInfo = None):
+    def __init__(self, platform_info: PlatformInfo = None, deferred_page_count: bool = False,
+                 large_invoice_threshold: int = LARGE_INVOICE_THRESHOLD, chunk_rows: int = LINE_CHUNK_ROWS,
+                 invariant: Optional[bool] = None, compiled_furniture: bool = False, streaming: bool = False,
+                 fonts: FontFamily = BUILTIN_FONTS, output_profile: OutputProfile = STANDARD_PROFILE,
+                 stats_callback: Optional[StatsCallback] = None):
+        if output_profile.pdfa and not fonts.embedded:
+            raise ValueError("PDF/A kræver indlejrede skrifttyper - brug en TTF-familie fra pdf_fonts")
         self.platform = platform_info or PlatformInfo()
         self.page_width = A4[0] - 40*mm
+        self.deferred_page_count = deferred_page_count
+        # Fast tidsstempel og dokument-ID: samme input giver byte-identisk PDF.
+        # None følger ReportLabs rl_config.invariant
+        self.invariant = invariant
+        self.large_invoice_threshold = large_invoice_threshold
+        self.chunk_rows = chunk_rows
+        self.compiled_furniture = compiled_furniture
+        # Første side skrives til output mens resten lægges ud (slår deferred_page_count til)
+        self.streaming = streaming
+        # Helvetica eller en TTF-familie fra pdf_fonts.register_ttf_family()
+        self.fonts = fonts
+        # Komprimering, delte ressourcer og PDF/A - se pdf_output
+        self.output_profile = output_profile
+        # Kaldes med en RenderStats efter hvert dokument - None slår målingen helt fra
+        self.stats_callback = stats_callback
+    
+    def _chunked_lines_tables(self, rows: List[list], col_widths: List[float]) -> List[DeferredTable]:
+        """
+        Store fakturaer: linjetabellen bygget som flere tabeller af chunk_rows linjer.
+
+        ReportLab splitter en tabel ved at måle alle resterende rækker igen for
+        hver side, så én stor tabel bliver superlineær i antal linjer. Chunks
+        ligger direkte under hinanden og har kun header øverst på en side, så
+        layoutet er det samme som med én tabel med gentaget header.
+        """
+        def build(start: int, stop: int, header: bool) -> Table:
+            last = stop >= len(rows)
+            if header:
+                chunk = Table([LINE_HEADER_ROW] + rows[start:stop], colWidths=col_widths, repeatRows=1)
+                style = "faktura.lines_table" if last else "faktura.lines_table_chunk"
+            else:
+                chunk = Table(rows[start:stop], colWidths=col_widths)
+                style = "faktura.lines_table_rows_last" if last else "faktura.lines_table_rows"
+            chunk.setStyle(get_style(style, self.fonts))
+            return chunk
+
+        return [DeferredTable(build, start, min(start + self.chunk_rows, len(rows)), first=start == 0)
+                for start in range(0, len(rows), self.chunk_rows)]
     
     def generate(self, faktura: FakturaData, customer: CustomerInfo) -> bytes:
         buffer = BytesIO()
+        self.generate_to(buffer, faktura, customer)
+        return buffer.getvalue()
+    
+    def generate_to(self, target: OutputTarget, faktura: FakturaData, customer: CustomerInfo) -> None:
+        """Skriver PDF'en direkte til en sti eller et skrivbart binært fil-objekt (fil, pipe, HTTP-svar)"""
+        if self.stats_callback is None:
+            self._build(target, self.invoice_story(faktura, customer), faktura.invoice_number)
+            return
+        stats = RenderStats("faktura", faktura.invoice_number)
+        watch = Stopwatch()
+        story = self.invoice_story(faktura, customer)
+        stats.story_ms = watch.ms()
+        self._build(target, story, faktura.invoice_number, stats)
+    
+    def generate_merged(self, items: Iterable[Tuple[FakturaData, CustomerInfo]]) -> bytes:
+        buffer = BytesIO()
+        self.generate_merged_to(buffer, items)
+        return buffer.getvalue()
+    
+    def generate_merged_to(self, target: OutputTarget, items: Iterable[Tuple[FakturaData, CustomerInfo]]) -> None:
+        """
+        Samler mange fakturaer i én PDF, bygget i ét gennemløb.
+
+        Hver faktura starter på en ny side og har sit eget "Side X af Y",
+        sin egen betalingsreference og et bogmærke med fakturanummeret.
+        """
+        watch = Stopwatch() if self.stats_callback else None
+        story = []
+        for faktura, customer in items:
+            if story:
+                story.append(PageBreak())
+            story.append(InvoiceStart(faktura.invoice_number, f"{faktura.invoice_type.value} {faktura.invoice_number}"))
+            story.extend(self.invoice_story(faktura, customer))
+        if not story:
+            raise ValueError("Ingen fakturaer at samle")
+        stats = None
+        if watch:
+            stats = RenderStats("faktura.merged", story[0].invoice_number, story_ms=watch.ms())
+        self._build(target, story, story[0].invoice_number, stats)
+    
+    def _build(self, target: OutputTarget, story: list, invoice_number: str,
+               stats: Optional[RenderStats] = None) -> None:
+        if isinstance(target, (str, os.PathLike)):
+            target = os.fspath(target)
         
         doc = SimpleDocTemplate(
-            buffer,
+            target,
             pagesize=A4,
             leftMargin=20*mm,
             rightMargin=20*mm,
             topMargin=20*mm,
-            bottomMargin=48*mm  # Plads til betalingsinfo + sidefod
+            bottomMargin=48*mm,  # Plads til betalingsinfo + sidefod
+            **({"invariant": self.invariant} if self.invariant is not None else {})
         )
         
+        # Generer PDF med custom canvas
+        platform_info = self.platform
+        deferred_page_count = self.deferred_page_count
+        compiled_furniture = self.compiled_furniture
+        streaming = self.streaming
+        fonts = self.fonts
+        output_profile = self.output_profile
+        def canvas_maker(*args, **kwargs):
+            return FakturaCanvas(*args, platform_info=platform_info, invoice_number=invoice_number,
+                                 deferred_page_count=deferred_page_count,
+                                 compiled_furniture=compiled_furniture, streaming=streaming, fonts=fonts,
+                                 output_profile=output_profile, **kwargs)
+        
+        try:
+            if stats is None:
+                doc.build(story, canvasmaker=canvas_maker)
+                return
+            start = output_position(target)
+            build_with_stats(doc, story, canvas_maker, stats)
+        except BaseException:
+            # Ved streaming er de første sider allerede skrevet - ingen halv PDF på disken
+            discard_output(getattr(doc, "canv", None))
+            raise
+        stats.bytes = output_size(target, start)
+        self.stats_callback(stats)
+    
+    def invoice_story(self, faktura: FakturaData, customer: CustomerInfo) -> list:
         story = []
         p = self.platform
         
@@ -235,25 +828,23 @@ class FakturaGenerator:
 <font size="9">{p.address}, {p.postal_city}<br/>
 CVR: DK {p.cvr} | Tlf: {p.phone}<br/>
 {p.email}</font>""",
-            ParagraphStyle('LH', fontSize=9, leading=11, textColor=TEXT_COLOR)
+            get_style("faktura.left_header", self.fonts)
         )
         
         right_header = Paragraph(
             f"""<font size="24"><b>{faktura.invoice_type.value}</b></font><br/>
 <font size="11">Nr. {faktura.invoice_number}</font>""",
-            ParagraphStyle('RH', fontSize=11, leading=14, alignment=TA_RIGHT, textColor=PRIMARY_COLOR)
+            get_style("faktura.right_header", self.fonts)
         )
         
         header_table = Table([[left_header, right_header]], colWidths=[self.page_width*0.55, self.page_width*0.45])
-        header_table.setStyle(TableStyle([
-            ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-        ]))
+        header_table.setStyle(get_style("header_row", self.fonts))
         story.append(header_table)
         story.append(Spacer(1, 4*mm))
         
         # Linje
         line = Table([['']], colWidths=[self.page_width])
-        line.setStyle(TableStyle([('LINEBELOW', (0, 0), (-1, -1), 1.5, PRIMARY_COLOR)]))
+        line.setStyle(get_style("faktura.rule", self.fonts))
         story.append(line)
         story.append(Spacer(1, 6*mm))
         
@@ -267,7 +858,7 @@ CVR: DK {p.cvr} | Tlf: {p.phone}<br/>
 {att}<font size="9">{customer.address}<br/>
 {customer.postal_city}<br/>
 CVR: {customer.cvr}</font>""",
-            ParagraphStyle('LI', fontSize=9, leading=11, textColor=TEXT_COLOR)
+            get_style("faktura.left_info", self.fonts)
         )
         
         right_info = Paragraph(
@@ -276,96 +867,42 @@ CVR: {customer.cvr}</font>""",
 <b>Forfaldsdato:</b> {fmt_date(faktura.due_date)}<br/>
 <b>Betaling:</b> {faktura.payment_terms.label}<br/>
 {ref}</font>""",
-            ParagraphStyle('RI', fontSize=9, leading=12, alignment=TA_RIGHT, textColor=TEXT_COLOR)
+            get_style("faktura.right_info", self.fonts)
         )
         
         info_table = Table([[left_info, right_info]], colWidths=[self.page_width*0.55, self.page_width*0.45])
-        info_table.setStyle(TableStyle([
-            ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-            ('BACKGROUND', (0, 0), (0, 0), LIGHT_GRAY),
-            ('LEFTPADDING', (0, 0), (0, 0), 3*mm),
-            ('TOPPADDING', (0, 0), (0, 0), 3*mm),
-            ('BOTTOMPADDING', (0, 0), (0, 0), 3*mm),
-            ('RIGHTPADDING', (0, 0), (0, 0), 3*mm),
-        ]))
+        info_table.setStyle(get_style("faktura.info_table", self.fonts))
         story.append(info_table)
         story.append(Spacer(1, 8*mm))
         
         # ========== FAKTURALINJER ==========
-        header_row = ['Beskrivelse', 'Antal', 'Enhed', 'Enhedspris', 'Beløb']
-        table_data = [header_row]
-        
-        for ln in faktura.lines:
-            table_data.append([
-                ln.description,
-                f"{ln.quantity:.0f}" if ln.quantity == int(ln.quantity) else f"{ln.quantity:.2f}".replace(".", ","),
-                ln.unit,
-                f"{ln.unit_price:,.2f}".replace(",", "X").replace(".", ",").replace("X", "."),
-                f"{ln.line_total_excl_vat:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
-            ])
-        
+        totals = faktura.totals
+        rows = [line_row(description, quantity, unit, unit_price, line_total)
+                for (description, quantity, unit, unit_price, _), line_total
+                in zip(line_values(faktura.lines), totals.line_totals)]
         col_widths = [self.page_width*0.40, self.page_width*0.12, self.page_width*0.12, self.page_width*0.18, self.page_width*0.18]
         
-        lines_table = Table(table_data, colWidths=col_widths)
-        lines_table.setStyle(TableStyle([
-            # Header
-            ('BACKGROUND', (0, 0), (-1, 0), PRIMARY_COLOR),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 9),
-            ('TOPPADDING', (0, 0), (-1, 0), 2.5*mm),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 2.5*mm),
-            # Data
-            ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-            ('FONTSIZE', (0, 1), (-1, -1), 9),
-            ('TEXTCOLOR', (0, 1), (-1, -1), TEXT_COLOR),
-            ('TOPPADDING', (0, 1), (-1, -1), 2*mm),
-            ('BOTTOMPADDING', (0, 1), (-1, -1), 2*mm),
-            # Alignment
-            ('ALIGN', (1, 0), (-1, -1), 'RIGHT'),
-            ('ALIGN', (0, 0), (0, -1), 'LEFT'),
-            # Lines
-            ('LINEBELOW', (0, 1), (-1, -2), 0.5, MEDIUM_GRAY),
-            ('LINEBELOW', (0, -1), (-1, -1), 1, PRIMARY_COLOR),
-        ]))
-        story.append(lines_table)
+        if len(rows) > self.large_invoice_threshold:
+            story.extend(self._chunked_lines_tables(rows, col_widths))
+        else:
+            lines_table = Table([LINE_HEADER_ROW] + rows, colWidths=col_widths, repeatRows=1)
+            lines_table.setStyle(get_style("faktura.lines_table", self.fonts))
+            story.append(lines_table)
         story.append(Spacer(1, 6*mm))
         
         # ========== TOTALER (kun højre side) ==========
-        totals_data = [
-            ['Subtotal ekskl. moms:', fmt_currency(faktura.subtotal_excl_vat)],
-            ['Moms 25%:', fmt_currency(faktura.total_vat)],
-            ['Total inkl. moms:', fmt_currency(faktura.total_incl_vat)],
-        ]
+        totals_data = [['Subtotal ekskl. moms:', fmt_currency(totals.subtotal_excl_vat)]]
+        totals_data.extend(vat_rows(totals))
+        totals_data.append(['Total inkl. moms:', fmt_currency(totals.total_incl_vat)])
         
         totals_table = Table(totals_data, colWidths=[self.page_width*0.24, self.page_width*0.20])
-        totals_table.setStyle(TableStyle([
-            ('FONTNAME', (0, 0), (-1, -2), 'Helvetica'),
-            ('FONTNAME', (0, -1), (-1, -1), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, -2), 9),
-            ('FONTSIZE', (0, -1), (-1, -1), 11),
-            ('ALIGN', (0, 0), (-1, -1), 'RIGHT'),
-            ('TOPPADDING', (0, 0), (-1, -1), 1.5*mm),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 1.5*mm),
-            ('LINEABOVE', (0, -1), (-1, -1), 1, PRIMARY_COLOR),
-            ('BACKGROUND', (0, -1), (-1, -1), LIGHT_GRAY),
-            ('TOPPADDING', (0, -1), (-1, -1), 2.5*mm),
-            ('BOTTOMPADDING', (0, -1), (-1, -1), 2.5*mm),
-        ]))
+        totals_table.setStyle(get_style("faktura.totals_table", self.fonts))
         
         # Placer totaler til højre
         wrapper = Table([[Spacer(1,1), totals_table]], colWidths=[self.page_width*0.56, self.page_width*0.44])
-        wrapper.setStyle(TableStyle([('ALIGN', (1, 0), (1, 0), 'RIGHT')]))
+        wrapper.setStyle(get_style("faktura.totals_wrapper", self.fonts))
         story.append(wrapper)
-        
-        # Generer PDF med custom canvas
-        platform_info = self.platform
-        invoice_number = faktura.invoice_number
-        def canvas_maker(*args, **kwargs):
-            return FakturaCanvas(*args, platform_info=platform_info, invoice_number=invoice_number, **kwargs)
-        
-        doc.build(story, canvasmaker=canvas_maker)
-        return buffer.getvalue()
+        return story
 
 
 # ============ HOVEDFUNKTION ============
@@ -378,6 +915,129 @@ def generate_faktura(
     return generator.generate(faktura_data, customer_info)
 
 
+def generate_faktura_to(
+    target: OutputTarget,
+    faktura_data: FakturaData,
+    customer_info: CustomerInfo,
+    platform_info: PlatformInfo = None
+) -> None:
+    generator = FakturaGenerator(platform_info)
+    generator.generate_to(target, faktura_data, customer_info)
+
+
+def generate_faktura_merged(
+    items: Iterable[Tuple[FakturaData, CustomerInfo]],
+    platform_info: PlatformInfo = None
+) -> bytes:
+    generator = FakturaGenerator(platform_info)
+    return generator.generate_merged(items)
+
+
+# ============ BATCH (MÅNEDSKØRSEL) ============
+_batch_generator: Optional[FakturaGenerator] = None
+
+def _init_batch_worker(platform_info: Optional[PlatformInfo]):
+    global _batch_generator
+    _batch_generator = FakturaGenerator(platform_info)
+
+def _render_batch_item(item: Tuple[FakturaData, CustomerInfo]) -> Tuple[str, Union[bytes, BatchItemError]]:
+    invoice_number = "?"
+    try:
+        faktura, customer = item
+        invoice_number = faktura.invoice_number
+        return invoice_number, _batch_generator.generate(faktura, customer)
+    except Exception as exc:
+        return invoice_number, capture_item_error(invoice_number, exc)
+
+def generate_faktura_batch(
+    items: Iterable[Tuple[FakturaData, CustomerInfo]],
+    platform_info: PlatformInfo = None,
+    max_workers: Optional[int] = None,
+    ordered: bool = False,
+    max_pending: Optional[int] = None,
+) -> Iterator[Tuple[str, Union[bytes, BatchItemError]]]:
+    """
+    Renderer mange fakturaer parallelt og yielder (fakturanr., pdf_bytes) efterhånden.
+
+    Med ordered=True kommer resultaterne i samme rækkefølge som input, ellers
+    så snart de er færdige. Fejler en faktura, yieldes en BatchItemError i
+    stedet for pdf_bytes, og resten af batchen fortsætter.
+    """
+    return run_pool(
+        _render_batch_item,
+        items,
+        max_workers=max_workers,
+        ordered=ordered,
+        max_pending=max_pending,
+        initializer=_init_batch_worker,
+        initargs=(platform_info,),
+        item_key=lambda item: item[0].invoice_number,
+    )
+
+
+# ============ JSONL BULK-INDLÆSNING ============
+# Hver linje i filen: {"faktura": {...}, "customer": {...}}
+_JSONL_ROW_FIELDS = frozenset({"faktura", "customer"})
+_jsonl_output_dir: Optional[str] = None
+
+def faktura_filename(invoice_number: str) -> str:
+    return re.sub(r"[^\w.-]", "_", invoice_number) + ".pdf"
+
+def _init_jsonl_worker(platform_info: Optional[PlatformInfo], output_dir: str):
+    global _jsonl_output_dir
+    _init_batch_worker(platform_info)
+    _jsonl_output_dir = output_dir
+
+def _render_jsonl_item(item: Tuple[int, str]) -> Tuple[str, Union[str, BatchItemError]]:
+    # Parsning og validering sker i worker-processen, så den også fordeles over kernerne
+    line_no, line = item
+    key = f"linje {line_no}"
+    try:
+        row = require_object(json.loads(line), key, _JSONL_ROW_FIELDS)
+        faktura = FakturaData.from_dict(get_field(row, "faktura", ""), "faktura")
+        customer = CustomerInfo.from_dict(get_field(row, "customer", ""), "customer")
+        key = faktura.invoice_number
+        path = os.path.join(_jsonl_output_dir, faktura_filename(key))
+        _batch_generator.generate_to(path, faktura, customer)
+        return key, path
+    except Exception as exc:
+        return key, capture_item_error(key, exc)
+
+def _iter_jsonl(jsonl_path: str) -> Iterator[Tuple[int, str]]:
+    with open(jsonl_path, encoding="utf-8") as f:
+        for line_no, line in enumerate(f, 1):
+            if line.strip():
+                yield line_no, line
+
+def generate_faktura_jsonl(
+    jsonl_path: str,
+    output_dir: str,
+    platform_info: PlatformInfo = None,
+    max_workers: Optional[int] = None,
+    ordered: bool = False,
+    max_pending: Optional[int] = None,
+) -> Iterator[Tuple[str, Union[str, BatchItemError]]]:
+    """
+    Streamer en JSONL-fil med fakturaer til PDF-filer i output_dir.
+
+    Filen læses linje for linje, og højst max_pending linjer er under
+    behandling ad gangen, så hukommelsen er begrænset uanset filens
+    størrelse. Yielder (fakturanr., sti) - eller en BatchItemError for
+    linjer der ikke kan valideres eller renderes.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    return run_pool(
+        _render_jsonl_item,
+        _iter_jsonl(jsonl_path),
+        max_workers=max_workers,
+        ordered=ordered,
+        max_pending=max_pending,
+        initializer=_init_jsonl_worker,
+        initargs=(platform_info, output_dir),
+        item_key=lambda item: f"linje {item[0]}",
+    )
+
+
 # ============ TEST ============
 if __name__ == "__main__":
     platform = PlatformInfo()
@@ -405,8 +1065,10 @@ if __name__ == "__main__":
     
     pdf_bytes = generate_faktura(faktura, customer, platform)
     
-    with open("/home/claude/faktura.pdf", "wb") as f:
+    # Sti som første argument, ellers i den aktuelle mappe
+    output_path = sys.argv[1] if len(sys.argv) > 1 else "faktura.pdf"
+    with open(output_path, "wb") as f:
         f.write(pdf_bytes)
     
-    print("Faktura genereret!")
+    print(f"Faktura genereret: {os.path.abspath(output_path)}")
     print(f"Total: {fmt_currency(faktura.total_incl_vat)}")
@@ -0,0 +1,338 @@
+"""
+OrderFlow PDF arkiv - færdige fakturaer gemt til genudlevering uden ny rendering
+
+Et arkiv er en mappe med append-only pack-filer (PDF'erne skrevet efter
+hinanden) og én indeksfil med en post pr. dokument i fast bredde:
+fakturanummer, kundens CVR, fakturadato og placering i pack-filen.
+
+Indekset holdes i hukommelsen som kolonner (et array pr. felt) plus to
+sorterede nøglekolonner, så opslag på nummer og datointerval er binær
+søgning, O(log n), plus en lineær søgning i de højst REBUILD_THRESHOLD
+poster der er kommet til siden nøglerne sidst blev sorteret. Pack-filerne læses med mmap: get() returnerer en
+memoryview direkte ind i filen, som kan sendes til en socket uden kopi.
+
+    archive = PDFArchive("/var/lib/orderflow/arkiv")
+    archive_faktura(archive, generator, faktura, customer)
+    pdf = archive.get("2025-0042")
+
+Flere processer kan skrive til samme arkiv - tilføjelser serialiseres med
+en fil-lås, og læsere henter nye indeksposter når indeksfilen er vokset.
+PDF'en renderes først til et midlertidigt segment, så låsen kun holdes mens
+de færdige bytes og indeksposten skrives.
+
+Efter et nedbrud kan der ligge bytes i enden af en pack-fil uden indekspost
+og en halv post i enden af indeksfilen. Bytes uden post bliver aldrig læst,
+og en halv post skæres væk før næste post skrives.
+"""
+
+import fcntl
+import mmap
+import os
+import shutil
+import struct
+import tempfile
+import threading
+from array import array
+from bisect import bisect_left, bisect_right
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import date
+from io import BytesIO
+from itertools import chain
+from typing import BinaryIO, Dict, Iterator, List, NamedTuple, Optional
+
+import faktura_generator as fg
+
+# ============ FORMAT ============
+INDEX_MAGIC = b"OFARKIV1"
+INDEX_FILE = "index.bin"
+# Fakturanummer, CVR, dato (ordinal), pack-nummer, offset, længde
+INDEX_RECORD = struct.Struct("<32s16siHQI")
+MAX_PACK_BYTES = 1 << 30
+# PDF'er op til denne størrelse samles i hukommelsen før tilføjelse, større i en fil
+SPOOL_BYTES = 8 << 20
+# Nye indeksposter ud over de sorterede søges lineært - er der flere end
+# dette, flettes de ind i de sorterede nøgler ved næste opslag
+REBUILD_THRESHOLD = 64
+
+
+def _pack_name(pack: int) -> str:
+    return f"pack-{pack:05d}.pdfs"
+
+
+def _encode_key(value: str, size: int, label: str) -> bytes:
+    data = value.encode("utf-8")
+    if not data or len(data) > size:
+        raise ValueError(f"{label} skal være 1-{size} bytes i UTF-8, fik {value!r}")
+    return data
+
+
+@dataclass(frozen=True)
+class ArchiveEntry:
+    invoice_number: str
+    cvr: str
+    invoice_date: date
+    pack: int
+    offset: int
+    length: int
+
+class _SortedKeys(NamedTuple):
+    """
+    Sorterede nøgler med post-id'er ved siden af, for posterne 0..indexed-1.
+    Ved samme nøgle står posterne i tilføjelsesrækkefølge, så den nyeste er
+    den sidste. Udskiftes altid som helhed - en læser ser aldrig nøgler og
+    id'er ude af trit.
+    """
+    number_keys: List[str]
+    number_ids: array
+    date_keys: array
+    date_ids: array
+    indexed: int
+
+# ============ ARKIV ============
+class PDFArchive:
+    def __init__(self, directory: str, max_pack_bytes: int = MAX_PACK_BYTES, sync: bool = True):
+        self.directory = directory
+        self.max_pack_bytes = max_pack_bytes
+        # fsync efter hver tilføjelse - kan slås fra ved indlæsning af store batches
+        self.sync = sync
+        os.makedirs(directory, exist_ok=True)
+        # Kolonner i indeksfilens rækkefølge - posten med id i står på plads i i hver
+        self._numbers: List[str] = []
+        self._cvrs: List[str] = []
+        self._dates = array("i")
+        self._packs = array("H")
+        self._offsets = array("Q")
+        self._lengths = array("I")
+        # Antal poster hvis kolonner er skrevet helt - læsere kigger kun på dem
+        self._count = 0
+        self._keys = _SortedKeys([], array("I"), array("i"), array("I"), 0)
+        self._cvr_ids: Dict[str, array] = {}
+        self._maps: Dict[int, mmap.mmap] = {}
+        self._lock = threading.Lock()
+
+        path = os.path.join(directory, INDEX_FILE)
+        self._index = open(path, "a+b")
+        if os.fstat(self._index.fileno()).st_size == 0:
+            with self._locked():
+                if os.fstat(self._index.fileno()).st_size == 0:
+                    self._index.write(INDEX_MAGIC)
+                    self._index.flush()
+        self._index.seek(0)
+        if self._index.read(len(INDEX_MAGIC)) != INDEX_MAGIC:
+            raise ValueError(f"{path} er ikke en OrderFlow arkiv-indeksfil")
+        self._index_size = len(INDEX_MAGIC)
+        self._refresh()
+        self._sorted_keys()
+
+    def __len__(self) -> int:
+        self._refresh()
+        return self._count
+
+    def close(self):
+        self._index.close()
+        for mapped in self._maps.values():
+            try:
+                mapped.close()
+            except BufferError:
+                pass  # En udleveret memoryview holder stadig mappingen - frigives med den
+        self._maps.clear()
+
+    def __enter__(self) -> "PDFArchive":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # ============ INDEKS ============
+    def _refresh(self):
+        """Læser indeksposter som andre processer (eller skrivere) har tilføjet siden sidst"""
+        if os.fstat(self._index.fileno()).st_size == self._index_size:
+            return
+        with self._lock:
+            size = os.fstat(self._index.fileno()).st_size
+            # Kun hele poster - en post der er ved at blive skrevet tages med næste gang
+            end = self._index_size + (size - self._index_size) // INDEX_RECORD.size * INDEX_RECORD.size
+            data = os.pread(self._index.fileno(), end - self._index_size, self._index_size)
+            for fields in INDEX_RECORD.iter_unpack(data):
+                self._add_entry(*fields)
+            self._index_size = end
+            self._count = len(self._numbers)
+
+    def _add_entry(self, number: bytes, cvr: bytes, ordinal: int, pack: int, offset: int, length: int):
+        entry_id = len(self._numbers)
+        cvr = cvr.rstrip(b"\0").decode("utf-8")
+        self._numbers.append(number.rstrip(b"\0").decode("utf-8"))
+        self._cvrs.append(cvr)
+        self._dates.append(ordinal)
+        self._packs.append(pack)
+        self._offsets.append(offset)
+        self._lengths.append(length)
+        self._cvr_ids.setdefault(cvr, array("I")).append(entry_id)
+
+    def _sorted_keys(self) -> _SortedKeys:
+        """De sorterede nøgler - med nye poster flettet ind hvis de er blevet for mange"""
+        keys = self._keys
+        if self._count - keys.indexed > REBUILD_THRESHOLD:
+            with self._lock:
+                keys = self._keys
+                if self._count - keys.indexed > REBUILD_THRESHOLD:
+                    keys = self._keys = self._merge_keys(keys, self._count)
+        return keys
+
+    def _merge_keys(self, keys: _SortedKeys, count: int) -> _SortedKeys:
+        # sorted() er stabil og ser de allerede sorterede id'er som ét løb, så
+        # fletningen er tæt på lineær, og poster med samme nøgle beholder rækkefølgen
+        new_ids = range(keys.indexed, count)
+        number_ids = array("I", sorted(chain(keys.number_ids, new_ids), key=self._numbers.__getitem__))
+        date_ids = array("I", sorted(chain(keys.date_ids, new_ids), key=self._dates.__getitem__))
+        return _SortedKeys(list(map(self._numbers.__getitem__, number_ids)), number_ids,
+                           array("i", map(self._dates.__getitem__, date_ids)), date_ids, count)
+
+    def _entry(self, entry_id: int) -> ArchiveEntry:
+        return ArchiveEntry(self._numbers[entry_id], self._cvrs[entry_id], date.fromordinal(self._dates[entry_id]),
+                            self._packs[entry_id], self._offsets[entry_id], self._lengths[entry_id])
+
+    # ============ OPSLAG ============
+    def lookup(self, invoice_number: str) -> Optional[ArchiveEntry]:
+        """Nyeste post for fakturanummeret"""
+        self._refresh()
+        keys = self._sorted_keys()
+        # Poster der ikke er sorteret ind endnu, er nyere end alle de sorterede
+        for entry_id in range(self._count - 1, keys.indexed - 1, -1):
+            if self._numbers[entry_id] == invoice_number:
+                return self._entry(entry_id)
+        position = bisect_right(keys.number_keys, invoice_number)
+        if position == 0 or keys.number_keys[position - 1] != invoice_number:
+            return None
+        return self._entry(keys.number_ids[position - 1])
+
+    def between(self, start: date, end: date) -> List[ArchiveEntry]:
+        """Alle poster med fakturadato i [start, end], sorteret efter dato"""
+        self._refresh()
+        keys = self._sorted_keys()
+        low, high = start.toordinal(), end.toordinal()
+        ids = list(keys.date_ids[bisect_left(keys.date_keys, low):bisect_right(keys.date_keys, high)])
+        recent = [entry_id for entry_id in range(keys.indexed, self._count) if low <= self._dates[entry_id] <= high]
+        if recent:
+            ids = sorted(ids + recent, key=self._dates.__getitem__)
+        return [self._entry(entry_id) for entry_id in ids]
+
+    def for_customer(self, cvr: str, start: Optional[date] = None, end: Optional[date] = None) -> List[ArchiveEntry]:
+        """Kundens poster i tilføjelsesrækkefølge, eventuelt kun inden for et datointerval"""
+        self._refresh()
+        count = self._count
+        entries = [self._entry(entry_id) for entry_id in self._cvr_ids.get(cvr, ()) if entry_id < count]
+        if start is not None:
+            entries = [e for e in entries if e.invoice_date >= start]
+        if end is not None:
+            entries = [e for e in entries if e.invoice_date <= end]
+        return entries
+
+    def get(self, invoice_number: str) -> Optional[memoryview]:
+        entry = self.lookup(invoice_number)
+        return self.read(entry) if entry else None
+
+    def read(self, entry: ArchiveEntry) -> memoryview:
+        """PDF'en som memoryview direkte ind i pack-filen - ingen kopi"""
+        end = entry.offset + entry.length
+        with self._lock:
+            mapped = self._maps.get(entry.pack)
+            if mapped is None or len(mapped) < end:
+                # Pack-filen er vokset siden den blev mappet - map den igen. Den
+                # gamle mapping lever videre så længe nogen har en view ind i den
+                with open(os.path.join(self.directory, _pack_name(entry.pack)), "rb") as f:
+                    mapped = self._maps[entry.pack] = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return memoryview(mapped)[entry.offset:end]
+
+    # ============ TILFØJELSE ============
+    @contextmanager
+    def _locked(self):
+        # Tråde i processen og andre processer der skriver til samme arkiv
+        with self._lock:
+            fcntl.flock(self._index.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(self._index.fileno(), fcntl.LOCK_UN)
+
+    def _current_pack(self) -> int:
+        packs = sorted(int(name[5:10]) for name in os.listdir(self.directory)
+                       if name.startswith("pack-") and name.endswith(".pdfs"))
+        if not packs:
+            return 0
+        pack = packs[-1]
+        if os.path.getsize(os.path.join(self.directory, _pack_name(pack))) >= self.max_pack_bytes:
+            pack += 1
+        return pack
+
+    @contextmanager
+    def appender(self, invoice_number: str, cvr: str, invoice_date: date) -> Iterator[BinaryIO]:
+        """
+        Fil-objekt som PDF'en skrives til. Når blokken afsluttes uden fejl,
+        tilføjes det skrevne som én post i arkivet; ved fejl smides det væk.
+        Andre skrivere venter kun mens de færdige bytes skrives til pack-filen.
+        """
+        number_key = _encode_key(invoice_number, 32, "Fakturanummer")
+        cvr_key = _encode_key(cvr, 16, "CVR")
+        with tempfile.SpooledTemporaryFile(max_size=SPOOL_BYTES, dir=self.directory) as segment:
+            yield segment
+            length = segment.seek(0, os.SEEK_END)
+            if length == 0:
+                raise ValueError(f"Intet skrevet til arkivet for {invoice_number}")
+            segment.seek(0)
+            self._append_segment(segment, length, number_key, cvr_key, invoice_date)
+        self._refresh()
+
+    def _append_segment(self, segment: BinaryIO, length: int, number_key: bytes, cvr_key: bytes,
+                        invoice_date: date) -> tuple:
+        """Skriver segmentet og indeksposten. Returnerer (pack, offset)"""
+        with self._locked():
+            pack = self._current_pack()
+            with open(os.path.join(self.directory, _pack_name(pack)), "ab") as out:
+                offset = out.tell()
+                try:
+                    shutil.copyfileobj(segment, out)
+                    out.flush()
+                    if self.sync:
+                        os.fsync(out.fileno())
+                except BaseException:
+                    out.truncate(offset)
+                    raise
+            # Indeksposten skrives efter PDF'en - et nedbrud imellem efterlader kun ubrugte bytes
+            record = INDEX_RECORD.pack(number_key, cvr_key, invoice_date.toordinal(), pack, offset, length)
+            size = self._index.seek(0, os.SEEK_END)
+            torn = (size - len(INDEX_MAGIC)) % INDEX_RECORD.size
+            if torn:
+                # Rest af en post fra et nedbrud - ellers forskydes alle følgende poster
+                self._index.truncate(size - torn)
+                self._index.seek(0, os.SEEK_END)
+            self._index.write(record)
+            self._index.flush()
+            if self.sync:
+                os.fsync(self._index.fileno())
+        return pack, offset
+
+    def append(self, invoice_number: str, cvr: str, invoice_date: date, pdf: bytes) -> ArchiveEntry:
+        if not pdf:
+            raise ValueError(f"Intet skrevet til arkivet for {invoice_number}")
+        # Bytes er allerede færdige - intet segment at rendere til
+        pack, offset = self._append_segment(BytesIO(pdf), len(pdf), _encode_key(invoice_number, 32, "Fakturanummer"),
+                                            _encode_key(cvr, 16, "CVR"), invoice_date)
+        self._refresh()
+        # Uden om lookup(), så en stribe tilføjelser ikke sorterer nøglerne undervejs.
+        # Posten er blandt de sidste - andre skrivere kan være kommet til efter den
+        for entry_id in range(self._count - 1, -1, -1):
+            if self._offsets[entry_id] == offset and self._packs[entry_id] == pack:
+                return self._entry(entry_id)
+
+# ============ HOVEDFUNKTION ============
+def archive_faktura(archive: PDFArchive, generator: fg.FakturaGenerator, faktura: fg.FakturaData,
+                    customer: fg.CustomerInfo) -> ArchiveEntry:
+    """
+    Renderer fakturaen til et segment og tilføjer det til arkivet. Segmentet
+    ligger i hukommelsen op til SPOOL_BYTES og derover i en midlertidig fil.
+    """
+    with archive.appender(faktura.invoice_number, customer.cvr, faktura.invoice_date) as out:
+        generator.generate_to(out, faktura, customer)
+    return archive.lookup(faktura.invoice_number)
@@ -0,0 +1,121 @@
+"""
+OrderFlow PDF batch - fælles proces-pool til masse-rendering
+"""
+
+import os
+import traceback
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Iterable, Iterator, Optional, Tuple
+
+
+# ============ FEJL ============
+class BatchItemError(Exception):
+    """Fejl for et enkelt dokument i en batch - resten af batchen fortsætter"""
+
+    def __init__(self, key: str, message: str, details: str = ""):
+        super().__init__(f"{key}: {message}")
+        self.key = key
+        self.message = message
+        self.details = details
+
+    def __reduce__(self):
+        return (BatchItemError, (self.key, self.message, self.details))
+
+
+def capture_item_error(key: str, exc: BaseException) -> BatchItemError:
+    """Pakker en undtagelse ind så den kan sendes tilbage fra en worker-proces"""
+    return BatchItemError(
+        key,
+        f"{type(exc).__name__}: {exc}",
+        "".join(traceback.format_exception(type(exc), exc, exc.__traceback__)),
+    )
+
+
+# ============ POOL ============
+def run_pool(
+    task: Callable[[Any], Tuple[str, Any]],
+    items: Iterable[Any],
+    max_workers: Optional[int] = None,
+    ordered: bool = False,
+    max_pending: Optional[int] = None,
+    initializer: Optional[Callable] = None,
+    initargs: tuple = (),
+    item_key: Optional[Callable[[Any], str]] = None,
+) -> Iterator[Tuple[str, Any]]:
+    """
+    Kører `task` over `items` i en proces-pool og yielder resultaterne.
+
+    Højst `max_pending` opgaver er i gang ad gangen, så inputtet kan være en
+    lang (eller uendelig) generator uden at hukommelsen vokser med batchen.
+    `task` skal være en modul-funktion (picklebar) og selv fange sine fejl.
+    Fejler selve poolen for et dokument (det kan ikke pickles, eller en
+    worker dør), yieldes (nøgle, BatchItemError) for det, og en død pool
+    startes igen til resten. Nøglen er item_key(item) eller "#<position>".
+    """
+    workers = max_workers or os.cpu_count() or 1
+    window = max_pending or workers * 4
+    source = iter(items)
+    pool = _Pool(workers, initializer, initargs)
+
+    try:
+        if ordered:
+            pending = deque()
+            for index, item in enumerate(source):
+                pending.append(pool.submit(task, item, _key(item_key, index, item)))
+                if len(pending) >= window:
+                    yield _result(*pending.popleft())
+            while pending:
+                yield _result(*pending.popleft())
+        else:
+            keys = {}
+            for index, item in enumerate(source):
+                future, key = pool.submit(task, item, _key(item_key, index, item))
+                keys[future] = key
+                if len(keys) >= window:
+                    done, _ = wait(keys, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        yield _result(future, keys.pop(future))
+            while keys:
+                done, _ = wait(keys, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield _result(future, keys.pop(future))
+    finally:
+        pool.shutdown()
+
+
+class _Pool:
+    """ProcessPoolExecutor der erstattes af en ny, hvis en worker dør undervejs"""
+
+    def __init__(self, workers: int, initializer: Optional[Callable], initargs: tuple):
+        self._args = dict(max_workers=workers, initializer=initializer, initargs=initargs)
+        self._executor = ProcessPoolExecutor(**self._args)
+
+    def submit(self, task, item, key: str) -> Tuple[Future, str]:
+        try:
+            return self._executor.submit(task, item), key
+        except BrokenProcessPool:
+            # Opgaverne i den døde pool får hver deres fejl - resten kører i en ny
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = ProcessPoolExecutor(**self._args)
+            return self._executor.submit(task, item), key
+
+    def shutdown(self):
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+
+def _key(item_key: Optional[Callable[[Any], str]], index: int, item: Any) -> str:
+    if item_key is not None:
+        try:
+            return str(item_key(item))
+        except Exception:
+            pass  # Et ødelagt item - fejlen kommer fra task eller poolen
+    return f"#{index}"
+
+
+def _result(future: Future, key: str) -> Tuple[str, Any]:
+    try:
+        return future.result()
+    except Exception as exc:
+        return key, capture_item_error(key, exc)
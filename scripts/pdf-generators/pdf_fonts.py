@@ -0,0 +1,104 @@
+"""
+OrderFlow PDF fonts - indlejrede TTF-skrifttyper, parset én gang pr. proces
+
+De indbyggede Helvetica-skrifter kan kun vise WinAnsi-tegn. En TTF-familie
+registreres én gang og deles derefter af alle dokumenter i processen: filen
+parses kun ved første registrering, og ReportLab indlejrer kun de glyffer
+hvert dokument faktisk bruger (subsetting), ikke hele fonten. Færdige
+subsets genbruges også, da dokumenterne for det meste bruger de samme tegn.
+
+    fonts = register_ttf_family("DejaVuSans", "/fonts/DejaVuSans.ttf", "/fonts/DejaVuSans-Bold.ttf")
+    FakturaGenerator(fonts=fonts).generate(faktura, customer)
+"""
+
+import os
+import zlib
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
+
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont
+
+
+@dataclass(frozen=True)
+class FontFamily:
+    regular: str = "Helvetica"
+    bold: str = "Helvetica-Bold"
+    # TTF-filerne familien er læst fra - tom for de indbyggede skrifter.
+    # Indgår i render-cachens nøgle, så samme navn fra en anden fil ikke genbruger PDF'er
+    files: Tuple[str, ...] = ()
+
+    @property
+    def embedded(self) -> bool:
+        return bool(self.files)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "FontFamily":
+        """{"name": ..., "regular": sti, "bold": sti} - registrerer familien hvis den ikke allerede er det"""
+        return register_ttf_family(data["name"], data["regular"], data.get("bold"))
+
+
+BUILTIN_FONTS = FontFamily()
+
+# ============ CACHE ============
+# Familier efter navn. TTFont-objekterne ligger i pdfmetrics' register og
+# deles af alle canvas'er; pr. dokument holdes kun hvilke glyffer der er brugt.
+_FAMILIES: Dict[str, FontFamily] = {}
+
+# Færdige subset-filer pr. font, efter tegnene i subsettet
+SUBSET_CACHE_SIZE = 64
+
+
+class _CachedFlate:
+    """Som ReportLabs FlateDecode-filter, men komprimerer hver subset-fil én gang"""
+    pdfname = "FlateDecode"
+
+    @staticmethod
+    @lru_cache(maxsize=SUBSET_CACHE_SIZE)
+    def encode(content: bytes) -> bytes:
+        return zlib.compress(content)
+
+
+def _load_ttf(name: str, path: str) -> TTFont:
+    font = TTFont(name, path)
+    face = font.face
+    make_subset = face.makeSubset
+    add_subset_objects = face.addSubsetObjects
+    cached_subset = lru_cache(maxsize=SUBSET_CACHE_SIZE)(lambda subset: make_subset(list(subset)))
+
+    def add_cached_subset_objects(doc, fontname, subset):
+        reference = add_subset_objects(doc, fontname, subset)
+        font_file = doc.idToObject.get(f"fontFile:{face.filename}({fontname})")
+        if font_file is not None and font_file.filters:
+            font_file.filters = [_CachedFlate]
+        return reference
+
+    # Kaldes af ReportLab for hvert subset i hvert dokument, når dokumentet gemmes.
+    # Samme tegn giver samme (uforanderlige) bytes, så resultatet kan deles
+    face.makeSubset = lambda subset: cached_subset(tuple(subset))
+    face.addSubsetObjects = add_cached_subset_objects
+    return font
+
+
+def register_ttf_family(name: str, regular_path: str, bold_path: Optional[str] = None) -> FontFamily:
+    """
+    Registrerer en TTF-familie og returnerer den. Kaldes den igen med samme
+    navn og filer, returneres den cachede familie uden at læse filerne igen.
+    Uden bold_path bruges den almindelige skrift også til fed tekst.
+    """
+    files = (os.path.abspath(regular_path),) + ((os.path.abspath(bold_path),) if bold_path else ())
+    family = _FAMILIES.get(name)
+    if family is not None:
+        if family.files != files:
+            raise ValueError(f"Skrifttypen {name!r} er allerede registreret fra {family.files}")
+        return family
+
+    bold_name = f"{name}-Bold" if bold_path else name
+    pdfmetrics.registerFont(_load_ttf(name, files[0]))
+    if bold_path:
+        pdfmetrics.registerFont(_load_ttf(bold_name, files[1]))
+    # <b> i Paragraph-markup slår op i familien
+    pdfmetrics.registerFontFamily(name, normal=name, bold=bold_name, italic=name, boldItalic=bold_name)
+    family = _FAMILIES[name] = FontFamily(name, bold_name, files)
+    return family
@@ -0,0 +1,55 @@
+"""
+OrderFlow PDF paging - "Side X af Y" uden at holde alle sider i hukommelsen
+
+Med udskudt total tegnes hver sides tekst som en lille form XObject, der
+defineres når dokumentet gemmes og totalen kendes - så kan teksten centreres
+præcis som når sidetallet kendes på forhånd. Det koster ca. 0.5 KB pr. side.
+"""
+
+from typing import Optional
+
+# Navnet på de form XObjects der indeholder sidetallene, som "pageTotal.<side>"
+PAGE_TOTAL_FORM = "pageTotal"
+
+
+def page_label_form(form_name: str, page_number: int) -> str:
+    return f"{form_name}.{page_number}"
+
+
+def draw_page_number(canv, x_center: float, y: float, page_count: Optional[int],
+                     font_name: str = "Helvetica", font_size: float = 8,
+                     form_name: str = PAGE_TOTAL_FORM, page_number: Optional[int] = None):
+    """
+    Tegner "Side X af Y" centreret om x_center.
+
+    Er page_count None, tegnes teksten som en reference til en form XObject
+    der først defineres med define_page_total() når dokumentet gemmes.
+    page_number er som standard canvas'ets sidetal.
+    """
+    if page_number is None:
+        page_number = canv._pageNumber
+    if page_count is not None:
+        canv.setFont(font_name, font_size)
+        canv.drawCentredString(x_center, y, f"Side {page_number} af {page_count}")
+        return
+
+    # Teksten kan først centreres når totalens bredde kendes - formen tegnes
+    # om sit nulpunkt og arver sidens fyldfarve
+    canv.saveState()
+    canv.translate(x_center, y)
+    canv.doForm(page_label_form(form_name, page_number))
+    canv.restoreState()
+
+
+def define_page_total(canv, page_count: int,
+                      font_name: str = "Helvetica", font_size: float = 8,
+                      form_name: str = PAGE_TOTAL_FORM):
+    """Definerer formene som draw_page_number() har refereret til - én pr. side"""
+    for page_number in range(1, page_count + 1):
+        text = f"Side {page_number} af {page_count}"
+        half_width = canv.stringWidth(text, font_name, font_size) / 2
+        canv.beginForm(page_label_form(form_name, page_number), lowerx=-half_width, lowery=-font_size,
+                       upperx=half_width, uppery=font_size * 2)
+        canv.setFont(font_name, font_size)
+        canv.drawCentredString(0, 0, text)
+        canv.endForm()
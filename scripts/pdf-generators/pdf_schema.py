@@ -0,0 +1,112 @@
+"""
+OrderFlow PDF schema - streng validering af JSON/dict-input til dataklasserne
+
+Hjælperne bruges af from_dict()-konstruktørerne i generatormodulerne. De
+arbejder direkte på de kendte felter i stedet for at reflektere over
+dataclasses.fields(), og fejl rapporteres med stien til feltet
+(fx "faktura.lines[3].quantity").
+"""
+
+import math
+from datetime import date, datetime
+from enum import Enum
+from typing import Any, FrozenSet, Optional, Type, TypeVar
+
+E = TypeVar("E", bound=Enum)
+
+_MISSING = object()
+
+
+class SchemaError(ValueError):
+    def __init__(self, path: str, message: str):
+        super().__init__(f"{path}: {message}" if path else message)
+        self.path = path
+        self.message = message
+
+    def __reduce__(self):
+        return (SchemaError, (self.path, self.message))
+
+
+def field_path(path: str, key: str) -> str:
+    return f"{path}.{key}" if path else key
+
+
+def require_object(data: Any, path: str, allowed: FrozenSet[str]) -> dict:
+    """Kræver et JSON-objekt uden ukendte felter"""
+    if not isinstance(data, dict):
+        raise SchemaError(path, f"forventede et objekt, fik {type(data).__name__}")
+    unknown = data.keys() - allowed
+    if unknown:
+        raise SchemaError(path, f"ukendte felter: {', '.join(sorted(unknown))}")
+    return data
+
+
+def get_field(data: dict, key: str, path: str, default: Any = _MISSING) -> Any:
+    value = data.get(key, _MISSING)
+    if value is _MISSING:
+        if default is _MISSING:
+            raise SchemaError(field_path(path, key), "mangler")
+        return default
+    return value
+
+
+def parse_str(value: Any, path: str, allow_empty: bool = False) -> str:
+    if not isinstance(value, str):
+        raise SchemaError(path, f"forventede tekst, fik {type(value).__name__}")
+    if not allow_empty and not value.strip():
+        raise SchemaError(path, "må ikke være tom")
+    return value
+
+
+def parse_optional_str(value: Any, path: str) -> Optional[str]:
+    return None if value is None else parse_str(value, path)
+
+
+def parse_number(value: Any, path: str, minimum: Optional[float] = None) -> float:
+    # bool er en int-underklasse i Python, men aldrig et gyldigt beløb
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise SchemaError(path, f"forventede et tal, fik {type(value).__name__}")
+    if not math.isfinite(value):
+        raise SchemaError(path, "skal være et endeligt tal")
+    if minimum is not None and value < minimum:
+        raise SchemaError(path, f"skal være mindst {minimum}")
+    return value
+
+
+def parse_date(value: Any, path: str) -> date:
+    if not isinstance(value, str):
+        raise SchemaError(path, f"forventede en ISO-dato, fik {type(value).__name__}")
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise SchemaError(path, f"ugyldig dato {value!r} (forventede ÅÅÅÅ-MM-DD)") from None
+
+
+def parse_datetime(value: Any, path: str, like: Optional[datetime] = None) -> datetime:
+    """like: et tidspunkt værdien sammenlignes med - begge skal have tidszone eller ingen af dem"""
+    if not isinstance(value, str):
+        raise SchemaError(path, f"forventede et ISO-tidspunkt, fik {type(value).__name__}")
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        raise SchemaError(path, f"ugyldigt tidspunkt {value!r} (forventede ÅÅÅÅ-MM-DDTTT:MM)") from None
+    if like is not None:
+        require_same_tz(parsed, like, path)
+    return parsed
+
+
+def require_same_tz(value: datetime, other: datetime, path: str):
+    """Naive og tidszone-bevidste tidspunkter kan ikke sammenlignes (TypeError)"""
+    if (value.utcoffset() is None) != (other.utcoffset() is None):
+        raise SchemaError(path, "blander tidspunkter med og uden tidszone")
+
+
+def parse_enum(enum_cls: Type[E], value: Any, path: str) -> E:
+    """Enums angives med navn, fx "NET_14" eller "STANDARD" """
+    if isinstance(value, enum_cls):
+        return value
+    try:
+        return enum_cls[value]
+    except (KeyError, TypeError):
+        names = ", ".join(member.name for member in enum_cls)
+        raise SchemaError(path, f"ugyldig værdi {value!r} (gyldige: {names})") from None
@@ -0,0 +1,87 @@
+"""
+OrderFlow PDF stats - valgfri måling af hvor tiden går i en rendering
+
+Generatorerne tager stats_callback=...; uden den bygges dokumentet præcis
+som før, uden ekstra kald. Med den kaldes callback'en med en RenderStats
+efter hvert dokument:
+
+    FakturaGenerator(stats_callback=print).generate(faktura, customer)
+"""
+
+import os
+import time
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+StatsCallback = Callable[["RenderStats"], None]
+
+
+@dataclass
+class RenderStats:
+    document: str  # "faktura", "faktura.merged", "dagsrapport" eller "periode"
+    key: str  # Fakturanummer eller dokumentnummer
+    story_ms: float = 0.0  # Opbygning af flowables
+    layout_ms: float = 0.0  # doc.build() uden canvas.save()
+    save_ms: float = 0.0  # canvas.save(): afspilning af gemte sider og serialisering
+    pages: int = 0
+    flowables: int = 0
+    bytes: Optional[int] = None  # None hvis målet ikke kan måles (fx en pipe)
+
+    @property
+    def total_ms(self) -> float:
+        return self.story_ms + self.layout_ms + self.save_ms
+
+
+class Stopwatch:
+    def __init__(self):
+        self.start = time.perf_counter()
+
+    def ms(self) -> float:
+        return (time.perf_counter() - self.start) * 1000
+
+
+def output_position(target) -> Optional[int]:
+    """Nuværende position i et fil-objekt (0 for en sti) - bruges til at måle hvor meget der blev skrevet"""
+    if isinstance(target, (str, os.PathLike)):
+        return 0
+    try:
+        return target.tell()
+    except (AttributeError, OSError, ValueError):
+        return None
+
+
+def output_size(target, start: Optional[int]) -> Optional[int]:
+    if start is None:
+        return None
+    if isinstance(target, (str, os.PathLike)):
+        return os.path.getsize(target)
+    try:
+        return target.tell() - start
+    except (AttributeError, OSError, ValueError):
+        return None
+
+
+def build_with_stats(doc, story: list, canvasmaker, stats: RenderStats) -> None:
+    """doc.build() med tid for layout og canvas.save() hver for sig, plus side- og flowable-antal"""
+    stats.flowables = len(story)
+    canvases = []
+
+    def timed_canvasmaker(*args, **kwargs):
+        canv = canvasmaker(*args, **kwargs)
+        save = canv.save
+
+        def timed_save():
+            watch = Stopwatch()
+            save()
+            stats.save_ms = watch.ms()
+
+        # Instans-attributten skygger for metoden, så kun dette canvas måles
+        canv.save = timed_save
+        canvases.append(canv)
+        return canv
+
+    watch = Stopwatch()
+    doc.build(story, canvasmaker=timed_canvasmaker)
+    stats.layout_ms = watch.ms() - stats.save_ms
+    # Sidetallet er ét forbi sidste side efter den afsluttende showPage()
+    stats.pages = canvases[-1]._pageNumber - 1
@@ -0,0 +1,151 @@
+"""
+OrderFlow PDF streaming - skriver hver færdig side ud mens layoutet kører
+
+ReportLab samler normalt alle objekter og serialiserer dem først i save(),
+så første byte kommer når hele dokumentet er færdigt. StreamingPDFDocument
+skriver i stedet sideobjektet og dets indholdsstrøm til output så snart
+siden er afsluttet, og frigiver strømmen bagefter. Resten (skrifttyper,
+sidetræ, bogmærker, katalog) og xref-tabellen skrives i save().
+
+Forms som siderne refererer til før de er defineret (fx sidetotalen fra
+pdf_paging) får reserveret deres objektnummer når første side bruger dem,
+og selve formen skrives når den defineres i save().
+
+    canv._doc = streaming_document(canv._doc, output)
+
+Skrives der til en sti, åbnes filen først når første side er klar, og
+fejler opbygningen undervejs, slettes den halve fil igen (discard_output).
+"""
+
+import os
+
+from reportlab.pdfbase import pdfdoc
+
+# ============ RESERVEREDE FORMS ============
+class _ReservedForm(pdfdoc.PDFObject):
+    """Pladsholder for en form der er refereret men endnu ikke defineret"""
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def format(self, document):
+        raise KeyError(f"form {self.name!r} er brugt på en side men aldrig defineret")
+
+# ============ DOKUMENT ============
+class StreamingPDFDocument(pdfdoc.PDFDocument):
+    def __init__(self, output, **kwargs):
+        pdfdoc.PDFDocument.__init__(self, **kwargs)
+        # En sti åbnes ved første side og lukkes i SaveToFile - et fil-objekt ejes af kalderen
+        self._path = output if isinstance(output, str) else None
+        self._output = None if self._path else output
+        self._file = None
+        self.pages_streamed = 0
+
+    def _start(self):
+        if self._file is None:
+            if self._output is None:
+                self._output = open(self._path, "wb")
+            # PDFFile lægger headeren i sin buffer - send den og skriv derefter direkte
+            self._file = pdfdoc.PDFFile(self._pdfVersion)
+            self._output.write(b"".join(self._file.strings))
+            self._file.strings = None
+            self._file.write = self._output.write
+
+    def _write_object(self, name: str):
+        data = pdfdoc.PDFIndirectObject(name, self.idToObject[name]).format(self)
+        self.idToOffset[name] = self._file.add(data)
+
+    def _reserve_form(self, internalname: str):
+        if internalname not in self.idToObject:
+            self.Reference(_ReservedForm(internalname), internalname)
+
+    def addPage(self, page):
+        # Formene skal have et objektnummer før siden kan serialiseres
+        if page.XObjects is not None:
+            for reference in page.XObjects.dict.values():
+                self._reserve_form(reference.name)
+        name = self.thisPageName()
+        pdfdoc.PDFDocument.addPage(self, page)
+
+        self._start()
+        self._write_object(name)
+        contents = page.Contents
+        self._write_object(getattr(contents, "__InternalName__"))
+        # Siden er skrevet - kun objektnummeret skal huskes
+        page.stream = contents.content = None
+        self.pages_streamed += 1
+
+    def addForm(self, name, form):
+        internalname = pdfdoc.xObjectName(name)
+        if isinstance(self.idToObject.get(internalname), _ReservedForm):
+            # Overtag det objektnummer som de allerede skrevne sider peger på
+            setattr(form, "__InternalName__", internalname)
+            self.idToObject[internalname] = form
+            self.inObject = None
+            return
+        pdfdoc.PDFDocument.addForm(self, name, form)
+
+    def SaveToFile(self, filename, canvas):
+        if getattr(self, "_savedToFile", False):
+            raise RuntimeError("dokumentet kan kun gemmes én gang")
+        self._savedToFile = True
+        try:
+            # GetPDFData forbereder skrifttyper, info og bogmærker og kalder format()
+            self.GetPDFData(canvas)
+        except BaseException:
+            self.discard()
+            raise
+        if self._path is not None:
+            self._output.close()
+
+    def discard(self):
+        """Lukker og sletter en fil som dokumentet selv har åbnet - efter en fejl"""
+        if self._path is None or self._output is None or self._output.closed:
+            return
+        self._output.close()
+        os.remove(self._path)
+
+    def format(self):
+        """Skriver de resterende objekter, xref og trailer. Returnerer intet - alt er skrevet"""
+        self._start()
+        catalog = self.Catalog
+        info = self.info
+        self.Reference(catalog)
+        self.Reference(info)
+        ids = []
+        number = 1
+        # Objekter kan registrere nye objekter mens de formateres - fortsæt til der ikke er flere
+        while number in self.numberToId:
+            name = self.numberToId[number]
+            if name not in self.idToOffset:
+                self._write_object(name)
+            ids.append(name)
+            number += 1
+
+        xref = pdfdoc.PDFCrossReferenceTable()
+        xref.addsection(0, ids)
+        xref_offset = self._file.add(xref.format(self))
+        trailer = pdfdoc.PDFTrailer(
+            startxref=xref_offset,
+            Size=len(ids) + 1,
+            Root=self.Reference(catalog),
+            Info=self.Reference(info),
+            ID=self.ID(),
+        )
+        self._file.add(trailer.format(self))
+        return b""
+
+def discard_output(canv):
+    """Fjerner en halvt skrevet fil hvis canvas'et streamer til en sti. canv må være None"""
+    doc = getattr(canv, "_doc", None)
+    if isinstance(doc, StreamingPDFDocument):
+        doc.discard()
+
+def streaming_document(doc: pdfdoc.PDFDocument, output) -> StreamingPDFDocument:
+    """Erstatning for et canvas' endnu tomme dokument, med samme indstillinger"""
+    if "encrypt" in doc.__dict__:
+        raise ValueError("Streaming understøtter ikke kryptering")
+    streaming = StreamingPDFDocument(output, compression=doc.compression, invariant=doc.invariant,
+                                     pdfVersion=doc._pdfVersion)
+    streaming.Catalog.Lang = getattr(doc.Catalog, "Lang", None)
+    return streaming
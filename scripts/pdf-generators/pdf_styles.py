@@ -0,0 +1,244 @@
+"""
+OrderFlow PDF styles - fælles farver og stil-register for generatorerne
+"""
+
+from reportlab.lib.units import mm
+from reportlab.lib.styles import ParagraphStyle
+from reportlab.lib.enums import TA_RIGHT
+from reportlab.platypus import TableStyle
+from reportlab.lib.colors import HexColor
+from reportlab.lib import colors
+from typing import Callable, Dict, Tuple, Union
+
+from pdf_fonts import BUILTIN_FONTS, FontFamily
+
+# ============ FARVER ============
+PRIMARY_COLOR = HexColor("#1a1a2e")
+ACCENT_COLOR = HexColor("#0f3460")
+MEDIUM_GRAY = HexColor("#e0e0e0")
+LIGHT_GRAY = HexColor("#f8f9fa")
+TEXT_COLOR = HexColor("#333333")
+HEADER_BLUE = HexColor("#1a365d")
+
+# ============ REGISTER ============
+# Stilene bygges første gang de bruges og deles derefter af alle dokumenter i
+# processen. Table.setStyle og Paragraph kopierer/læser kun stilene, så de
+# må aldrig ændres efter de er bygget.
+Style = Union[ParagraphStyle, TableStyle]
+
+_STYLE_BUILDERS: Dict[str, Callable[[], Style]] = {}
+_STYLE_CACHE: Dict[str, Style] = {}
+# Varianter med en anden skrifttype end Helvetica, efter (navn, familie)
+_FONT_STYLE_CACHE: Dict[Tuple[str, FontFamily], Style] = {}
+
+
+def style_builder(name: str):
+    def register(builder: Callable[[], Style]) -> Callable[[], Style]:
+        _STYLE_BUILDERS[name] = builder
+        return builder
+    return register
+
+
+def get_style(name: str, fonts: FontFamily = BUILTIN_FONTS) -> Style:
+    if fonts != BUILTIN_FONTS:
+        return _get_font_style(name, fonts)
+    style = _STYLE_CACHE.get(name)
+    if style is None:
+        style = _STYLE_CACHE[name] = _STYLE_BUILDERS[name]()
+    return style
+
+
+def _get_font_style(name: str, fonts: FontFamily) -> Style:
+    """Stilen med Helvetica/Helvetica-Bold skiftet ud med familiens skrifter"""
+    key = (name, fonts)
+    style = _FONT_STYLE_CACHE.get(key)
+    if style is None:
+        base = get_style(name)
+        if isinstance(base, ParagraphStyle):
+            style = ParagraphStyle(base.name, parent=base, fontName=fonts.regular)
+        else:
+            replace = {"Helvetica": fonts.regular, "Helvetica-Bold": fonts.bold}
+            commands = [(cmd[0], cmd[1], cmd[2], replace.get(cmd[3], cmd[3])) + tuple(cmd[4:])
+                        if cmd[0] == "FONTNAME" else cmd
+                        for cmd in base.getCommands()]
+            # Celler uden FONTNAME bruger ellers Tables standard, Helvetica
+            style = TableStyle([("FONTNAME", (0, 0), (-1, -1), fonts.regular)] + commands)
+        _FONT_STYLE_CACHE[key] = style
+    return style
+
+
+def clear_style_cache():
+    _STYLE_CACHE.clear()
+    _FONT_STYLE_CACHE.clear()
+
+
+# ============ FÆLLES ============
+@style_builder("header_row")
+def _header_row():
+    return TableStyle([('VALIGN', (0, 0), (-1, -1), 'TOP')])
+
+
+# ============ FAKTURA ============
+@style_builder("faktura.left_header")
+def _faktura_left_header():
+    return ParagraphStyle('LH', fontSize=9, leading=11, textColor=TEXT_COLOR)
+
+
+@style_builder("faktura.right_header")
+def _faktura_right_header():
+    return ParagraphStyle('RH', fontSize=11, leading=14, alignment=TA_RIGHT, textColor=PRIMARY_COLOR)
+
+
+@style_builder("faktura.left_info")
+def _faktura_left_info():
+    return ParagraphStyle('LI', fontSize=9, leading=11, textColor=TEXT_COLOR)
+
+
+@style_builder("faktura.right_info")
+def _faktura_right_info():
+    return ParagraphStyle('RI', fontSize=9, leading=12, alignment=TA_RIGHT, textColor=TEXT_COLOR)
+
+
+@style_builder("faktura.rule")
+def _faktura_rule():
+    return TableStyle([('LINEBELOW', (0, 0), (-1, -1), 1.5, PRIMARY_COLOR)])
+
+
+@style_builder("faktura.info_table")
+def _faktura_info_table():
+    return TableStyle([
+        ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+        ('BACKGROUND', (0, 0), (0, 0), LIGHT_GRAY),
+        ('LEFTPADDING', (0, 0), (0, 0), 3*mm),
+        ('TOPPADDING', (0, 0), (0, 0), 3*mm),
+        ('BOTTOMPADDING', (0, 0), (0, 0), 3*mm),
+        ('RIGHTPADDING', (0, 0), (0, 0), 3*mm),
+    ])
+
+
+@style_builder("faktura.lines_table")
+def _faktura_lines_table():
+    return TableStyle([
+        # Header
+        ('BACKGROUND', (0, 0), (-1, 0), PRIMARY_COLOR),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, 0), 9),
+        ('TOPPADDING', (0, 0), (-1, 0), 2.5*mm),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), 2.5*mm),
+        # Data
+        ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
+        ('FONTSIZE', (0, 1), (-1, -1), 9),
+        ('TEXTCOLOR', (0, 1), (-1, -1), TEXT_COLOR),
+        ('TOPPADDING', (0, 1), (-1, -1), 2*mm),
+        ('BOTTOMPADDING', (0, 1), (-1, -1), 2*mm),
+        # Alignment
+        ('ALIGN', (1, 0), (-1, -1), 'RIGHT'),
+        ('ALIGN', (0, 0), (0, -1), 'LEFT'),
+        # Lines
+        ('LINEBELOW', (0, 1), (-1, -2), 0.5, MEDIUM_GRAY),
+        ('LINEBELOW', (0, -1), (-1, -1), 1, PRIMARY_COLOR),
+    ])
+
+
+@style_builder("faktura.lines_table_chunk")
+def _faktura_lines_table_chunk():
+    # Som lines_table, men uden den afsluttende streg - tabellen fortsætter i næste chunk
+    style = TableStyle(get_style("faktura.lines_table").getCommands()[:-2])
+    style.add('LINEBELOW', (0, 1), (-1, -1), 0.5, MEDIUM_GRAY)
+    return style
+
+
+@style_builder("faktura.lines_table_rows")
+def _faktura_lines_table_rows():
+    # Fortsættelse af linjetabellen uden header - data-rækkerne fra lines_table
+    return TableStyle([
+        ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
+        ('FONTSIZE', (0, 0), (-1, -1), 9),
+        ('TEXTCOLOR', (0, 0), (-1, -1), TEXT_COLOR),
+        ('TOPPADDING', (0, 0), (-1, -1), 2*mm),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 2*mm),
+        ('ALIGN', (1, 0), (-1, -1), 'RIGHT'),
+        ('ALIGN', (0, 0), (0, -1), 'LEFT'),
+        ('LINEBELOW', (0, 0), (-1, -1), 0.5, MEDIUM_GRAY),
+    ])
+
+
+@style_builder("faktura.lines_table_rows_last")
+def _faktura_lines_table_rows_last():
+    # Sidste fortsættelse - med lines_tables afsluttende streg
+    style = TableStyle(get_style("faktura.lines_table_rows").getCommands()[:-1])
+    style.add('LINEBELOW', (0, 0), (-1, -2), 0.5, MEDIUM_GRAY)
+    style.add('LINEBELOW', (0, -1), (-1, -1), 1, PRIMARY_COLOR)
+    return style
+
+
+@style_builder("faktura.totals_table")
+def _faktura_totals_table():
+    return TableStyle([
+        ('FONTNAME', (0, 0), (-1, -2), 'Helvetica'),
+        ('FONTNAME', (0, -1), (-1, -1), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, -2), 9),
+        ('FONTSIZE', (0, -1), (-1, -1), 11),
+        ('ALIGN', (0, 0), (-1, -1), 'RIGHT'),
+        ('TOPPADDING', (0, 0), (-1, -1), 1.5*mm),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 1.5*mm),
+        ('LINEABOVE', (0, -1), (-1, -1), 1, PRIMARY_COLOR),
+        ('BACKGROUND', (0, -1), (-1, -1), LIGHT_GRAY),
+        ('TOPPADDING', (0, -1), (-1, -1), 2.5*mm),
+        ('BOTTOMPADDING', (0, -1), (-1, -1), 2.5*mm),
+    ])
+
+
+@style_builder("faktura.totals_wrapper")
+def _faktura_totals_wrapper():
+    return TableStyle([('ALIGN', (1, 0), (1, 0), 'RIGHT')])
+
+
+# ============ DAGSRAPPORT ============
+@style_builder("dagsrapport.left_header")
+def _dagsrapport_left_header():
+    return ParagraphStyle('LH', fontSize=11, leading=16, textColor=TEXT_COLOR)
+
+
+@style_builder("dagsrapport.right_header")
+def _dagsrapport_right_header():
+    return ParagraphStyle('RH', fontSize=9, leading=11, alignment=TA_RIGHT, textColor=TEXT_COLOR)
+
+
+@style_builder("dagsrapport.rule")
+def _dagsrapport_rule():
+    return TableStyle([('LINEBELOW', (0, 0), (-1, -1), 2, PRIMARY_COLOR)])
+
+
+@style_builder("dagsrapport.section_header")
+def _dagsrapport_section_header():
+    return ParagraphStyle('SectionHeader', fontSize=14, leading=16, textColor=TEXT_COLOR)
+
+
+@style_builder("dagsrapport.sub_header")
+def _dagsrapport_sub_header():
+    return ParagraphStyle('SubHeader', fontSize=10, leading=12, textColor=HEADER_BLUE)
+
+
+@style_builder("dagsrapport.key_value_table")
+def _dagsrapport_key_value_table():
+    return TableStyle([
+        ('FONTNAME', (0, 0), (0, -1), 'Helvetica'),
+        ('FONTNAME', (1, 0), (1, -1), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, -1), 9),
+        ('TEXTCOLOR', (0, 0), (-1, -1), TEXT_COLOR),
+        ('ALIGN', (0, 0), (0, -1), 'LEFT'),
+        ('ALIGN', (1, 0), (1, -1), 'RIGHT'),
+        ('TOPPADDING', (0, 0), (-1, -1), 2*mm),
+        ('BOTTOMPADDING', (0, 0), (-1, -2), 2*mm),
+        ('BOTTOMPADDING', (0, -1), (-1, -1), 3*mm),
+        ('LINEBELOW', (0, 0), (-1, -2), 0.5, MEDIUM_GRAY),
+        ('LINEBELOW', (0, -1), (-1, -1), 2, PRIMARY_COLOR),
+    ])
+
+
+@style_builder("dagsrapport.location_table")
+def _dagsrapport_location_table():
+    # Samme udtryk som fakturaens linjetabel
+    return TableStyle(get_style("faktura.lines_table").getCommands())
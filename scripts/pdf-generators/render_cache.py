@@ -0,0 +1,223 @@
+"""
+OrderFlow render cache - genbrug af færdige PDF'er for identiske forespørgsler
+
+Nøglen er en SHA-256 over en kanonisk JSON-form af input-dataklasserne og
+generatorens indstillinger, så samme faktura/dagsrapport altid giver samme
+nøgle uanset hvor mange gange den bygges op. Cachen har et LRU-lag i
+hukommelsen med loft i bytes og et valgfrit lag på disk.
+"""
+
+import dataclasses
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import date, datetime, time
+from decimal import Decimal
+from enum import Enum
+from typing import Callable, Optional
+
+import dagsrapport_generator as dr
+import faktura_generator as fg
+
+# Øges når layoutet ændres, så gamle PDF'er på disk ikke genbruges
+CACHE_VERSION = 1
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+# Indstillinger der ikke påvirker PDF'en - instrumenterede og almindelige
+# generatorer skal dele cacheposter
+NON_OUTPUT_SETTINGS = frozenset({"stats_callback"})
+
+# ============ NØGLER ============
+def canonicalize(value):
+    """Omsætter dataklasser, enums, datoer og tal til en stabil JSON-struktur"""
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return {
+            "__type__": type(value).__name__,
+            **{f.name: canonicalize(getattr(value, f.name)) for f in dataclasses.fields(value)},
+        }
+    if isinstance(value, fg.InvoiceLineColumns):
+        # Samme form som en liste af InvoiceLine
+        return [canonicalize(line) for line in value]
+    if isinstance(value, Enum):
+        return f"{type(value).__name__}.{value.name}"
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, float):
+        return repr(value)
+    if isinstance(value, (list, tuple)):
+        return [canonicalize(item) for item in value]
+    if isinstance(value, dict):
+        return {str(key): canonicalize(item) for key, item in value.items()}
+    if value is None or isinstance(value, (str, int, bool)):
+        return value
+    raise TypeError(f"Kan ikke lave cachenøgle af {type(value).__name__}")
+
+
+def cache_key(kind: str, *parts) -> str:
+    payload = json.dumps(
+        [CACHE_VERSION, kind, [canonicalize(part) for part in parts]],
+        ensure_ascii=False, sort_keys=True, separators=(",", ":"),
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def generator_settings(generator) -> dict:
+    """Generatorens offentlige indstillinger - de påvirker output og hører med i nøglen"""
+    return {name: value for name, value in vars(generator).items()
+            if not name.startswith("_") and name not in NON_OUTPUT_SETTINGS and not callable(value)}
+
+
+# ============ CACHE ============
+@dataclass
+class CacheStats:
+    hits: int = 0
+    disk_hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.disk_hits + self.misses
+        return (self.hits + self.disk_hits) / lookups if lookups else 0.0
+
+
+class RenderCache:
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES, directory: Optional[str] = None):
+        self.max_bytes = max_bytes
+        self.directory = directory
+        self.stats = CacheStats()
+        self._entries: "OrderedDict[str, bytes]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def size_bytes(self) -> int:
+        return self._size
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            pdf = self._entries.get(key)
+            if pdf is not None:
+                self._entries.move_to_end(key)
+                self.stats.hits += 1
+                return pdf
+        pdf = self._read_disk(key)
+        with self._lock:
+            if pdf is None:
+                self.stats.misses += 1
+                return None
+            self.stats.disk_hits += 1
+            self._remember(key, pdf)
+        return pdf
+
+    def put(self, key: str, pdf: bytes):
+        with self._lock:
+            self._remember(key, pdf)
+        self._write_disk(key, pdf)
+
+    def get_or_render(self, key: str, render: Callable[[], bytes]) -> bytes:
+        pdf = self.get(key)
+        if pdf is None:
+            pdf = render()
+            self.put(key, pdf)
+        return pdf
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def _remember(self, key: str, pdf: bytes):
+        # Dokumenter større end hele loftet holdes kun på disk
+        if len(pdf) > self.max_bytes:
+            return
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._size -= len(old)
+        self._entries[key] = pdf
+        self._size += len(pdf)
+        while self._size > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._size -= len(evicted)
+            self.stats.evictions += 1
+
+    # ============ DISK ============
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], key + ".pdf")
+
+    def _read_disk(self, key: str) -> Optional[bytes]:
+        if not self.directory:
+            return None
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                pdf = f.read()
+        except FileNotFoundError:
+            return None
+        if _is_complete_pdf(pdf):
+            return pdf
+        # Ødelagt eller afkortet post (fx fra en disk der løb fuld) - slet den og byg igen
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
+        return None
+
+    def _write_disk(self, key: str, pdf: bytes):
+        if not self.directory:
+            return
+        path = self._path(key)
+        if os.path.exists(path):
+            return
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Skriv til en midlertidig fil og omdøb, så en samtidig læser aldrig ser en halv PDF
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(pdf)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+
+def _is_complete_pdf(pdf: bytes) -> bool:
+    """Starter med PDF-headeren og slutter med %%EOF (ReportLab skriver altid begge)"""
+    return pdf.startswith(b"%PDF-") and b"%%EOF" in pdf[-32:]
+
+
+# ============ HOVEDFUNKTIONER ============
+def cached_generate_faktura(
+    cache: RenderCache,
+    faktura_data: fg.FakturaData,
+    customer_info: fg.CustomerInfo,
+    platform_info: fg.PlatformInfo = None,
+    generator: fg.FakturaGenerator = None,
+) -> bytes:
+    generator = generator or fg.FakturaGenerator(platform_info)
+    key = cache_key("faktura", generator_settings(generator), faktura_data, customer_info)
+    return cache.get_or_render(key, lambda: generator.generate(faktura_data, customer_info))
+
+
+def cached_generate_dagsrapport(
+    cache: RenderCache,
+    rapport_data: dr.DagsrapportData,
+    customer_info: dr.CustomerInfo,
+    platform_info: dr.PlatformInfo = None,
+    generator: dr.DagsrapportGenerator = None,
+) -> bytes:
+    generator = generator or dr.DagsrapportGenerator(platform_info)
+    key = cache_key("dagsrapport", generator_settings(generator), rapport_data, customer_info)
+    return cache.get_or_render(key, lambda: generator.generate(rapport_data, customer_info))
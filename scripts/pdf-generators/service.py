@@ -0,0 +1,340 @@
+"""
+OrderFlow PDF service - asyncio HTTP-server foran en varm pulje af render-workers
+
+Kun standardbiblioteket. Body'en er samme job-format som worker.py:
+
+    POST /faktura       {"faktura": {...}, "customer": {...}, "platform": {...}, "options": {...}}
+    POST /dagsrapport   {"rapport": {...}, "customer": {...}, "platform": {...}, "options": {...}}
+    GET  /metrics       kødybde, antal og latens (p50/p95/p99)
+    GET  /health
+
+Er køen fuld, svares der straks 503 med Retry-After i stedet for at lade
+ventetiden vokse. Svaret skrives i bidder med drain(), så en langsom klient
+ikke får serveren til at buffere hele PDF'er. Dør en worker (OOM-kill,
+segfault), erstattes puljen - jobbet der kørte, får 500, de næste en ny pulje.
+
+Brug:
+    python service.py --port 8080 --workers 4 --queue 64
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import signal
+import statistics
+import sys
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from decimal import InvalidOperation
+from io import BytesIO
+from typing import Optional, Tuple
+
+import worker
+from pdf_output import PROFILES
+
+MAX_BODY_BYTES = 10 * 1024 * 1024
+WRITE_CHUNK_BYTES = 64 * 1024
+LATENCY_WINDOW = 1024
+
+# De options en HTTP-klient må sætte. Skrifttyper (filstier på serveren) og
+# callbacks er kun for betroede kaldere af generatorerne og worker.py
+ALLOWED_OPTIONS = {"invariant": bool, "deferred_page_count": bool, "output_profile": str}
+
+_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+            413: "Payload Too Large", 500: "Internal Server Error", 503: "Service Unavailable"}
+
+# ============ WORKER-PROCES ============
+def _init_render_worker():
+    worker.warm_up()
+
+def _render_pdf(job: dict) -> Tuple[bytes, float]:
+    """Kører i worker-processen: (pdf, render-tid i ms)"""
+    start = time.perf_counter()
+    buffer = BytesIO()
+    worker._render(job, buffer)
+    return buffer.getvalue(), (time.perf_counter() - start) * 1000
+
+# ============ METRIK ============
+class Metrics:
+    def __init__(self):
+        self.accepted = 0
+        self.completed = 0
+        self.rejected = 0
+        self.failed = 0
+        self.pool_restarts = 0
+        self.in_flight = 0
+        # Seneste LATENCY_WINDOW forespørgsler - konstant hukommelse
+        self.latency_ms = deque(maxlen=LATENCY_WINDOW)
+        self.render_ms = deque(maxlen=LATENCY_WINDOW)
+        self.started = time.time()
+
+    def snapshot(self, queue_depth: int, queue_size: int, workers: int) -> dict:
+        return {
+            "queue_depth": queue_depth,
+            "queue_size": queue_size,
+            "workers": workers,
+            "in_flight": self.in_flight,
+            "accepted": self.accepted,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "failed": self.failed,
+            "pool_restarts": self.pool_restarts,
+            "uptime_s": round(time.time() - self.started, 1),
+            "latency_ms": percentiles(self.latency_ms),
+            "render_ms": percentiles(self.render_ms),
+        }
+
+def percentiles(samples) -> dict:
+    if not samples:
+        return {"p50": None, "p95": None, "p99": None}
+    cuts = statistics.quantiles(samples, n=100) if len(samples) > 1 else [samples[0]] * 99
+    return {"p50": round(cuts[49], 3), "p95": round(cuts[94], 3), "p99": round(cuts[98], 3)}
+
+# ============ SERVICE ============
+class HTTPError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+class RenderService:
+    def __init__(self, workers: Optional[int] = None, queue_size: int = 64):
+        self.workers = workers or os.cpu_count() or 1
+        self.queue_size = queue_size
+        self.metrics = Metrics()
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._dispatchers = []
+
+    async def start(self):
+        # "spawn": workerne arver ikke serverens socket, så en worker der overlever en
+        # dræbt server kan ikke blokere porten. Puljen startes her, før der lyttes,
+        # så første forespørgsel ikke betaler for opstart og opvarmning.
+        self._executor = self._new_executor()
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(loop.run_in_executor(self._executor, os.getpid) for _ in range(self.workers)))
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        # Én dispatcher pr. worker, så højst `workers` jobs er sendt til puljen ad gangen -
+        # resten venter i den begrænsede kø
+        self._dispatchers = [asyncio.create_task(self._dispatch()) for _ in range(self.workers)]
+
+    def _new_executor(self) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(max_workers=self.workers, initializer=_init_render_worker,
+                                   mp_context=multiprocessing.get_context("spawn"))
+
+    def _replace_executor(self, broken: ProcessPoolExecutor):
+        """
+        En worker er død (OOM-kill, segfault) og puljen kan ikke bruges mere -
+        erstat den, ligesom pdf_batch gør. Flere dispatchere kan opdage den
+        samme døde pulje; kun den første erstatter den.
+        """
+        if self._executor is not broken:
+            return
+        broken.shutdown(wait=False, cancel_futures=True)
+        self._executor = self._new_executor()
+        self.metrics.pool_restarts += 1
+
+    def _submit(self, job: dict) -> Future:
+        executor = self._executor
+        try:
+            return executor.submit(_render_pdf, job)
+        except BrokenProcessPool:
+            # Puljen døde før jobbet blev sendt - det kører i en ny
+            self._replace_executor(executor)
+            return self._executor.submit(_render_pdf, job)
+
+    async def stop(self):
+        for task in self._dispatchers:
+            task.cancel()
+        await asyncio.gather(*self._dispatchers, return_exceptions=True)
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+    async def _dispatch(self):
+        while True:
+            job, future = await self._queue.get()
+            self.metrics.in_flight += 1
+            executor = self._executor
+            try:
+                submitted = self._submit(job)
+                executor = self._executor  # _submit kan have skiftet puljen
+                result = await asyncio.wrap_future(submitted)
+                if not future.cancelled():
+                    future.set_result(result)
+            except Exception as exc:
+                if isinstance(exc, BrokenProcessPool):
+                    # Jobbet kørte da workeren døde og fejler (det kan være årsagen) - de næste
+                    # får en ny pulje
+                    self._replace_executor(executor)
+                if not future.cancelled():
+                    future.set_exception(exc)
+            finally:
+                self.metrics.in_flight -= 1
+                self._queue.task_done()
+
+    async def render(self, job: dict) -> bytes:
+        future = asyncio.get_running_loop().create_future()
+        try:
+            self._queue.put_nowait((job, future))
+        except asyncio.QueueFull:
+            self.metrics.rejected += 1
+            raise HTTPError(503, "køen er fuld") from None
+        self.metrics.accepted += 1
+        pdf, render_ms = await future
+        self.metrics.render_ms.append(render_ms)
+        return pdf
+
+    # ============ HTTP ============
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            keep_alive = True
+            while keep_alive:
+                request = await _read_request(reader)
+                if request is None:
+                    break
+                method, path, headers, body = request
+                keep_alive = headers.get("connection", "").lower() != "close"
+                await self._respond(writer, method, path, body, keep_alive)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except HTTPError as exc:
+            await _write_json(writer, exc.status, {"error": str(exc)}, keep_alive=False)
+        finally:
+            writer.close()
+
+    async def _respond(self, writer, method: str, path: str, body: bytes, keep_alive: bool):
+        start = time.perf_counter()
+        if path == "/health":
+            await _write_json(writer, 200, {"ok": True}, keep_alive)
+            return
+        if path == "/metrics":
+            await _write_json(writer, 200, self.metrics.snapshot(self._queue.qsize(), self.queue_size, self.workers),
+                              keep_alive)
+            return
+        if path not in ("/faktura", "/dagsrapport"):
+            await _write_json(writer, 404, {"error": f"ukendt sti {path}"}, keep_alive)
+            return
+        if method != "POST":
+            await _write_json(writer, 405, {"error": "brug POST"}, keep_alive)
+            return
+
+        try:
+            job = json.loads(body)
+            if not isinstance(job, dict):
+                raise HTTPError(400, "body skal være et JSON-objekt")
+            _check_options(job.get("options", {}))
+            job["type"] = path[1:]
+            pdf = await self.render(job)
+        except HTTPError as exc:
+            headers = {"Retry-After": "1"} if exc.status == 503 else {}
+            await _write_json(writer, exc.status, {"error": str(exc)}, keep_alive, headers)
+            return
+        except (ValueError, InvalidOperation, KeyError) as exc:
+            # Fejl i input (SchemaError, ugyldig JSON eller værdier der ikke kan
+            # bruges - valideret i worker-processen), ikke i servicen
+            self.metrics.failed += 1
+            await _write_json(writer, 400, {"error": f"{type(exc).__name__}: {exc}"}, keep_alive)
+            return
+        except Exception as exc:
+            self.metrics.failed += 1
+            await _write_json(writer, 500, {"error": f"{type(exc).__name__}: {exc}"}, keep_alive)
+            return
+
+        await _write_response(writer, 200, "application/pdf", pdf, keep_alive)
+        self.metrics.completed += 1
+        self.metrics.latency_ms.append((time.perf_counter() - start) * 1000)
+
+def _check_options(options):
+    if not isinstance(options, dict):
+        raise HTTPError(400, "options skal være et JSON-objekt")
+    for name, value in options.items():
+        expected = ALLOWED_OPTIONS.get(name)
+        if expected is None:
+            raise HTTPError(400, f"option {name!r} er ikke tilladt - brug {', '.join(ALLOWED_OPTIONS)}")
+        if not isinstance(value, expected):
+            raise HTTPError(400, f"option {name!r} skal være {expected.__name__}")
+    profile = options.get("output_profile")
+    if profile is not None and profile not in PROFILES:
+        raise HTTPError(400, f"ukendt output_profile {profile!r} - vælg en af {', '.join(PROFILES)}")
+
+async def _read_request(reader: asyncio.StreamReader):
+    request_line = await reader.readline()
+    if not request_line:
+        return None
+    try:
+        method, path, _ = request_line.decode("latin-1").split(" ", 2)
+    except ValueError:
+        raise HTTPError(400, "ugyldig request-linje") from None
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    try:
+        length = int(headers.get("content-length", 0) or 0)
+    except ValueError:
+        raise HTTPError(400, "ugyldig Content-Length") from None
+    if length < 0:
+        raise HTTPError(400, "ugyldig Content-Length")
+    if length > MAX_BODY_BYTES:
+        raise HTTPError(413, f"body over {MAX_BODY_BYTES} bytes")
+    body = await reader.readexactly(length) if length else b""
+    return method, path.split("?", 1)[0], headers, body
+
+async def _write_response(writer: asyncio.StreamWriter, status: int, content_type: str, body: bytes,
+                          keep_alive: bool, extra_headers: Optional[dict] = None):
+    headers = {
+        "Content-Type": content_type,
+        "Content-Length": str(len(body)),
+        "Connection": "keep-alive" if keep_alive else "close",
+        **(extra_headers or {}),
+    }
+    head = f"HTTP/1.1 {status} {_REASONS.get(status, '')}\r\n"
+    head += "".join(f"{name}: {value}\r\n" for name, value in headers.items()) + "\r\n"
+    writer.write(head.encode("latin-1"))
+    view = memoryview(body)
+    for offset in range(0, len(body), WRITE_CHUNK_BYTES):
+        writer.write(view[offset:offset + WRITE_CHUNK_BYTES])
+        await writer.drain()
+    await writer.drain()
+
+async def _write_json(writer, status: int, data: dict, keep_alive: bool, extra_headers: Optional[dict] = None):
+    body = json.dumps(data, ensure_ascii=False).encode("utf-8")
+    await _write_response(writer, status, "application/json; charset=utf-8", body, keep_alive, extra_headers)
+
+# ============ HOVEDFUNKTION ============
+async def serve(host: str, port: int, workers: Optional[int], queue_size: int):
+    service = RenderService(workers, queue_size)
+    await service.start()
+    server = await asyncio.start_server(service.handle_connection, host, port)
+    # SIGTERM lukker pænt ned, så worker-processerne stoppes sammen med serveren
+    asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, server.close)
+    print(f"service klar på http://{host}:{port} ({service.workers} workers, kø {queue_size})",
+          file=sys.stderr, flush=True)
+    try:
+        async with server:
+            await server.serve_forever()
+    except asyncio.CancelledError:
+        pass  # server.close() fra SIGTERM
+    finally:
+        await service.stop()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="HTTP-service for OrderFlow PDF-generatorerne")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--workers", type=int, default=None, help="antal render-processer (standard: antal CPU'er)")
+    parser.add_argument("--queue", type=int, default=64, help="maks. ventende jobs før der svares 503")
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(serve(args.host, args.port, args.workers, args.queue))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
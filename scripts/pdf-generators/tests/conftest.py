@@ -0,0 +1,6 @@
+"""Fælles opsætning for testene - generatorerne importeres som moduler fra mappen ovenover"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
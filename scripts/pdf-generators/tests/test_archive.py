@@ -0,0 +1,132 @@
+import os
+import sys
+import threading
+from datetime import date
+
+import pytest
+
+import faktura_generator as fg
+import pdf_archive
+from benchmark import sample_customer, sample_faktura
+from pdf_archive import INDEX_FILE, PDFArchive, archive_faktura
+
+
+def _pdf(number: str) -> bytes:
+    return b"%PDF-1.4 " + number.encode() + b" %%EOF"
+
+
+def _fill(archive: PDFArchive):
+    archive.append("2025-0002", "11111111", date(2025, 3, 1), _pdf("2025-0002"))
+    archive.append("2025-0001", "22222222", date(2025, 1, 15), _pdf("2025-0001"))
+    archive.append("2025-0003", "11111111", date(2025, 2, 1), _pdf("2025-0003"))
+
+
+def test_lookup_and_ranges(tmp_path):
+    with PDFArchive(str(tmp_path), sync=False) as archive:
+        _fill(archive)
+        assert bytes(archive.get("2025-0001")) == _pdf("2025-0001")
+        assert archive.get("2025-0099") is None
+        assert [e.invoice_number for e in archive.between(date(2025, 1, 1), date(2025, 2, 28))] == \
+            ["2025-0001", "2025-0003"]
+        assert [e.invoice_number for e in archive.for_customer("11111111", start=date(2025, 2, 15))] == ["2025-0002"]
+        archive.append("2025-0001", "22222222", date(2025, 1, 15), _pdf("ny"))
+        assert bytes(archive.get("2025-0001")) == _pdf("ny")
+
+
+def test_reopened_archive_sees_all_entries(tmp_path):
+    with PDFArchive(str(tmp_path), max_pack_bytes=30, sync=False) as archive:
+        _fill(archive)
+    assert len([name for name in os.listdir(tmp_path) if name.endswith(".pdfs")]) > 1
+    with PDFArchive(str(tmp_path)) as archive:
+        assert len(archive) == 3
+        for number in ("2025-0001", "2025-0002", "2025-0003"):
+            assert bytes(archive.get(number)) == _pdf(number)
+
+
+def test_crash_leftovers_are_ignored(tmp_path):
+    with PDFArchive(str(tmp_path), sync=False) as archive:
+        _fill(archive)
+    # Et nedbrud efter PDF'en men før indeksposten, og midt i en indekspost
+    with open(tmp_path / "pack-00000.pdfs", "ab") as pack:
+        pack.write(b"halv pdf")
+    with open(tmp_path / INDEX_FILE, "ab") as index:
+        index.write(b"\1" * (pdf_archive.INDEX_RECORD.size // 2))
+    with PDFArchive(str(tmp_path), sync=False) as archive:
+        assert len(archive) == 3
+        archive.append("2025-0004", "11111111", date(2025, 4, 1), _pdf("2025-0004"))
+    with PDFArchive(str(tmp_path)) as archive:
+        assert len(archive) == 4
+        for number in ("2025-0001", "2025-0004"):
+            assert bytes(archive.get(number)) == _pdf(number)
+
+
+def test_failed_render_adds_nothing(tmp_path):
+    with PDFArchive(str(tmp_path), sync=False) as archive:
+        _fill(archive)
+        size = os.path.getsize(tmp_path / "pack-00000.pdfs")
+        with pytest.raises(RuntimeError):
+            with archive.appender("2025-0004", "11111111", date(2025, 4, 1)) as out:
+                out.write(b"%PDF-1.4 halv")
+                raise RuntimeError("rendering fejlede")
+        assert len(archive) == 3 and archive.lookup("2025-0004") is None
+        assert os.path.getsize(tmp_path / "pack-00000.pdfs") == size
+
+
+def test_render_does_not_hold_the_lock(tmp_path):
+    with PDFArchive(str(tmp_path), sync=False) as archive:
+        with archive.appender("2025-0001", "11111111", date(2025, 1, 1)) as out:
+            out.write(_pdf("2025-0001"))
+            # En anden skriver kommer til mens den første stadig renderer
+            other = threading.Thread(target=archive.append,
+                                     args=("2025-0002", "11111111", date(2025, 1, 2), _pdf("2025-0002")))
+            other.start()
+            other.join(timeout=10)
+            assert not other.is_alive()
+        assert [e.invoice_number for e in archive.for_customer("11111111")] == ["2025-0002", "2025-0001"]
+
+
+def test_archive_faktura(tmp_path):
+    faktura, customer = sample_faktura(), sample_customer()
+    with PDFArchive(str(tmp_path), sync=False) as archive:
+        entry = archive_faktura(archive, fg.FakturaGenerator(streaming=True), faktura, customer)
+        assert entry.invoice_number == faktura.invoice_number and entry.cvr == customer.cvr
+        pdf = bytes(archive.read(entry))
+    assert pdf.startswith(b"%PDF") and pdf.rstrip().endswith(b"%%EOF")
+
+
+@pytest.fixture
+def frequent_switches():
+    """Hyppige trådskift, så læserne rammer midt i en opdatering af nøglerne"""
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    yield
+    sys.setswitchinterval(interval)
+
+
+def test_lookups_during_appends_return_the_right_pdf(tmp_path, frequent_switches):
+    with PDFArchive(str(tmp_path), sync=False) as archive:
+        numbers = [f"2025-{i:05d}" for i in range(2000)]
+        # Blandet rækkefølge, så nye nøgler lander midt i de sorterede
+        numbers.sort(key=lambda number: number[::-1])
+        errors = []
+        def write():
+            for i, number in enumerate(numbers):
+                archive.append(number, f"{10000000 + i % 7}", date.fromordinal(739000 + i % 50), _pdf(number))
+        def read():
+            while writer.is_alive():
+                for number in numbers[:len(archive)]:
+                    view = archive.get(number)
+                    if view is None or bytes(view) != _pdf(number):
+                        errors.append(number)
+                        return
+        writer = threading.Thread(target=write)
+        readers = [threading.Thread(target=read) for _ in range(3)]
+        writer.start()
+        for reader in readers:
+            reader.start()
+        writer.join()
+        for reader in readers:
+            reader.join()
+        assert not errors
+        assert [e.invoice_number for e in archive.between(date.fromordinal(739000), date.fromordinal(739000))] == \
+            numbers[::50]
@@ -0,0 +1,44 @@
+import os
+import threading
+
+import faktura_generator as fg
+from benchmark import sample_customer, sample_faktura
+from pdf_batch import BatchItemError, run_pool
+
+
+def _results(items, **options) -> dict:
+    return dict(fg.generate_faktura_batch(items, max_workers=2, **options))
+
+
+def test_failing_invoice_does_not_stop_the_batch():
+    results = _results([(sample_faktura(invoice_number="2025-0001"), sample_customer()),
+                        (sample_faktura(invoice_number="2025-0002"), None),
+                        (sample_faktura(invoice_number="2025-0003"), sample_customer())], ordered=True)
+    assert results["2025-0001"].startswith(b"%PDF") and results["2025-0003"].startswith(b"%PDF")
+    assert isinstance(results["2025-0002"], BatchItemError)
+
+
+def test_malformed_item_becomes_an_item_error():
+    results = _results([(sample_faktura(invoice_number="2025-0001"), sample_customer()), "ikke et par"])
+    assert results["2025-0001"].startswith(b"%PDF")
+    assert isinstance(results["?"], BatchItemError)
+
+
+def test_unpicklable_item_becomes_an_item_error():
+    results = _results([(sample_faktura(invoice_number="2025-0001"), sample_customer()),
+                        (sample_faktura(invoice_number="2025-0002"), threading.Lock())])
+    assert results["2025-0001"].startswith(b"%PDF")
+    assert isinstance(results["2025-0002"], BatchItemError)
+
+
+def _exit_on_crash(item):
+    if item == "crash":
+        os._exit(1)
+    return item, item.upper()
+
+
+def test_dead_worker_fails_its_items_and_the_pool_restarts():
+    items = ["a", "crash"] + [f"efter{i}" for i in range(6)]
+    results = dict(run_pool(_exit_on_crash, iter(items), max_workers=1, max_pending=1, ordered=True))
+    assert isinstance(results["#1"], BatchItemError)
+    assert all(results[f"efter{i}"] == f"EFTER{i}" for i in range(6))
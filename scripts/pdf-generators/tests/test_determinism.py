@@ -0,0 +1,55 @@
+import hashlib
+import time
+
+import pytest
+from reportlab import rl_config
+
+import dagsrapport_generator as dr
+import faktura_generator as fg
+from benchmark import sample_customer, sample_dagsrapport, sample_dagsrapport_customer, sample_faktura
+
+
+def _render_faktura(options, lines=300, **generator_options) -> bytes:
+    return fg.FakturaGenerator(**options, **generator_options).generate(sample_faktura(lines), sample_customer())
+
+
+def _render_dagsrapport(options) -> bytes:
+    return dr.DagsrapportGenerator(**options).generate(sample_dagsrapport(), sample_dagsrapport_customer())
+
+
+@pytest.fixture
+def later(monkeypatch):
+    """Flytter uret et døgn frem, så et ikke-fastlåst tidsstempel ville ændre sig"""
+    real_time = time.time
+    def move():
+        monkeypatch.setattr(time, "time", lambda: real_time() + 86400)
+    return move
+
+
+@pytest.mark.parametrize("mode", [{}, {"deferred_page_count": True}, {"compiled_furniture": True},
+                                  {"streaming": True}])
+def test_invariant_faktura_is_byte_identical(later, mode):
+    first = _render_faktura({"invariant": True}, **mode)
+    later()
+    second = _render_faktura({"invariant": True}, **mode)
+    assert hashlib.sha256(first).hexdigest() == hashlib.sha256(second).hexdigest()
+
+
+def test_invariant_dagsrapport_is_byte_identical(later):
+    first = _render_dagsrapport({"invariant": True})
+    later()
+    assert _render_dagsrapport({"invariant": True}) == first
+
+
+def test_default_follows_rl_config(later, monkeypatch):
+    monkeypatch.setattr(rl_config, "invariant", 1)
+    first = _render_faktura({}, lines=4)
+    later()
+    assert _render_faktura({}, lines=4) == first
+    assert _render_dagsrapport({}) == _render_dagsrapport({"invariant": True})
+
+
+def test_invariant_false_stamps_the_current_time(later):
+    first = _render_faktura({"invariant": False}, lines=4)
+    later()
+    assert _render_faktura({"invariant": False}, lines=4) != first
@@ -0,0 +1,44 @@
+import sys
+from io import BytesIO
+
+import pypdf
+import pytest
+
+import faktura_generator as fg
+from benchmark import sample_customer, sample_faktura
+
+
+def _page_text(pdf: bytes) -> list:
+    """(tekst, x, y) for hvert tekststykke, side for side"""
+    pages = []
+    for page in pypdf.PdfReader(BytesIO(pdf)).pages:
+        items = []
+        def visit(text, cm, tm, font, size):
+            if text.strip():
+                items.append((text, round(cm[4] + tm[4], 1), round(cm[5] + tm[5], 1)))
+        page.extract_text(visitor_text=visit)
+        pages.append(items)
+    return pages
+
+
+@pytest.mark.parametrize("line_count", [201, 250, 1000])
+def test_chunked_lines_match_single_table_layout(line_count):
+    faktura, customer = sample_faktura(line_count), sample_customer()
+    single = fg.FakturaGenerator(large_invoice_threshold=sys.maxsize).generate(faktura, customer)
+    chunked = fg.FakturaGenerator().generate(faktura, customer)
+    assert _page_text(chunked) == _page_text(single)
+
+
+def test_chunked_lines_have_one_header_per_page():
+    pdf = fg.FakturaGenerator(chunk_rows=30).generate(sample_faktura(250), sample_customer())
+    for page in pypdf.PdfReader(BytesIO(pdf)).pages:
+        assert page.extract_text().count("Beskrivelse") <= 1
+
+
+@pytest.mark.parametrize("options", [{}, {"large_invoice_threshold": sys.maxsize}, {"chunk_rows": 30}])
+def test_continuation_pages_have_column_headers(options):
+    pdf = fg.FakturaGenerator(**options).generate(sample_faktura(250), sample_customer())
+    pages = pypdf.PdfReader(BytesIO(pdf)).pages
+    assert len(pages) > 2
+    for page in pages[1:-1]:
+        assert "Beskrivelse" in page.extract_text()
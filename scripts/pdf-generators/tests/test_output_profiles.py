@@ -0,0 +1,63 @@
+import os
+from io import BytesIO
+
+import pypdf
+import pytest
+
+import dagsrapport_generator as dr
+import faktura_generator as fg
+from benchmark import VERA_DIR, sample_customer, sample_dagsrapport, sample_dagsrapport_customer, sample_faktura
+from pdf_fonts import register_ttf_family
+from pdf_output import PDFA_PROFILE
+
+
+@pytest.fixture(scope="module")
+def vera():
+    return register_ttf_family("Vera", os.path.join(VERA_DIR, "Vera.ttf"), os.path.join(VERA_DIR, "VeraBd.ttf"))
+
+
+def _fonts(pdf: bytes) -> dict:
+    """BaseFont -> indlejret? for alle skrifter på siderne og i deres forms"""
+    fonts = {}
+
+    def walk(resources):
+        for font in (resources.get("/Font") or {}).values():
+            font = font.get_object()
+            descriptor = font.get("/FontDescriptor")
+            descriptor = descriptor.get_object() if descriptor is not None else {}
+            fonts[str(font["/BaseFont"])] = any(key in descriptor for key in ("/FontFile", "/FontFile2", "/FontFile3"))
+        for xobject in (resources.get("/XObject") or {}).values():
+            xobject = xobject.get_object()
+            if "/Resources" in xobject:
+                walk(xobject["/Resources"].get_object())
+
+    for page in pypdf.PdfReader(BytesIO(pdf)).pages:
+        walk(page["/Resources"].get_object())
+    return fonts
+
+
+@pytest.mark.parametrize("options", [
+    {},
+    {"deferred_page_count": True},
+    {"streaming": True},
+    {"output_profile": PDFA_PROFILE},
+])
+def test_embedded_family_references_only_embedded_fonts(vera, options):
+    pdf = fg.FakturaGenerator(fonts=vera, **options).generate(sample_faktura(60), sample_customer())
+    fonts = _fonts(pdf)
+    assert fonts and all(fonts.values()), fonts
+    assert b"/Helvetica" not in pdf
+
+
+def test_pdfa_dagsrapport_references_only_embedded_fonts(vera):
+    pdf = dr.DagsrapportGenerator(fonts=vera, output_profile=PDFA_PROFILE).generate(
+        sample_dagsrapport(), sample_dagsrapport_customer())
+    fonts = _fonts(pdf)
+    assert fonts and all(fonts.values()), fonts
+    catalog = pypdf.PdfReader(BytesIO(pdf)).trailer["/Root"]
+    assert "/OutputIntents" in catalog and "/Metadata" in catalog
+
+
+def test_pdfa_requires_embedded_fonts():
+    with pytest.raises(ValueError):
+        fg.FakturaGenerator(output_profile=PDFA_PROFILE)
@@ -0,0 +1,45 @@
+from io import BytesIO
+
+import pypdf
+
+import faktura_generator as fg
+from benchmark import LINES_PER_PAGE, _render_long_faktura, run_isolated, sample_customer, sample_faktura
+
+# Peak RSS for en faktura på RSS_PAGES sider med udskudt sidetotal
+RSS_PAGES = 200
+RSS_CEILING_MB = 100
+
+
+def _page_labels(pdf: bytes) -> list:
+    """("Side X af Y", x, y) for hver side - også når teksten ligger i en form"""
+    labels = []
+    for page in pypdf.PdfReader(BytesIO(pdf)).pages:
+        # pypdf giver positioner i formens egne koordinater - læg sidens translate til
+        origin = (0, 0)
+        operations = page.get_contents().operations
+        for i, (operands, operator) in enumerate(operations):
+            if operator == b"Do" and operands[0].startswith("/FormXob.pageTotal"):
+                origin = tuple(operations[i - 1][0][4:6])
+        found = []
+        def visit(text, cm, tm, font, size):
+            if text.startswith("Side "):
+                found.append((text.strip(), round(origin[0] + cm[4] + tm[4], 1),
+                              round(origin[1] + cm[5] + tm[5], 1)))
+        page.extract_text(visitor_text=visit)
+        labels.extend(found)
+    return labels
+
+
+def test_deferred_page_labels_match_known_total():
+    # 12 sider - "Side 9 af 12" har færre cifre i sidetallet end i totalen
+    faktura, customer = sample_faktura(11 * LINES_PER_PAGE + 5), sample_customer()
+    known = _page_labels(fg.FakturaGenerator().generate(faktura, customer))
+    deferred = _page_labels(fg.FakturaGenerator(deferred_page_count=True).generate(faktura, customer))
+    assert known[8][0] == "Side 9 af 12"
+    assert deferred == known
+
+
+def test_deferred_page_count_stays_under_rss_ceiling():
+    (_, pages), _, rss = run_isolated(_render_long_faktura, RSS_PAGES * LINES_PER_PAGE, True)
+    assert pages > RSS_PAGES
+    assert rss < RSS_CEILING_MB, f"peak RSS {rss:.1f} MB for {pages} sider"
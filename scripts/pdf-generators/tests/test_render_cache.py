@@ -0,0 +1,92 @@
+import os
+
+import pytest
+
+import faktura_generator as fg
+import render_cache
+from benchmark import sample_customer, sample_faktura
+
+
+def _pdf(size: int, fill: bytes = b"x") -> bytes:
+    body = fill * max(0, size - 15)
+    return b"%PDF-1.4\n" + body + b"%%EOF\n"
+
+
+@pytest.fixture(scope="module")
+def faktura():
+    return sample_faktura(), sample_customer()
+
+
+def test_plain_and_instrumented_generators_share_entries(faktura):
+    plain = render_cache.generator_settings(fg.FakturaGenerator())
+    instrumented = render_cache.generator_settings(fg.FakturaGenerator(stats_callback=print))
+    assert "stats_callback" not in plain
+    assert plain == instrumented
+    assert render_cache.cache_key("faktura", plain, *faktura) == \
+        render_cache.cache_key("faktura", instrumented, *faktura)
+
+
+def test_settings_that_change_output_change_the_key(faktura):
+    plain = render_cache.generator_settings(fg.FakturaGenerator())
+    invariant = render_cache.generator_settings(fg.FakturaGenerator(invariant=True))
+    assert render_cache.cache_key("faktura", plain, *faktura) != \
+        render_cache.cache_key("faktura", invariant, *faktura)
+
+
+def test_hit_and_miss(faktura):
+    cache = render_cache.RenderCache()
+    renders = []
+
+    def render():
+        renders.append(1)
+        return fg.FakturaGenerator().generate(*faktura)
+
+    key = render_cache.cache_key("faktura", *faktura)
+    assert cache.get(key) is None
+    first = cache.get_or_render(key, render)
+    assert cache.get_or_render(key, render) is first
+    assert len(renders) == 1
+    assert (cache.stats.hits, cache.stats.misses) == (1, 2)
+
+
+def test_lru_eviction_by_byte_budget():
+    cache = render_cache.RenderCache(max_bytes=250)
+    for key in "abc":
+        cache.put(key, _pdf(100))
+    # a og b fylder 200 bytes; c skubber den ældste ud
+    assert cache.get("a") is None
+    cache.get("b")
+    cache.put("d", _pdf(100))
+    assert cache.get("c") is None and cache.get("b") is not None
+    assert cache.size_bytes == 200 and cache.stats.evictions == 2
+    cache.put("huge", _pdf(300))
+    assert cache.get("huge") is None and len(cache) == 2
+
+
+def test_disk_round_trip(tmp_path):
+    pdf = _pdf(100)
+    render_cache.RenderCache(directory=str(tmp_path)).put("ab12", pdf)
+    cache = render_cache.RenderCache(directory=str(tmp_path))
+    assert cache.get("ab12") == pdf
+    assert cache.stats.disk_hits == 1
+    assert cache.get("ab12") == pdf and cache.stats.hits == 1
+
+
+@pytest.mark.parametrize("damage", [
+    lambda pdf: pdf[:len(pdf) // 2],
+    lambda pdf: b"",
+    lambda pdf: b"garbage" + pdf[7:],
+])
+def test_damaged_disk_entry_is_a_miss(tmp_path, damage):
+    pdf = _pdf(100)
+    writer = render_cache.RenderCache(directory=str(tmp_path))
+    writer.put("ab12", pdf)
+    path = writer._path("ab12")
+    with open(path, "wb") as f:
+        f.write(damage(pdf))
+    cache = render_cache.RenderCache(directory=str(tmp_path))
+    assert cache.get("ab12") is None
+    assert not os.path.exists(path)
+    # Næste render skriver en hel post igen
+    assert cache.get_or_render("ab12", lambda: pdf) == pdf
+    assert render_cache.RenderCache(directory=str(tmp_path)).get("ab12") == pdf
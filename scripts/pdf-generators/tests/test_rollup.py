@@ -0,0 +1,56 @@
+from dataclasses import replace
+from io import BytesIO
+
+import pypdf
+import pytest
+
+import render_cache
+from benchmark import sample_dagsrapport, sample_dagsrapport_customer
+from dagsrapport_rollup import PeriodRapportGenerator, RollupStore, location_id
+
+
+def _text(pdf: bytes) -> str:
+    return "".join(page.extract_text() for page in pypdf.PdfReader(BytesIO(pdf)).pages)
+
+
+def test_period_report_renders():
+    rapport = sample_dagsrapport()
+    store = RollupStore()
+    store.add(sample_dagsrapport_customer(), rapport)
+    report = store.period_report(rapport.report_date, rapport.report_date, title="Testkæde")
+    text = _text(PeriodRapportGenerator().generate_period(report))
+    assert "PERIODERAPPORT" in text and "Testkæde" in text
+
+
+def test_period_generator_works_as_a_dagsrapport_generator():
+    cache = render_cache.RenderCache()
+    pdf = render_cache.cached_generate_dagsrapport(cache, sample_dagsrapport(), sample_dagsrapport_customer(),
+                                                   generator=PeriodRapportGenerator())
+    assert "DAGSRAPPORT" in _text(pdf)
+
+
+def test_locations_sharing_a_cvr_are_kept_apart(tmp_path):
+    rapport = sample_dagsrapport()
+    first = sample_dagsrapport_customer()
+    second = replace(first, address="Havnegade 2")
+    store = RollupStore()
+    store.add(first, rapport)
+    store.add(second, rapport)
+    day = rapport.report_date
+    assert len(store) == 2
+    one = store.location_totals(location_id(first), day, day)
+    assert store.period_totals(day, day).total_revenue == 2 * one.total_revenue
+
+    store.save(str(tmp_path / "rollup.jsonl"))
+    loaded = RollupStore.load(str(tmp_path / "rollup.jsonl"))
+    report = loaded.period_report(day, day, title="Kæde")
+    assert [customer.address for customer, _ in report.locations] == sorted([first.address, second.address])
+    assert report.totals.total_revenue == 2 * one.total_revenue
+
+
+def test_unknown_location_is_a_value_error():
+    rapport = sample_dagsrapport()
+    store = RollupStore()
+    store.add(sample_dagsrapport_customer(), rapport)
+    with pytest.raises(ValueError, match="Ukendt lokation"):
+        store.period_report(rapport.report_date, rapport.report_date, title="Kæde", locations=["12345678"])
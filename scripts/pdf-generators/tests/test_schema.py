@@ -0,0 +1,68 @@
+import copy
+from datetime import datetime, timezone
+
+import pytest
+
+import dagsrapport_aggregator as da
+import dagsrapport_generator as dr
+from benchmark import STARTUP_JOBS
+from pdf_schema import SchemaError, parse_datetime
+
+
+def _rapport(**times) -> dict:
+    rapport = copy.deepcopy(STARTUP_JOBS["dagsrapport_generator"]["rapport"])
+    rapport.update(times)
+    return rapport
+
+
+def _order(order_id: str, closed_at: str) -> dict:
+    return {"order_id": order_id, "closed_at": closed_at, "gross_amount": 100.0, "payment_method": "CARD"}
+
+
+def test_rapport_from_dict():
+    rapport = dr.DagsrapportData.from_dict(_rapport())
+    assert rapport.closed_time > rapport.opened_time
+
+
+@pytest.mark.parametrize("opened, closed", [
+    ("2025-12-31T08:14", "2025-12-31T07:14"),
+    ("2025-12-31T08:14+01:00", "2025-12-31T07:00+00:00"),
+])
+def test_closed_before_opened_is_rejected(opened, closed):
+    with pytest.raises(SchemaError) as info:
+        dr.DagsrapportData.from_dict(_rapport(opened_time=opened, closed_time=closed))
+    assert info.value.path == "rapport.closed_time"
+
+
+@pytest.mark.parametrize("opened, closed", [
+    ("2025-12-31T08:14+01:00", "2025-12-31T21:14"),
+    ("2025-12-31T08:14", "2025-12-31T21:14Z"),
+])
+def test_mixed_tz_awareness_is_a_schema_error(opened, closed):
+    with pytest.raises(SchemaError) as info:
+        dr.DagsrapportData.from_dict(_rapport(opened_time=opened, closed_time=closed))
+    assert info.value.path == "rapport.closed_time"
+
+
+def test_tz_aware_times_with_different_offsets_compare():
+    rapport = dr.DagsrapportData.from_dict(
+        _rapport(opened_time="2025-12-31T08:14+01:00", closed_time="2025-12-31T20:14Z"))
+    assert rapport.closed_time > rapport.opened_time
+    assert parse_datetime("2025-12-31T08:14Z", "t", like=datetime(2025, 1, 1, tzinfo=timezone.utc))
+
+
+def test_aggregator_rejects_mixed_tz_awareness():
+    aggregator = da.DagsrapportAggregator()
+    orders = [_order("1", "2025-12-31T08:14"), _order("2", "2025-12-31T09:14+01:00")]
+    with pytest.raises(SchemaError) as info:
+        aggregator.extend(orders)
+    assert info.value.path == "orders[1].closed_at"
+    # Den afviste ordre tæller ikke med
+    assert aggregator.order_count == 1 and aggregator.gross == 10000
+
+
+def test_aggregator_rejects_mixed_explicit_times():
+    aggregator = da.DagsrapportAggregator()
+    aggregator.extend([_order("1", "2025-12-31T08:14")])
+    with pytest.raises(SchemaError):
+        aggregator.result("Medarbejder", "DOC-1", closed_time=datetime(2025, 12, 31, 22, tzinfo=timezone.utc))
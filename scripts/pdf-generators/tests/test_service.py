@@ -0,0 +1,104 @@
+import asyncio
+import contextlib
+import copy
+import json
+import os
+import signal
+
+import pytest
+
+import service
+from benchmark import STARTUP_JOBS
+
+
+def _job(kind: str, **options) -> dict:
+    job = copy.deepcopy(STARTUP_JOBS[f"{kind}_generator"])
+    del job["type"]
+    if options:
+        job["options"] = options
+    return job
+
+
+async def _request(port: int, path: str, body: bytes, headers: str = None):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    head = headers if headers is not None else f"Content-Length: {len(body)}\r\n"
+    writer.write(f"POST {path} HTTP/1.1\r\n{head}Connection: close\r\n\r\n".encode("latin-1") + body)
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    status = int(response.split(b" ", 2)[1])
+    return status, response.partition(b"\r\n\r\n")[2]
+
+
+@contextlib.asynccontextmanager
+async def _serving():
+    render_service = service.RenderService(workers=1, queue_size=4)
+    await render_service.start()
+    server = await asyncio.start_server(render_service.handle_connection, "127.0.0.1", 0)
+    try:
+        yield render_service, server.sockets[0].getsockname()[1]
+    finally:
+        server.close()
+        await server.wait_closed()
+        await render_service.stop()
+
+
+async def _run(requests):
+    async with _serving() as (_, port):
+        return [await _request(port, *request) for request in requests]
+
+
+@pytest.fixture(scope="module")
+def responses():
+    bad_value = _job("faktura")
+    bad_value["faktura"]["lines"][0]["unit_price"] = 1e308  # InvalidOperation ved afrunding
+    mixed_tz = _job("dagsrapport")
+    mixed_tz["rapport"]["opened_time"] += "+01:00"
+    requests = {
+        "ok": ("/faktura", json.dumps(_job("faktura", invariant=True, output_profile="arkiv")).encode()),
+        "fonts": ("/faktura", json.dumps(_job("faktura", fonts={"name": "X", "regular": "/etc/passwd"})).encode()),
+        "callback": ("/dagsrapport", json.dumps(_job("dagsrapport", stats_callback=1)).encode()),
+        "chunk_rows": ("/faktura", json.dumps(_job("faktura", chunk_rows=0)).encode()),
+        "wrong_type": ("/faktura", json.dumps(_job("faktura", invariant=1)).encode()),
+        "profile": ("/faktura", json.dumps(_job("faktura", output_profile="ukendt")).encode()),
+        "pdfa_without_fonts": ("/faktura", json.dumps(_job("faktura", output_profile="pdfa")).encode()),
+        "bad_value": ("/faktura", json.dumps(bad_value).encode()),
+        "mixed_tz": ("/dagsrapport", json.dumps(mixed_tz).encode()),
+        "content_length": ("/faktura", b"{}", "Content-Length: abc\r\n"),
+    }
+    results = asyncio.run(_run(list(requests.values())))
+    return dict(zip(requests, results))
+
+
+def test_valid_job_renders(responses):
+    status, body = responses["ok"]
+    assert status == 200 and body.startswith(b"%PDF")
+
+
+@pytest.mark.parametrize("case", ["fonts", "callback", "chunk_rows", "wrong_type", "profile"])
+def test_options_outside_whitelist_are_rejected(responses, case):
+    status, body = responses[case]
+    assert status == 400, body
+
+
+@pytest.mark.parametrize("case", ["pdfa_without_fonts", "bad_value", "mixed_tz", "content_length"])
+def test_bad_input_is_a_client_error(responses, case):
+    status, body = responses[case]
+    assert status == 400, body
+
+
+def test_service_recovers_from_a_dead_worker():
+    async def kill_worker_and_render():
+        async with _serving() as (render_service, port):
+            body = json.dumps(_job("faktura")).encode()
+            assert (await _request(port, "/faktura", body))[0] == 200
+            executor = render_service._executor
+            for pid in list(executor._processes):
+                os.kill(pid, signal.SIGKILL)
+            # Vent til puljen selv har opdaget den døde worker
+            while not executor._broken:
+                await asyncio.sleep(0.01)
+            statuses = [(await _request(port, "/faktura", body))[0] for _ in range(2)]
+            return statuses, render_service.metrics.pool_restarts
+    statuses, restarts = asyncio.run(kill_worker_and_render())
+    assert statuses == [200, 200] and restarts == 1
@@ -0,0 +1,24 @@
+import pytest
+
+import faktura_generator as fg
+from benchmark import LINES_PER_PAGE, sample_customer, sample_faktura
+
+
+def test_streaming_to_path_writes_pdf(tmp_path):
+    target = tmp_path / "faktura.pdf"
+    fg.FakturaGenerator(streaming=True).generate_to(target, sample_faktura(3 * LINES_PER_PAGE), sample_customer())
+    assert target.read_bytes().startswith(b"%PDF") and target.read_bytes().rstrip().endswith(b"%%EOF")
+
+
+def test_failed_streaming_build_removes_partial_file(tmp_path, monkeypatch):
+    draw_payment_info = fg.FakturaCanvas.draw_payment_info
+    def fail_on_third_page(canv):
+        if canv._pageNumber == 3:
+            raise RuntimeError("layout fejlede")
+        draw_payment_info(canv)
+    monkeypatch.setattr(fg.FakturaCanvas, "draw_payment_info", fail_on_third_page)
+
+    target = tmp_path / "faktura.pdf"
+    with pytest.raises(RuntimeError, match="layout fejlede"):
+        fg.FakturaGenerator(streaming=True).generate_to(target, sample_faktura(5 * LINES_PER_PAGE), sample_customer())
+    assert not target.exists()
@@ -0,0 +1,59 @@
+import pickle
+from datetime import date
+from decimal import Decimal
+
+from faktura_generator import FakturaData, InvoiceLine, InvoiceLineColumns
+
+
+def _faktura(lines) -> FakturaData:
+    return FakturaData(invoice_number="2025-0001", invoice_date=date(2025, 1, 15), lines=lines)
+
+
+def test_lines_are_the_callers_list():
+    lines = [InvoiceLine("Kaffe", 2, "stk", 10.0)]
+    faktura = _faktura(lines)
+    assert faktura.lines is lines
+    assert faktura.subtotal_excl_vat == 20.0
+    lines.append(InvoiceLine("Te", 1, "stk", 5.0))
+    assert faktura.subtotal_excl_vat == 25.0
+    lines.pop(0)
+    assert faktura.subtotal_excl_vat == 5.0
+
+
+def test_cached_totals_are_reused():
+    faktura = _faktura([InvoiceLine("Kaffe", 2, "stk", 10.0)])
+    totals = faktura.totals
+    assert faktura.totals is totals
+    faktura.lines = [InvoiceLine("Kaffe", 2, "stk", 10.0)]
+    assert faktura.totals is not totals
+
+
+def test_line_edit_needs_invalidate():
+    faktura = _faktura([InvoiceLine("Kaffe", 2, "stk", 10.0)])
+    assert faktura.totals.total_vat == Decimal("5.00")
+    faktura.lines[0].quantity = 4
+    faktura.invalidate_totals()
+    assert faktura.totals.total_vat == Decimal("10.00")
+    faktura.lines[0] = InvoiceLine("Kaffe", 1, "stk", 10.0)
+    faktura.invalidate_totals()
+    assert faktura.subtotal_excl_vat == 10.0
+
+
+def test_columns():
+    columns = InvoiceLineColumns([InvoiceLine("Kaffe", 2, "stk", 10.0)])
+    faktura = _faktura(columns)
+    totals = faktura.totals
+    assert faktura.totals is totals
+    columns.append_values("Te", 1, "stk", 5.0)
+    assert faktura.subtotal_excl_vat == 25.0
+    faktura.lines = InvoiceLineColumns([InvoiceLine("Kaffe", 1, "stk", 10.0)] * 2)
+    assert faktura.subtotal_excl_vat == 20.0
+
+
+def test_pickled_invoice_keeps_its_totals():
+    faktura = _faktura([InvoiceLine("Kaffe", 2, "stk", 10.0)])
+    faktura.totals
+    copy = pickle.loads(pickle.dumps(faktura))
+    copy.lines.append(InvoiceLine("Te", 1, "stk", 5.0))
+    assert copy.subtotal_excl_vat == 25.0
+    assert faktura.subtotal_excl_vat == 20.0
@@ -0,0 +1,108 @@
+"""
+OrderFlow PDF worker - langlivet proces der renderer jobs fra stdin
+
+Importerer generatorerne og varmer skrifttyper/metrik op én gang, og læser
+derefter newline-delimited JSON jobs på stdin. For hvert job skrives én
+JSON-linje med resultatet på stdout:
+
+    {"id": "1", "type": "faktura", "output": "/tmp/1.pdf",
+     "faktura": {...}, "customer": {...}, "platform": {...}, "options": {"invariant": true}}
+
+    {"id": "1", "ok": true, "output": "/tmp/1.pdf", "bytes": 2924, "ms": 11.8}
+
+Uden "output" sendes PDF'en tilbage base64-kodet i feltet "pdf".
+
+Brug:
+    python worker.py < jobs.jsonl > results.jsonl
+"""
+
+import base64
+import json
+import os
+import sys
+import time
+from datetime import date, datetime
+from io import BytesIO
+
+import dagsrapport_generator as dr
+import faktura_generator as fg
+from pdf_fonts import FontFamily
+from pdf_output import OutputProfile
+
+# ============ RENDERING ============
+def _render(job: dict, target):
+    options = dict(job.get("options", {}))
+    if "fonts" in options:
+        # {"name": ..., "regular": sti, "bold": sti} - registreres kun første gang i processen
+        options["fonts"] = FontFamily.from_dict(options["fonts"])
+    if "output_profile" in options:
+        # "standard", "arkiv" eller "pdfa"
+        options["output_profile"] = OutputProfile.from_name(options["output_profile"])
+    if job["type"] == "faktura":
+        platform = fg.PlatformInfo.from_dict(job["platform"]) if "platform" in job else None
+        generator = fg.FakturaGenerator(platform, **options)
+        generator.generate_to(target, fg.FakturaData.from_dict(job["faktura"]), fg.CustomerInfo.from_dict(job["customer"]))
+    elif job["type"] == "dagsrapport":
+        platform = dr.PlatformInfo.from_dict(job["platform"]) if "platform" in job else None
+        generator = dr.DagsrapportGenerator(platform, **options)
+        generator.generate_to(target, dr.DagsrapportData.from_dict(job["rapport"]), dr.CustomerInfo.from_dict(job["customer"]))
+    else:
+        raise ValueError(f"Ukendt jobtype: {job['type']!r}")
+
+def run_job(job: dict) -> dict:
+    start = time.perf_counter()
+    result = {"id": job.get("id")}
+    output = job.get("output")
+    if output:
+        _render(job, output)
+        result.update(ok=True, output=output, bytes=os.path.getsize(output))
+    else:
+        buffer = BytesIO()
+        _render(job, buffer)
+        pdf = buffer.getvalue()
+        result.update(ok=True, bytes=len(pdf), pdf=base64.b64encode(pdf).decode("ascii"))
+    result["ms"] = round((time.perf_counter() - start) * 1000, 3)
+    return result
+
+# ============ OPVARMNING ============
+def warm_up():
+    """Renderer et lille dokument af hver slags, så skrifttyper og metrik er indlæst før første job"""
+    customer = fg.CustomerInfo("Opvarmning ApS", "00000000", "Vej 1", "1000 København K")
+    faktura = fg.FakturaData("0", date(2000, 1, 1), [fg.InvoiceLine("Opvarmning", 1, "stk", 1.0)])
+    fg.FakturaGenerator().generate(faktura, customer)
+    rapport = dr.DagsrapportData(
+        report_date=date(2000, 1, 1),
+        opened_time=datetime(2000, 1, 1, 8, 0),
+        closed_time=datetime(2000, 1, 1, 22, 0),
+        opened_by="Opvarmning",
+        document_number="0",
+        gross_revenue=0.0,
+        discounts=0.0,
+        total_revenue=0.0,
+        vat_collected=0.0,
+        sale_excl_vat=0.0,
+        payment_breakdown=dr.PaymentBreakdown(),
+    )
+    dr.DagsrapportGenerator().generate(rapport, dr.CustomerInfo("Opvarmning ApS", "00000000", "Vej 1", "1000 København K"))
+
+# ============ HOVEDFUNKTION ============
+def serve(stdin=sys.stdin, stdout=sys.stdout):
+    for line in stdin:
+        line = line.strip()
+        if not line:
+            continue
+        job = None
+        try:
+            job = json.loads(line)
+            result = run_job(job)
+        except Exception as exc:
+            result = {"id": job.get("id") if isinstance(job, dict) else None,
+                      "ok": False, "error": f"{type(exc).__name__}: {exc}"}
+        stdout.write(json.dumps(result, ensure_ascii=False) + "\n")
+        stdout.flush()
+
+
+if __name__ == "__main__":
+    warm_up()
+    print("worker klar", file=sys.stderr, flush=True)
+    serve()